@@ -0,0 +1,80 @@
+"""Esquema inicial (equivalente al antiguo Base.metadata.create_all)
+
+Las bases creadas con create_all deben marcarse con:
+    alembic stamp 0001_inicial
+
+Revision ID: 0001_inicial
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_inicial"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# SQLAlchemy guarda los nombres de los miembros del enum, no sus valores
+AREAS = ("SCC", "PSYCHOLOGY", "CC_AND_C", "WAES", "DCO", "PACKETS", "CAS", "FOLLOW_UP", "CUSTOMER_SERVICE")
+URGENCIAS = ("BAJA", "MEDIA", "ALTA", "CRITICA")
+ESTADOS = ("RECIBIDO", "EN_ANALISIS", "EN_DESARROLLO", "COMPLETADO")
+IMPACTOS = ("BAJO", "MEDIO", "ALTO")
+
+
+def upgrade():
+    op.create_table(
+        "solicitudes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("numero_solicitud", sa.String(length=20), nullable=True),
+        sa.Column("area_solicitante", sa.Enum(*AREAS, name="areasolicitante"), nullable=False),
+        sa.Column("nombre_solicitante", sa.String(length=100), nullable=False),
+        sa.Column("email_solicitante", sa.String(length=100), nullable=False),
+        sa.Column("titulo_proceso", sa.String(length=200), nullable=False),
+        sa.Column("descripcion_proceso", sa.Text(), nullable=False),
+        sa.Column("situacion_actual", sa.Text(), nullable=False),
+        sa.Column("resultado_esperado", sa.Text(), nullable=False),
+        sa.Column("urgencia", sa.Enum(*URGENCIAS, name="urgencia"), nullable=False),
+        sa.Column("impacto", sa.Enum(*IMPACTOS, name="impacto"), nullable=False),
+        sa.Column("frecuencia_proceso", sa.String(length=100), nullable=True),
+        sa.Column("tiempo_manual_estimado", sa.String(length=100), nullable=True),
+        sa.Column("sistemas_involucrados", sa.Text(), nullable=True),
+        sa.Column("enlaces_documentacion", sa.Text(), nullable=True),
+        sa.Column("estado", sa.Enum(*ESTADOS, name="estado"), nullable=True),
+        sa.Column("fecha_creacion", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("fecha_actualizacion", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("notas_internas", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_solicitudes_id", "solicitudes", ["id"])
+    op.create_index("ix_solicitudes_numero_solicitud", "solicitudes", ["numero_solicitud"], unique=True)
+
+    op.create_table(
+        "sheets_outbox",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("solicitud_id", sa.Integer(), sa.ForeignKey("solicitudes.id"), nullable=False),
+        sa.Column("operacion", sa.String(length=30), nullable=False),
+        sa.Column("intentos", sa.Integer(), nullable=False),
+        sa.Column("proximo_intento", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("ultimo_error", sa.Text(), nullable=True),
+        sa.Column("fecha_creacion", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("fecha_procesado", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_sheets_outbox_id", "sheets_outbox", ["id"])
+    op.create_index("ix_sheets_outbox_solicitud_id", "sheets_outbox", ["solicitud_id"])
+    op.create_index("ix_sheets_outbox_proximo_intento", "sheets_outbox", ["proximo_intento"])
+    op.create_index("ix_sheets_outbox_fecha_procesado", "sheets_outbox", ["fecha_procesado"])
+
+    op.create_table(
+        "sheets_filas",
+        sa.Column("numero_solicitud", sa.String(length=20), primary_key=True),
+        sa.Column("fila", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("sheets_filas")
+    op.drop_table("sheets_outbox")
+    op.drop_table("solicitudes")
+    for nombre in ("areasolicitante", "urgencia", "impacto", "estado"):
+        sa.Enum(name=nombre).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,31 @@
+"""Índices compuestos para el listado paginado por (fecha_creacion, id)
+
+Revision ID: 0002_indices_listado
+Revises: 0001_inicial
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0002_indices_listado"
+down_revision = "0001_inicial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_solicitudes_fecha_id", "solicitudes", ["fecha_creacion", "id"])
+    op.create_index("ix_solicitudes_estado_fecha_id", "solicitudes", ["estado", "fecha_creacion", "id"])
+    op.create_index("ix_solicitudes_area_fecha_id", "solicitudes", ["area_solicitante", "fecha_creacion", "id"])
+    op.create_index(
+        "ix_solicitudes_area_estado_fecha_id",
+        "solicitudes",
+        ["area_solicitante", "estado", "fecha_creacion", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_solicitudes_area_estado_fecha_id", table_name="solicitudes")
+    op.drop_index("ix_solicitudes_area_fecha_id", table_name="solicitudes")
+    op.drop_index("ix_solicitudes_estado_fecha_id", table_name="solicitudes")
+    op.drop_index("ix_solicitudes_fecha_id", table_name="solicitudes")
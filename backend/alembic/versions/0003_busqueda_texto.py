@@ -0,0 +1,94 @@
+"""Búsqueda de texto completo: tsvector + GIN en Postgres, FTS5 en SQLite
+
+Revision ID: 0003_busqueda_texto
+Revises: 0002_indices_listado
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_busqueda_texto"
+down_revision = "0002_indices_listado"
+branch_labels = None
+depends_on = None
+
+# Copia fija del DDL de app/services/busqueda.py al momento de esta revisión:
+# cambios posteriores del servicio van en una migración nueva.
+DDL_POSTGRES = [
+    """
+    ALTER TABLE solicitudes ADD COLUMN IF NOT EXISTS busqueda tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('spanish'::regconfig, coalesce(titulo_proceso, '')), 'A') ||
+        setweight(to_tsvector('spanish'::regconfig, coalesce(descripcion_proceso, '')), 'B') ||
+        setweight(to_tsvector('spanish'::regconfig, coalesce(situacion_actual, '')), 'C') ||
+        setweight(to_tsvector('spanish'::regconfig, coalesce(sistemas_involucrados, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_solicitudes_busqueda ON solicitudes USING GIN (busqueda)",
+]
+
+DDL_SQLITE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS solicitudes_fts USING fts5(
+        titulo_proceso, descripcion_proceso, situacion_actual, sistemas_involucrados,
+        content='solicitudes', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS solicitudes_fts_ai AFTER INSERT ON solicitudes BEGIN
+        INSERT INTO solicitudes_fts(rowid, titulo_proceso, descripcion_proceso, situacion_actual, sistemas_involucrados)
+        VALUES (new.id, new.titulo_proceso, new.descripcion_proceso, new.situacion_actual, new.sistemas_involucrados);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS solicitudes_fts_ad AFTER DELETE ON solicitudes BEGIN
+        INSERT INTO solicitudes_fts(solicitudes_fts, rowid, titulo_proceso, descripcion_proceso, situacion_actual, sistemas_involucrados)
+        VALUES ('delete', old.id, old.titulo_proceso, old.descripcion_proceso, old.situacion_actual, old.sistemas_involucrados);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS solicitudes_fts_au AFTER UPDATE ON solicitudes BEGIN
+        INSERT INTO solicitudes_fts(solicitudes_fts, rowid, titulo_proceso, descripcion_proceso, situacion_actual, sistemas_involucrados)
+        VALUES ('delete', old.id, old.titulo_proceso, old.descripcion_proceso, old.situacion_actual, old.sistemas_involucrados);
+        INSERT INTO solicitudes_fts(rowid, titulo_proceso, descripcion_proceso, situacion_actual, sistemas_involucrados)
+        VALUES (new.id, new.titulo_proceso, new.descripcion_proceso, new.situacion_actual, new.sistemas_involucrados);
+    END
+    """,
+    # Indexa las filas que ya existían antes de crear la tabla FTS
+    "INSERT INTO solicitudes_fts(solicitudes_fts) VALUES ('rebuild')",
+]
+
+DDL_POSTGRES_DOWN = [
+    "DROP INDEX IF EXISTS ix_solicitudes_busqueda",
+    "ALTER TABLE solicitudes DROP COLUMN IF EXISTS busqueda",
+]
+
+DDL_SQLITE_DOWN = [
+    "DROP TRIGGER IF EXISTS solicitudes_fts_au",
+    "DROP TRIGGER IF EXISTS solicitudes_fts_ad",
+    "DROP TRIGGER IF EXISTS solicitudes_fts_ai",
+    "DROP TABLE IF EXISTS solicitudes_fts",
+]
+
+
+def upgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == "postgresql":
+        ddl = DDL_POSTGRES
+    elif conn.dialect.name == "sqlite":
+        existe = conn.execute(
+            sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'solicitudes_fts'")
+        ).first()
+        ddl = [] if existe else DDL_SQLITE
+    else:
+        ddl = []
+    for sentencia in ddl:
+        conn.execute(sa.text(sentencia))
+
+
+def downgrade():
+    conn = op.get_bind()
+    ddl = {"postgresql": DDL_POSTGRES_DOWN, "sqlite": DDL_SQLITE_DOWN}.get(conn.dialect.name, [])
+    for sentencia in ddl:
+        conn.execute(sa.text(sentencia))
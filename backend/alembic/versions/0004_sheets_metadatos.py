@@ -0,0 +1,26 @@
+"""Tabla clave/valor para el watermark de reconciliación con Sheets
+
+Revision ID: 0004_sheets_metadatos
+Revises: 0003_busqueda_texto
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_sheets_metadatos"
+down_revision = "0003_busqueda_texto"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "sheets_metadatos",
+        sa.Column("clave", sa.String(length=50), primary_key=True),
+        sa.Column("valor", sa.Text(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("sheets_metadatos")
@@ -0,0 +1,21 @@
+"""Índice en fecha_actualizacion para el watermark de ETags y reconciliación
+
+Revision ID: 0005_indice_fecha_actualizacion
+Revises: 0004_sheets_metadatos
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0005_indice_fecha_actualizacion"
+down_revision = "0004_sheets_metadatos"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_solicitudes_fecha_actualizacion", "solicitudes", ["fecha_actualizacion"])
+
+
+def downgrade():
+    op.drop_index("ix_solicitudes_fecha_actualizacion", table_name="solicitudes")
@@ -0,0 +1,44 @@
+"""Contador diario para numero_solicitud
+
+Revision ID: 0006_contadores_solicitud
+Revises: 0005_indice_fecha_actualizacion
+Create Date: 2026-10-18
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_contadores_solicitud"
+down_revision = "0005_indice_fecha_actualizacion"
+branch_labels = None
+depends_on = None
+
+_NUMERO_RE = re.compile(r"^AUTO-(\d{8})-(\d{6})$")
+
+
+def upgrade():
+    contadores = op.create_table(
+        "contadores_solicitud",
+        sa.Column("fecha", sa.String(length=8), primary_key=True),
+        sa.Column("ultimo", sa.Integer(), nullable=False),
+    )
+
+    # Los números anteriores usaban 6 caracteres hex de un uuid; los que por
+    # azar quedaron solo con dígitos podrían coincidir con el nuevo correlativo.
+    maximos = {}
+    for (numero,) in op.get_bind().execute(
+        sa.text("SELECT numero_solicitud FROM solicitudes WHERE numero_solicitud LIKE 'AUTO-%'")
+    ):
+        match = _NUMERO_RE.match(numero or "")
+        if match:
+            fecha, correlativo = match.group(1), int(match.group(2))
+            maximos[fecha] = max(maximos.get(fecha, 0), correlativo)
+
+    if maximos:
+        op.bulk_insert(contadores, [{"fecha": f, "ultimo": u} for f, u in maximos.items()])
+
+
+def downgrade():
+    op.drop_table("contadores_solicitud")
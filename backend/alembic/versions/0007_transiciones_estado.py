@@ -0,0 +1,57 @@
+"""Historial de transiciones de estado y rollups diarios de tiempo en estado
+
+Revision ID: 0007_transiciones_estado
+Revises: 0006_contadores_solicitud
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_transiciones_estado"
+down_revision = "0006_contadores_solicitud"
+branch_labels = None
+depends_on = None
+
+COLUMNAS_BUCKETS = [f"h{i:02d}" for i in range(12)]
+
+
+def upgrade():
+    op.add_column("solicitudes", sa.Column("fecha_estado", sa.DateTime(timezone=True), nullable=True))
+    # Sin historial previo, la mejor aproximación es el último cambio registrado
+    op.execute("UPDATE solicitudes SET fecha_estado = COALESCE(fecha_actualizacion, fecha_creacion)")
+
+    op.create_table(
+        "transiciones_estado",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("solicitud_id", sa.Integer(), sa.ForeignKey("solicitudes.id"), nullable=False),
+        sa.Column("estado_anterior", sa.String(length=30), nullable=True),
+        sa.Column("estado_nuevo", sa.String(length=30), nullable=False),
+        sa.Column("area_solicitante", sa.String(length=50), nullable=False),
+        sa.Column("urgencia", sa.String(length=20), nullable=False),
+        sa.Column("segundos_en_estado", sa.Float(), nullable=True),
+        sa.Column("fecha", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_transiciones_estado_id", "transiciones_estado", ["id"])
+    op.create_index("ix_transiciones_estado_solicitud_id", "transiciones_estado", ["solicitud_id"])
+    op.create_index("ix_transiciones_estado_fecha", "transiciones_estado", ["fecha"])
+
+    op.create_table(
+        "rollups_estado_diario",
+        sa.Column("fecha", sa.Date(), primary_key=True),
+        sa.Column("estado", sa.String(length=30), primary_key=True),
+        sa.Column("area_solicitante", sa.String(length=50), primary_key=True),
+        sa.Column("urgencia", sa.String(length=20), primary_key=True),
+        sa.Column("cantidad", sa.Integer(), nullable=False),
+        sa.Column("suma_segundos", sa.Float(), nullable=False),
+        *[sa.Column(columna, sa.Integer(), nullable=False) for columna in COLUMNAS_BUCKETS],
+    )
+
+
+def downgrade():
+    op.drop_table("rollups_estado_diario")
+    op.drop_index("ix_transiciones_estado_fecha", table_name="transiciones_estado")
+    op.drop_index("ix_transiciones_estado_solicitud_id", table_name="transiciones_estado")
+    op.drop_index("ix_transiciones_estado_id", table_name="transiciones_estado")
+    op.drop_table("transiciones_estado")
+    op.drop_column("solicitudes", "fecha_estado")
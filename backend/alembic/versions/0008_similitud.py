@@ -0,0 +1,34 @@
+"""Índice MinHash/LSH para detectar solicitudes casi duplicadas
+
+Revision ID: 0008_similitud
+Revises: 0007_transiciones_estado
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008_similitud"
+down_revision = "0007_transiciones_estado"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "similitud_firmas",
+        sa.Column("solicitud_id", sa.Integer(), sa.ForeignKey("solicitudes.id"), primary_key=True),
+        sa.Column("firma", sa.LargeBinary(), nullable=False),
+    )
+    op.create_table(
+        "similitud_bandas",
+        sa.Column("banda", sa.SmallInteger(), primary_key=True),
+        sa.Column("valor", sa.BigInteger(), primary_key=True),
+        sa.Column("solicitud_id", sa.Integer(), sa.ForeignKey("solicitudes.id"), primary_key=True),
+    )
+    # Las solicitudes existentes se indexan con scripts/indexar_similitud.py
+
+
+def downgrade():
+    op.drop_table("similitud_bandas")
+    op.drop_table("similitud_firmas")
@@ -0,0 +1,22 @@
+"""Entradas del outbox de Sheets descartadas tras agotar los reintentos
+
+Revision ID: 0009_outbox_descartadas
+Revises: 0008_similitud
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_outbox_descartadas"
+down_revision = "0008_similitud"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("sheets_outbox", sa.Column("fecha_descartado", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column("sheets_outbox", "fecha_descartado")
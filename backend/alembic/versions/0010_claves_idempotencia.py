@@ -0,0 +1,33 @@
+"""Claves de idempotencia persistidas para compartirlas entre instancias
+
+Revision ID: 0010_claves_idempotencia
+Revises: 0009_outbox_descartadas
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010_claves_idempotencia"
+down_revision = "0009_outbox_descartadas"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "claves_idempotencia",
+        sa.Column("clave", sa.String(length=255), primary_key=True),
+        sa.Column("huella", sa.String(length=64), nullable=False),
+        sa.Column("solicitud_id", sa.Integer(), sa.ForeignKey("solicitudes.id"), nullable=True),
+        sa.Column("status", sa.Integer(), nullable=True),
+        sa.Column("respuesta", sa.Text(), nullable=True),
+        sa.Column("fecha_creacion", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("expira", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_claves_idempotencia_expira", "claves_idempotencia", ["expira"])
+
+
+def downgrade():
+    op.drop_index("ix_claves_idempotencia_expira", table_name="claves_idempotencia")
+    op.drop_table("claves_idempotencia")
@@ -0,0 +1,118 @@
+"""Buckets de minutos y extremos en los rollups de tiempo en estado
+
+Revision ID: 0011_buckets_minutos
+Revises: 0010_claves_idempotencia
+Create Date: 2026-10-18
+"""
+from bisect import bisect_left
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+revision = "0011_buckets_minutos"
+down_revision = "0010_claves_idempotencia"
+branch_labels = None
+depends_on = None
+
+COLUMNAS_MINUTOS = ["m01", "m05", "m15", "m30"]
+# Copia fija de models/transicion_estado.py en esta revisión
+BUCKETS_HORAS = (1 / 60, 5 / 60, 15 / 60, 30 / 60, 1, 4, 12, 24, 48, 72, 120, 168, 336, 720, 1440)
+COLUMNAS_BUCKETS = COLUMNAS_MINUTOS + [f"h{i:02d}" for i in range(12)]
+LOTE = 5000
+
+transiciones_estado = sa.table(
+    "transiciones_estado",
+    sa.column("id", sa.Integer()),
+    sa.column("estado_anterior", sa.String()),
+    sa.column("area_solicitante", sa.String()),
+    sa.column("urgencia", sa.String()),
+    sa.column("segundos_en_estado", sa.Float()),
+    sa.column("fecha", sa.DateTime(timezone=True)),
+)
+
+rollups_estado_diario = sa.table(
+    "rollups_estado_diario",
+    sa.column("fecha", sa.Date()),
+    sa.column("estado", sa.String()),
+    sa.column("area_solicitante", sa.String()),
+    sa.column("urgencia", sa.String()),
+    sa.column("cantidad", sa.Integer()),
+    sa.column("suma_segundos", sa.Float()),
+    sa.column("min_segundos", sa.Float()),
+    sa.column("max_segundos", sa.Float()),
+    *[sa.column(c, sa.Integer()) for c in COLUMNAS_BUCKETS],
+)
+
+
+def filas_rollup(transiciones):
+    filas = {}
+    for t in transiciones:
+        segundos = t["segundos_en_estado"]
+        clave = (t["fecha"].date(), t["estado_anterior"], t["area_solicitante"], t["urgencia"])
+        fila = filas.setdefault(clave, {
+            "fecha": clave[0], "estado": clave[1], "area_solicitante": clave[2], "urgencia": clave[3],
+            "cantidad": 0, "suma_segundos": 0.0, "min_segundos": segundos, "max_segundos": segundos,
+            **{c: 0 for c in COLUMNAS_BUCKETS},
+        })
+        fila["cantidad"] += 1
+        fila["suma_segundos"] += segundos
+        fila["min_segundos"] = min(fila["min_segundos"], segundos)
+        fila["max_segundos"] = max(fila["max_segundos"], segundos)
+        fila[COLUMNAS_BUCKETS[bisect_left(BUCKETS_HORAS, segundos / 3600)]] += 1
+    return list(filas.values())
+
+
+def sentencia_rollup(dialecto):
+    insertar = pg_insert if dialecto == "postgresql" else sqlite_insert
+    menor, mayor = (sa.func.least, sa.func.greatest) if dialecto == "postgresql" else (sa.func.min, sa.func.max)
+    stmt = insertar(rollups_estado_diario)
+    c = rollups_estado_diario.c
+    return stmt.on_conflict_do_update(
+        index_elements=[c.fecha, c.estado, c.area_solicitante, c.urgencia],
+        set_={
+            **{n: c[n] + stmt.excluded[n] for n in ["cantidad", "suma_segundos"] + COLUMNAS_BUCKETS},
+            "min_segundos": menor(c.min_segundos, stmt.excluded.min_segundos),
+            "max_segundos": mayor(c.max_segundos, stmt.excluded.max_segundos),
+        },
+    )
+
+
+def upgrade():
+    with op.batch_alter_table("rollups_estado_diario") as batch:
+        batch.add_column(sa.Column("min_segundos", sa.Float(), nullable=True))
+        batch.add_column(sa.Column("max_segundos", sa.Float(), nullable=True))
+        for columna in COLUMNAS_MINUTOS:
+            batch.add_column(sa.Column(columna, sa.Integer(), nullable=False, server_default="0"))
+
+    # h00 pasa de "hasta 1h" a "de 30min a 1h": se recalculan los rollups desde el historial
+    conn = op.get_bind()
+    conn.execute(sa.text("DELETE FROM rollups_estado_diario"))
+    sentencia = sentencia_rollup(conn.dialect.name)
+    ultimo = 0
+    while True:
+        filas = conn.execute(
+            sa.select(transiciones_estado)
+            .where(transiciones_estado.c.id > ultimo)
+            .where(transiciones_estado.c.estado_anterior.isnot(None))
+            .where(transiciones_estado.c.segundos_en_estado.isnot(None))
+            .order_by(transiciones_estado.c.id)
+            .limit(LOTE)
+        ).mappings().all()
+        if not filas:
+            break
+        ultimo = filas[-1]["id"]
+        rollups = filas_rollup([dict(f) for f in filas])
+        if rollups:
+            conn.execute(sentencia, rollups)
+
+
+def downgrade():
+    op.execute(f"UPDATE rollups_estado_diario SET h00 = h00 + {' + '.join(COLUMNAS_MINUTOS)}")
+    with op.batch_alter_table("rollups_estado_diario") as batch:
+        for columna in COLUMNAS_MINUTOS:
+            batch.drop_column(columna)
+        batch.drop_column("max_segundos")
+        batch.drop_column("min_segundos")
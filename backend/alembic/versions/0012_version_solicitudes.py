@@ -0,0 +1,31 @@
+"""Versión monotónica de escritura para los ETag
+
+Revision ID: 0012_version_solicitudes
+Revises: 0011_buckets_minutos
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012_version_solicitudes"
+down_revision = "0011_buckets_minutos"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "version_solicitudes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("ultima", sa.BigInteger(), nullable=False),
+    )
+    op.add_column("solicitudes", sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"))
+    op.create_index("ix_solicitudes_version", "solicitudes", ["version"])
+
+
+def downgrade():
+    op.drop_index("ix_solicitudes_version", table_name="solicitudes")
+    with op.batch_alter_table("solicitudes") as batch:
+        batch.drop_column("version")
+    op.drop_table("version_solicitudes")
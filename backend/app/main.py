@@ -2,21 +2,44 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 import os
 
-from .models import Base, engine
+from .models import engine, DB_ASYNC, async_engine, DATABASE_READ_URL, read_engine, async_read_engine
 from .models.database import get_db
-from .routers import solicitudes_router
+from .models.pool import estadisticas_pool
+from .routers import solicitudes_router, solicitudes_async_router
+from .services import sheets_outbox_worker, eventos, cache_respuestas, serializacion
+from .services.metricas import registro, instrumentar_engine, Gauge
+from .services.limites import compuerta_escrituras, compuerta_sheets
+from .middleware import (
+    MetricasMiddleware,
+    LecturaPrimariaMiddleware,
+    CacheRespuestasMiddleware,
+    LimiteEscriturasMiddleware,
+    CompresionMiddleware,
+    COMPRESION_MINIMO,
+)
+
+instrumentar_engine(engine)
+if async_engine is not None:
+    instrumentar_engine(async_engine.sync_engine)
+if DATABASE_READ_URL:
+    instrumentar_engine(read_engine)
+    if async_read_engine is not None:
+        instrumentar_engine(async_read_engine.sync_engine)
 
-# Crear tablas (solo en desarrollo)
-Base.metadata.create_all(bind=engine)
+# El esquema lo gestiona Alembic (`alembic upgrade head`); la app no toca la
+# base al importarse para que el arranque en frío no espere un round trip.
 
 app = FastAPI(
     title="Sistema de Solicitudes de Automatización",
     description="API para gestionar solicitudes de automatización de procesos internos",
-    version="1.0.0"
+    version="1.0.0",
+    # Con SERIALIZACION_RAPIDA las respuestas se codifican con orjson
+    default_response_class=serializacion.RespuestaJSON if serializacion.SERIALIZACION_RAPIDA else JSONResponse,
 )
 
 app.add_middleware(
@@ -25,16 +48,63 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag", "Server-Timing"],
 )
 
-app.include_router(solicitudes_router)
+# Dentro de MetricasMiddleware para que los aciertos también se midan
+app.add_middleware(CacheRespuestasMiddleware)
+# También dentro de MetricasMiddleware: los 429 aparecen en http_requests_total
+app.add_middleware(LimiteEscriturasMiddleware)
+app.add_middleware(MetricasMiddleware)
+
+# Fuera de los demás: el cache guarda el cuerpo sin comprimir y se comprime al enviar
+if COMPRESION_MINIMO > 0:
+    app.add_middleware(CompresionMiddleware)
+
+if DATABASE_READ_URL:
+    app.add_middleware(LecturaPrimariaMiddleware)
+
+app.include_router(solicitudes_async_router if DB_ASYNC else solicitudes_router)
+
+# Escrituras de otras instancias (EVENTOS_BACKEND=postgres) vacían el cache local
+eventos.difusor.agregar_oyente(cache_respuestas.invalidar_por_evento)
+
+
+@app.on_event("startup")
+def iniciar_sheets_outbox():
+    sheets_outbox_worker.start()
+    if eventos.EVENTOS_BACKEND == "postgres":
+        eventos.escucha_postgres.start()
+
+
+@app.on_event("shutdown")
+async def detener_sheets_outbox():
+    sheets_outbox_worker.stop()
+    eventos.escucha_postgres.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+    if async_read_engine is not None:
+        await async_read_engine.dispose()
+
 
 frontend_path = os.path.join(os.path.dirname(__file__), "..", "..", "frontend")
 
+# Los archivos estáticos ya responden con ETag/Last-Modified; se agrega max-age
+# para que el navegador no los revalide en cada carga.
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "3600"))
+
+
+class CachedStaticFiles(StaticFiles):
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE}"
+        return response
+
+
 if os.path.exists(os.path.join(frontend_path, "static")):
     app.mount(
         "/static",
-        StaticFiles(directory=os.path.join(frontend_path, "static")),
+        CachedStaticFiles(directory=os.path.join(frontend_path, "static")),
         name="static",
     )
 
@@ -50,5 +120,56 @@ async def root():
 @app.get("/health")
 async def health_check(db: Session = Depends(get_db)):
     # Probar la conexión a la BD de verdad
-    db.execute("SELECT 1")
+    db.execute(text("SELECT 1"))
     return {"status": "healthy", "service": "solicitudes-automatizacion"}
+
+
+@app.get("/health/db/pool")
+def pool_health():
+    datos = {"sync": estadisticas_pool(engine)}
+    if async_engine is not None:
+        datos["async"] = estadisticas_pool(async_engine.sync_engine)
+    if DATABASE_READ_URL:
+        datos["read"] = estadisticas_pool(read_engine)
+        if async_read_engine is not None:
+            datos["async_read"] = estadisticas_pool(async_read_engine.sync_engine)
+    return datos
+
+
+@app.get("/health/sheets")
+def sheets_health():
+    return {
+        "pendientes": sheets_outbox_worker.pendientes(),
+        "descartadas": sheets_outbox_worker.descartadas(),
+        "lotes": sheets_outbox_worker.metricas.resumen(),
+        "espera_compuerta_s": round(compuerta_sheets.espera(), 2),
+    }
+
+
+def _pool_gauge(clave):
+    def leer():
+        datos = estadisticas_pool(engine)
+        return datos.get(clave, 0)
+    return leer
+
+
+registro.registrar(Gauge("db_pool_checked_out", "Conexiones del pool en uso", _pool_gauge("checked_out")))
+registro.registrar(Gauge("db_pool_overflow", "Conexiones abiertas por encima de pool_size", _pool_gauge("overflow")))
+registro.registrar(Gauge("sse_suscriptores", "Conexiones SSE abiertas en esta instancia", eventos.difusor.cantidad))
+registro.registrar(Gauge(
+    "escrituras_en_curso", "Escrituras dentro de la compuerta de concurrencia", lambda: compuerta_escrituras.en_curso
+))
+registro.registrar(Gauge(
+    "sheets_espera_segundos", "Segundos hasta poder llamar a Google Sheets (cuota o límite)", compuerta_sheets.espera
+))
+registro.registrar(Gauge(
+    "sheets_outbox_pending", "Operaciones pendientes en el outbox de Sheets", sheets_outbox_worker.pendientes
+))
+registro.registrar(Gauge(
+    "sheets_outbox_descartadas", "Operaciones descartadas tras agotar los reintentos", sheets_outbox_worker.descartadas
+))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registro.exponer(), media_type="text/plain; version=0.0.4")
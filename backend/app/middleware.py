@@ -0,0 +1,305 @@
+# app/middleware.py
+import os
+import json
+import time
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.routing import Match
+
+from .models.database import COOKIE_LECTURA_PRIMARIA, DB_READ_PRIMARIA_SEGUNDOS
+from .services.cache import cache_respuestas
+from .services.limites import (
+    LIMITE_SALTOS_PROXY,
+    MOTIVO_CONCURRENCIA,
+    compuerta_escrituras,
+    limitador_escrituras,
+    limite_rechazos,
+    segundos_reintento,
+)
+
+from .services.metricas import (
+    TiemposRequest,
+    tiempos_request,
+    http_duracion,
+    http_requests,
+    sql_por_request,
+)
+
+# /metrics no se mide a sí misma; el stream SSE dura lo que la conexión abierta
+RUTAS_SIN_METRICAS = {"/metrics", "/api/solicitudes/stream"}
+# Bytes a partir de los cuales se comprime una respuesta; 0 desactiva
+COMPRESION_MINIMO = int(os.getenv("COMPRESION_MINIMO", "1024"))
+# El compresor retendría los eventos SSE en su buffer
+RUTAS_SIN_COMPRESION = {"/api/solicitudes/stream"}
+
+
+def plantilla_ruta(app, scope) -> str:
+    """Ruta con parámetros sin expandir (/api/solicitudes/{solicitud_id}) para no disparar la cardinalidad."""
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "sin_ruta"
+
+
+class MetricasMiddleware:
+    """
+    Mide cada request HTTP: latencia por ruta, cantidad y tiempo de
+    sentencias SQL y de llamadas a Sheets. Los totales del request se
+    devuelven en el header Server-Timing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tiempos = TiemposRequest()
+        token = tiempos_request.set(tiempos)
+        inicio = time.perf_counter()
+        codigo = 500
+
+        async def send_con_timing(message):
+            nonlocal codigo
+            if message["type"] == "http.response.start":
+                codigo = message["status"]
+                total = (time.perf_counter() - inicio) * 1000
+                valor = (
+                    f"db;desc=\"{tiempos.sql_cantidad} queries\";dur={tiempos.sql_tiempo * 1000:.1f}, "
+                    f"sheets;desc=\"{tiempos.sheets_cantidad} calls\";dur={tiempos.sheets_tiempo * 1000:.1f}, "
+                    f"app;dur={total:.1f}"
+                )
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", valor.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_timing)
+        finally:
+            tiempos_request.reset(token)
+            ruta = plantilla_ruta(scope.get("app"), scope)
+            if ruta not in RUTAS_SIN_METRICAS:
+                duracion = time.perf_counter() - inicio
+                http_duracion.observar(duracion, metodo=scope["method"], ruta=ruta)
+                http_requests.inc(metodo=scope["method"], ruta=ruta, codigo=str(codigo))
+                sql_por_request.observar(tiempos.sql_cantidad, ruta=ruta)
+
+
+class LecturaPrimariaMiddleware:
+    """
+    Read-your-writes con réplica de lectura: tras una escritura exitosa marca
+    al cliente con una cookie de vida corta para que sus lecturas vayan a la
+    primaria mientras la réplica se pone al día.
+    """
+
+    METODOS_ESCRITURA = {"POST", "PUT", "PATCH", "DELETE"}
+
+    def __init__(self, app):
+        self.app = app
+        self.cookie = (
+            f"{COOKIE_LECTURA_PRIMARIA}=1; Max-Age={DB_READ_PRIMARIA_SEGUNDOS}; Path=/; HttpOnly; SameSite=Lax"
+        ).encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in self.METODOS_ESCRITURA:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_con_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", self.cookie)]
+            await send(message)
+
+        await self.app(scope, receive, send_con_cookie)
+
+
+class CacheRespuestasMiddleware:
+    """
+    Sirve desde cache_respuestas los GET de RUTAS_CACHEABLES sin tocar la base.
+    Un acierto responde 304 si el If-None-Match coincide con el ETag guardado.
+    Se omite para clientes que acaban de escribir (cookie de lectura primaria).
+    """
+
+    RUTAS_CACHEABLES = {
+        "/api/solicitudes/",
+        "/api/solicitudes/{solicitud_id}",
+        "/api/solicitudes/{solicitud_id}/similares",
+        "/api/solicitudes/estadisticas/resumen",
+    }
+
+    def __init__(self, app, cache=cache_respuestas):
+        self.app = app
+        self.cache = cache
+
+    async def _en_hilo(self, funcion, *args):
+        # El cliente de Redis es bloqueante: no ocupar el event loop
+        if self.cache.backend.compartido:
+            return await run_in_threadpool(funcion, *args)
+        return funcion(*args)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.cache.activo:
+            await self.app(scope, receive, send)
+            return
+
+        plantilla = plantilla_ruta(scope.get("app"), scope)
+        headers = Headers(scope=scope)
+        if plantilla not in self.RUTAS_CACHEABLES or COOKIE_LECTURA_PRIMARIA in headers.get("cookie", ""):
+            await self.app(scope, receive, send)
+            return
+
+        clave = self.cache.clave(scope["path"], scope.get("query_string", b""))
+        guardada, generacion = await self._en_hilo(self.cache.obtener, clave, plantilla)
+        if guardada is not None:
+            await self._responder(guardada, headers, send)
+            return
+
+        inicio = {}
+        cuerpo = []
+
+        async def send_capturando(message):
+            if message["type"] == "http.response.start":
+                inicio.update(message)
+            elif message["type"] == "http.response.body":
+                cuerpo.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, send_capturando)
+
+        if inicio.get("status") == 200:
+            guardar = [
+                (k, v) for k, v in inicio.get("headers", [])
+                if k.lower() not in (b"server-timing", b"set-cookie")
+            ]
+            # Con la generación de la búsqueda: si una escritura invalidó el
+            # cache mientras se armaba la respuesta, no se guarda
+            await self._en_hilo(self.cache.guardar, clave, generacion, 200, guardar, b"".join(cuerpo))
+
+    @staticmethod
+    async def _responder(guardada: dict, headers: Headers, send):
+        respuesta_headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in guardada["headers"]]
+        etag_guardado = next((v for k, v in guardada["headers"] if k.lower() == "etag"), None)
+        if_none_match = headers.get("if-none-match")
+
+        if etag_guardado and if_none_match:
+            candidatos = {v.strip().removeprefix("W/") for v in if_none_match.split(",")}
+            if if_none_match.strip() == "*" or etag_guardado.removeprefix("W/") in candidatos:
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(k, v) for k, v in respuesta_headers if k.lower() in (b"etag", b"cache-control")],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        await send({
+            "type": "http.response.start",
+            "status": guardada["status"],
+            "headers": respuesta_headers + [(b"x-cache", b"HIT")],
+        })
+        await send({"type": "http.response.body", "body": guardada["cuerpo"].encode("utf-8")})
+
+
+def cliente_de_scope(scope) -> str:
+    """
+    IP del cliente para los límites por cliente. Detrás de LIMITE_SALTOS_PROXY
+    proxies se toma la entrada de X-Forwarded-For que agregó el más externo:
+    las anteriores las puede escribir el propio cliente.
+    """
+    if LIMITE_SALTOS_PROXY > 0:
+        reenviado = Headers(scope=scope).get("x-forwarded-for")
+        if reenviado:
+            entradas = [e.strip() for e in reenviado.split(",") if e.strip()]
+            if entradas:
+                return entradas[-min(LIMITE_SALTOS_PROXY, len(entradas))]
+    cliente = scope.get("client")
+    return cliente[0] if cliente else "desconocido"
+
+
+class LimiteEscriturasMiddleware:
+    """
+    Control de admisión de las escrituras de la API: token bucket por cliente
+    y global, y un máximo de escrituras simultáneas. Lo que no entra se
+    responde con 429 y Retry-After en lugar de acumularse sobre la base.
+    """
+
+    METODOS_ESCRITURA = {"POST", "PUT", "PATCH", "DELETE"}
+
+    def __init__(self, app, limitador=limitador_escrituras, compuerta=compuerta_escrituras):
+        self.app = app
+        self.limitador = limitador
+        self.compuerta = compuerta
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.METODOS_ESCRITURA
+            or not scope["path"].startswith("/api/")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if self.limitador.activo:
+            rechazo = self.limitador.admitir(cliente_de_scope(scope))
+            if rechazo is not None:
+                motivo, espera = rechazo
+                await self._rechazar(send, motivo, espera)
+                return
+
+        if not self.compuerta.activo:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.compuerta.entrar():
+            await self._rechazar(send, MOTIVO_CONCURRENCIA, self.compuerta.espera)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.compuerta.salir()
+
+    @staticmethod
+    async def _rechazar(send, motivo: str, espera: float):
+        limite_rechazos.inc(motivo=motivo)
+        cuerpo = json.dumps({"detail": "Demasiadas solicitudes, intente nuevamente en unos segundos"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(cuerpo)).encode()),
+                (b"retry-after", segundos_reintento(espera).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": cuerpo})
+
+
+class CompresionMiddleware:
+    """
+    Comprime las respuestas de más de `minimo` bytes según Accept-Encoding:
+    brotli si está instalado brotli-asgi (con gzip como alternativa), si no
+    solo gzip.
+    """
+
+    def __init__(self, app, minimo: int = COMPRESION_MINIMO):
+        self.app = app
+        try:
+            from brotli_asgi import BrotliMiddleware
+
+            self.comprimida = BrotliMiddleware(app, quality=4, minimum_size=minimo, gzip_fallback=True)
+        except ImportError:
+            self.comprimida = GZipMiddleware(app, minimum_size=minimo, compresslevel=6)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in RUTAS_SIN_COMPRESION:
+            await self.app(scope, receive, send)
+            return
+        await self.comprimida(scope, receive, send)
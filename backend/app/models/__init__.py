@@ -1,2 +1,24 @@
-from .database import Base, engine, get_db, SessionLocal
+from .database import (
+    Base,
+    engine,
+    get_db,
+    SessionLocal,
+    DB_ASYNC,
+    async_engine,
+    get_async_db,
+    AsyncSessionLocal,
+    DATABASE_READ_URL,
+    read_engine,
+    async_read_engine,
+    get_read_db,
+    get_async_read_db,
+    escritura_reciente,
+)
 from .solicitud import Solicitud, AreaSolicitante, Urgencia, Estado, Impacto
+from .sheets_outbox import SheetsOutbox
+from .sheets_fila import SheetsFila
+from .sheets_metadato import SheetsMetadato
+from .contador_solicitud import ContadorSolicitud, VersionSolicitudes
+from .transicion_estado import TransicionEstado, RollupEstadoDiario
+from .similitud import SimilitudFirma, SimilitudBanda
+from .clave_idempotencia import ClaveIdempotencia
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from .database import Base
+
+
+class ClaveIdempotencia(Base):
+    """
+    Respuesta de cada alta con Idempotency-Key, compartida entre instancias.
+    La fila se inserta y se completa en la misma transacción que la solicitud:
+    solo es visible si la solicitud quedó guardada.
+    """
+    __tablename__ = "claves_idempotencia"
+
+    clave = Column(String(255), primary_key=True)
+    # sha256 del cuerpo, para rechazar la misma clave con otro contenido
+    huella = Column(String(64), nullable=False)
+    solicitud_id = Column(Integer, ForeignKey("solicitudes.id"), nullable=True)
+    status = Column(Integer, nullable=True)
+    respuesta = Column(Text, nullable=True)
+    fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
+    expira = Column(DateTime(timezone=True), nullable=False, index=True)
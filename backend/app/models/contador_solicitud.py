@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Column, Integer, String
+from .database import Base
+
+
+class ContadorSolicitud(Base):
+    """Último correlativo usado por día para numero_solicitud (AUTO-AAAAMMDD-NNNNNN)."""
+    __tablename__ = "contadores_solicitud"
+
+    fecha = Column(String(8), primary_key=True)
+    ultimo = Column(Integer, nullable=False)
+
+
+class VersionSolicitudes(Base):
+    """
+    Última versión asignada a una escritura de solicitudes (una sola fila,
+    id=1). Cada alta o modificación la incrementa y la guarda en
+    solicitudes.version: a diferencia de now(), el orden sigue al de los commits.
+    """
+    __tablename__ = "version_solicitudes"
+
+    id = Column(Integer, primary_key=True)
+    ultima = Column(BigInteger, nullable=False)
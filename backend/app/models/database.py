@@ -3,9 +3,12 @@ import os
 from pathlib import Path
 
 from dotenv import load_dotenv
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from .pool import opciones_engine
+
 # === Cargar .env ===
 # Asumiendo que .env está en la raíz del proyecto: solicitudes/.env
 # database.py está en: solicitudes/backend/app/models/database.py
@@ -22,7 +25,7 @@ engine = create_engine(
     DATABASE_URL,
     echo=False,
     future=True,
-    pool_pre_ping=True,
+    **opciones_engine(DATABASE_URL),
 )
 
 SessionLocal = sessionmaker(
@@ -40,3 +43,111 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# === Réplica de lectura (opcional) ===
+# Listado, detalle y estadísticas leen de DATABASE_READ_URL. Un cliente que
+# acaba de escribir trae la cookie de lectura primaria (ver middleware.py) y
+# lee de la primaria durante DB_READ_PRIMARIA_SEGUNDOS para ver sus cambios.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+DB_READ_PRIMARIA_SEGUNDOS = int(os.getenv("DB_READ_PRIMARIA_SEGUNDOS", "10"))
+COOKIE_LECTURA_PRIMARIA = "leer_primaria"
+
+if DATABASE_READ_URL:
+    read_engine = create_engine(
+        DATABASE_READ_URL,
+        echo=False,
+        future=True,
+        **opciones_engine(DATABASE_READ_URL),
+    )
+    ReadSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=read_engine,
+    )
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
+
+def escritura_reciente(request: Request) -> bool:
+    return DATABASE_READ_URL is not None and COOKIE_LECTURA_PRIMARIA in request.cookies
+
+
+def usar_primaria(request: Request) -> bool:
+    return DATABASE_READ_URL is None or escritura_reciente(request)
+
+
+def get_read_db(request: Request):
+    db = SessionLocal() if usar_primaria(request) else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# === Ruta asíncrona (opcional) ===
+# Con DB_ASYNC=true los endpoints usan create_async_engine + asyncpg
+# (o aiosqlite para SQLite local) en lugar del pool síncrono.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        async_database_url(DATABASE_URL),
+        echo=False,
+        **opciones_engine(DATABASE_URL, async_=True),
+    )
+
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+async_read_engine = None
+AsyncReadSessionLocal = None
+
+if DB_ASYNC and DATABASE_READ_URL:
+    async_read_engine = create_async_engine(
+        async_database_url(DATABASE_READ_URL),
+        echo=False,
+        **opciones_engine(DATABASE_READ_URL, async_=True),
+    )
+
+    AsyncReadSessionLocal = async_sessionmaker(
+        bind=async_read_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    fabrica = AsyncSessionLocal if usar_primaria(request) else AsyncReadSessionLocal
+    async with fabrica() as db:
+        yield db
@@ -0,0 +1,122 @@
+# app/models/pool.py
+import os
+import threading
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+# === Configuración del pool (variables de entorno) ===
+# DB_POOL_MODE=queue usa un pool propio por instancia; DB_POOL_MODE=null no
+# mantiene conexiones abiertas (NullPool), pensado para PgBouncer en modo
+# transaction o para escalar a muchas instancias sin agotar Postgres.
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# El pre-ping agrega un round trip en cada checkout; con DB_POOL_RECYCLE menor
+# que el timeout de inactividad del servidor suele poder desactivarse.
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+
+class MetricasPool:
+    """Tiempo que los requests esperan para obtener una conexión del pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        self.timeouts = 0
+
+    def registrar(self, espera: float, timeout: bool = False):
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.espera_total += espera
+            self.espera_max = max(self.espera_max, espera)
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "espera_promedio_ms": round(self.espera_total / self.checkouts * 1000, 3) if self.checkouts else 0,
+                "espera_max_ms": round(self.espera_max * 1000, 3),
+            }
+
+
+class _EsperaMedida:
+    """
+    Métricas propias de cada pool: el primario y la réplica usan la misma
+    clase y no deben mezclar sus esperas.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metricas = MetricasPool()
+
+    def recreate(self):
+        # dispose()/invalidación crean un pool nuevo del mismo engine: conservar lo medido
+        nuevo = super().recreate()
+        nuevo.metricas = self.metricas
+        return nuevo
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except Exception:
+            self.metricas.registrar(0, timeout=True)
+            raise
+        self.metricas.registrar(time.perf_counter() - inicio)
+        return conexion
+
+
+class QueuePoolMedido(_EsperaMedida, QueuePool):
+    pass
+
+
+class AsyncQueuePoolMedido(_EsperaMedida, AsyncAdaptedQueuePool):
+    pass
+
+
+def opciones_engine(url: str, async_: bool = False) -> dict:
+    """kwargs de create_engine/create_async_engine según la configuración del pool."""
+    opciones = {"pool_pre_ping": DB_POOL_PRE_PING}
+
+    if DB_POOL_MODE == "null":
+        opciones["poolclass"] = NullPool
+        return opciones
+
+    if url.startswith("sqlite"):
+        # SQLite usa su propio pool por defecto (en memoria no admite QueuePool)
+        return opciones
+
+    opciones.update(
+        poolclass=AsyncQueuePoolMedido if async_ else QueuePoolMedido,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return opciones
+
+
+def estadisticas_pool(engine) -> dict:
+    pool = engine.pool
+    datos = {"modo": DB_POOL_MODE, "clase": type(pool).__name__, "pre_ping": DB_POOL_PRE_PING}
+
+    if isinstance(pool, QueuePool):
+        datos.update(
+            tamano=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            max_overflow=DB_MAX_OVERFLOW,
+        )
+    if isinstance(pool, _EsperaMedida):
+        datos["espera"] = pool.metricas.resumen()
+    return datos
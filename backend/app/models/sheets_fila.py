@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from .database import Base
+
+
+class SheetsFila(Base):
+    """Índice persistido numero_solicitud -> número de fila en la hoja 'Solicitudes'."""
+    __tablename__ = "sheets_filas"
+
+    numero_solicitud = Column(String(20), primary_key=True)
+    fila = Column(Integer, nullable=False)
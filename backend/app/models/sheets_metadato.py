@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, Text
+from .database import Base
+
+
+class SheetsMetadato(Base):
+    """Valores clave/valor de la sincronización con Sheets (p. ej. el watermark de reconciliación)."""
+    __tablename__ = "sheets_metadatos"
+
+    clave = Column(String(50), primary_key=True)
+    valor = Column(Text, nullable=True)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from .database import Base
+
+
+class SheetsOutbox(Base):
+    """
+    Operaciones pendientes de sincronizar con Google Sheets.
+
+    Se escriben en la misma transacción que la Solicitud y las drena el
+    worker de services/sheets_outbox.py con reintentos y backoff. Una entrada
+    que agota SHEETS_OUTBOX_MAX_INTENTOS queda con fecha_descartado (dead
+    letter) y deja de bloquear la cola; la reconciliación la corrige.
+    """
+    __tablename__ = "sheets_outbox"
+
+    OP_APPEND = "append"
+    OP_UPDATE_ESTADO = "update_estado"
+
+    id = Column(Integer, primary_key=True, index=True)
+    solicitud_id = Column(Integer, ForeignKey("solicitudes.id"), nullable=False, index=True)
+    operacion = Column(String(30), nullable=False)
+    intentos = Column(Integer, nullable=False, default=0)
+    proximo_intento = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    ultimo_error = Column(Text, nullable=True)
+    fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
+    fecha_procesado = Column(DateTime(timezone=True), nullable=True, index=True)
+    fecha_descartado = Column(DateTime(timezone=True), nullable=True)
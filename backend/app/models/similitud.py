@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, SmallInteger, BigInteger, LargeBinary, ForeignKey
+from .database import Base
+
+
+class SimilitudFirma(Base):
+    """Firma MinHash de titulo_proceso + descripcion_proceso (ver services/similitud.py)."""
+    __tablename__ = "similitud_firmas"
+
+    solicitud_id = Column(Integer, ForeignKey("solicitudes.id"), primary_key=True)
+    firma = Column(LargeBinary, nullable=False)
+
+
+class SimilitudBanda(Base):
+    """
+    Índice LSH: una fila por banda de la firma. Dos solicitudes con algún
+    (banda, valor) en común son candidatas a duplicado; la llave primaria
+    resuelve la búsqueda por (banda, valor) sin recorrer la tabla.
+    """
+    __tablename__ = "similitud_bandas"
+
+    banda = Column(SmallInteger, primary_key=True)
+    valor = Column(BigInteger, primary_key=True)
+    solicitud_id = Column(Integer, ForeignKey("solicitudes.id"), primary_key=True)
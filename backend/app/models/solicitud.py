@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum
+from sqlalchemy import BigInteger, Column, Integer, String, Text, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from .database import Base
 import enum
@@ -38,6 +38,15 @@ class Impacto(str, enum.Enum):
 
 class Solicitud(Base):
     __tablename__ = "solicitudes"
+    # Índices para el listado paginado por (fecha_creacion, id) con y sin filtros
+    __table_args__ = (
+        Index("ix_solicitudes_fecha_id", "fecha_creacion", "id"),
+        Index("ix_solicitudes_estado_fecha_id", "estado", "fecha_creacion", "id"),
+        Index("ix_solicitudes_area_fecha_id", "area_solicitante", "fecha_creacion", "id"),
+        Index("ix_solicitudes_area_estado_fecha_id", "area_solicitante", "estado", "fecha_creacion", "id"),
+    )
+    # Traer fecha_creacion/fecha_actualizacion con RETURNING en el mismo flush
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     numero_solicitud = Column(String(20), unique=True, index=True)
@@ -56,5 +65,10 @@ class Solicitud(Base):
     enlaces_documentacion = Column(Text, nullable=True)
     estado = Column(SQLEnum(Estado), default=Estado.RECIBIDO)
     fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
-    fecha_actualizacion = Column(DateTime(timezone=True), onupdate=func.now())
+    fecha_actualizacion = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
+    # Versión de la última escritura (services/numeracion.reservar_version): base de los ETag
+    version = Column(BigInteger, nullable=False, default=0, server_default="0", index=True)
+    # Momento en que entró al estado actual (para medir el tiempo en cada estado).
+    # Default del lado del INSERT y no de la tabla: SQLite no admite ADD COLUMN con now().
+    fecha_estado = Column(DateTime(timezone=True), default=func.now())
     notas_internas = Column(Text, nullable=True)
@@ -0,0 +1,63 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from .database import Base
+
+# Límites superiores (en horas) de los buckets del histograma de tiempo en
+# estado; el último bucket acumula todo lo que supera el mayor límite. Los
+# primeros van en minutos: muchas transiciones se hacen enseguida y un único
+# bucket de 0 a 1h las informaba como media hora.
+BUCKETS_MINUTOS = (1, 5, 15, 30)
+BUCKETS_HORAS = tuple(m / 60 for m in BUCKETS_MINUTOS) + (1, 4, 12, 24, 48, 72, 120, 168, 336, 720, 1440)
+COLUMNAS_BUCKETS = tuple(f"m{m:02d}" for m in BUCKETS_MINUTOS) + tuple(f"h{i:02d}" for i in range(12))
+
+
+class TransicionEstado(Base):
+    """Historial append-only de cambios de estado de una solicitud."""
+    __tablename__ = "transiciones_estado"
+
+    id = Column(Integer, primary_key=True, index=True)
+    solicitud_id = Column(Integer, ForeignKey("solicitudes.id"), nullable=False, index=True)
+    estado_anterior = Column(String(30), nullable=True)
+    estado_nuevo = Column(String(30), nullable=False)
+    area_solicitante = Column(String(50), nullable=False)
+    urgencia = Column(String(20), nullable=False)
+    # Tiempo que la solicitud pasó en estado_anterior
+    segundos_en_estado = Column(Float, nullable=True)
+    fecha = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class RollupEstadoDiario(Base):
+    """
+    Agregado diario de salidas de cada estado por área y urgencia: cantidad,
+    suma de tiempos e histograma por buckets para estimar mediana y p90 sin
+    recorrer el historial. Se actualiza con un upsert por transición.
+    """
+    __tablename__ = "rollups_estado_diario"
+
+    fecha = Column(Date, primary_key=True)
+    estado = Column(String(30), primary_key=True)
+    area_solicitante = Column(String(50), primary_key=True)
+    urgencia = Column(String(20), primary_key=True)
+    cantidad = Column(Integer, nullable=False, default=0)
+    suma_segundos = Column(Float, nullable=False, default=0)
+    # Extremos observados: acotan la interpolación de mediana y p90
+    min_segundos = Column(Float, nullable=True)
+    max_segundos = Column(Float, nullable=True)
+    # Cantidad por bucket de BUCKETS_HORAS: m01 <= 1min, m05 <= 5min, m15, m30,
+    # h00 <= 1h, h01 <= 4h, ..., h11 > 1440h
+    m01 = Column(Integer, nullable=False, default=0)
+    m05 = Column(Integer, nullable=False, default=0)
+    m15 = Column(Integer, nullable=False, default=0)
+    m30 = Column(Integer, nullable=False, default=0)
+    h00 = Column(Integer, nullable=False, default=0)
+    h01 = Column(Integer, nullable=False, default=0)
+    h02 = Column(Integer, nullable=False, default=0)
+    h03 = Column(Integer, nullable=False, default=0)
+    h04 = Column(Integer, nullable=False, default=0)
+    h05 = Column(Integer, nullable=False, default=0)
+    h06 = Column(Integer, nullable=False, default=0)
+    h07 = Column(Integer, nullable=False, default=0)
+    h08 = Column(Integer, nullable=False, default=0)
+    h09 = Column(Integer, nullable=False, default=0)
+    h10 = Column(Integer, nullable=False, default=0)
+    h11 = Column(Integer, nullable=False, default=0)
@@ -1 +1,2 @@
 from .solicitudes import router as solicitudes_router
+from .solicitudes_async import router as solicitudes_async_router
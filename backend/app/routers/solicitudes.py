@@ -1,132 +1,386 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-import uuid
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta, timezone
+import base64
+import json
 
-from ..models import get_db, Solicitud
-from ..schemas import SolicitudCreate, SolicitudResponse, SolicitudListResponse, SolicitudUpdate
-from ..services import google_sheets_service
+from ..models import get_db, get_read_db, escritura_reciente, SessionLocal, Solicitud
+from ..schemas import (
+    SolicitudCreate,
+    SolicitudResponse,
+    SolicitudListResponse,
+    SolicitudUpdate,
+    SolicitudBusquedaResponse,
+    SolicitudSimilar,
+    SolicitudCreadaResponse,
+    SolicitudBulkUpdate,
+    SolicitudBulkResponse,
+)
+from ..services import (
+    estadisticas_cache,
+    calcular_estadisticas,
+    consulta_busqueda,
+    busqueda,
+    masivo,
+    exportacion,
+    etag,
+    reservar_numeros,
+    reservar_version,
+    eventos,
+    transiciones,
+    almacen_idempotencia,
+    serializacion,
+    similitud,
+    escrituras,
+)
 
 router = APIRouter(prefix="/api/solicitudes", tags=["solicitudes"])
 
 
-def generate_numero_solicitud() -> str:
-    timestamp = datetime.now().strftime("%Y%m%d")
-    unique_id = str(uuid.uuid4())[:6].upper()
-    return f"AUTO-{timestamp}-{unique_id}"
+@router.post("/", response_model=SolicitudCreadaResponse, status_code=status.HTTP_201_CREATED)
+def crear_solicitud(
+    solicitud: SolicitudCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db)
+):
+    if idempotency_key:
+        previa = escrituras.respuesta_idempotencia(response, *almacen_idempotencia.reservar(
+            db, idempotency_key, escrituras.huella_alta(solicitud)
+        ))
+        if previa is not None:
+            return previa
 
+    firma = similitud.firma_de(solicitud.titulo_proceso, solicitud.descripcion_proceso)
+    # Antes de indexar la nueva, para que no se encuentre a sí misma
+    similares = similitud.similares(db, firma) if similitud.SIMILARES_EN_ALTA else []
+    numero_solicitud, = reservar_numeros(db)
 
-@router.post("/", response_model=SolicitudResponse, status_code=status.HTTP_201_CREATED)
-def crear_solicitud(solicitud: SolicitudCreate, db: Session = Depends(get_db)):
-    numero_solicitud = generate_numero_solicitud()
+    db_solicitud = escrituras.nueva_solicitud(db, solicitud, numero_solicitud, reservar_version(db))
+    db.flush()
+    respuesta, sentencias = escrituras.completar_alta(db, db_solicitud, firma, similares)
+    for sentencia, filas in sentencias:
+        db.execute(sentencia, filas)
+    if idempotency_key:
+        almacen_idempotencia.guardar(
+            db, idempotency_key, db_solicitud.id, status.HTTP_201_CREATED, respuesta.model_dump(mode="json")
+        )
+    db.commit()
 
-    db_solicitud = Solicitud(
-        numero_solicitud=numero_solicitud,
-        **solicitud.model_dump()
-    )
+    escrituras.tras_commit()
+    return respuesta
 
-    db.add(db_solicitud)
-    db.commit()
-    db.refresh(db_solicitud)
-
-    sheets_data = {
-        "numero_solicitud": db_solicitud.numero_solicitud,
-        "fecha_creacion": db_solicitud.fecha_creacion.isoformat(),
-        "area_solicitante": db_solicitud.area_solicitante.value,
-        "nombre_solicitante": db_solicitud.nombre_solicitante,
-        "email_solicitante": db_solicitud.email_solicitante,
-        "titulo_proceso": db_solicitud.titulo_proceso,
-        "descripcion_proceso": db_solicitud.descripcion_proceso,
-        "situacion_actual": db_solicitud.situacion_actual,
-        "resultado_esperado": db_solicitud.resultado_esperado,
-        "urgencia": db_solicitud.urgencia.value,
-        "impacto": db_solicitud.impacto.value,
-        "frecuencia_proceso": db_solicitud.frecuencia_proceso or "",
-        "tiempo_manual_estimado": db_solicitud.tiempo_manual_estimado or "",
-        "sistemas_involucrados": db_solicitud.sistemas_involucrados or "",
-        "enlaces_documentacion": db_solicitud.enlaces_documentacion or "",
-        "estado": db_solicitud.estado.value,
-    }
-
-    google_sheets_service.append_solicitud(sheets_data)
-
-    return db_solicitud
+
+def encode_cursor(solicitud: Solicitud) -> str:
+    data = {"f": solicitud.fecha_creacion.isoformat(), "id": solicitud.id}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["f"]), int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+
+# Página más grande del listado; para traer todo está /export
+LISTADO_MAX = 500
+
+# Solo las columnas de SolicitudListResponse: evita leer los campos Text largos
+COLUMNAS_LISTADO = [getattr(Solicitud, campo) for campo in SolicitudListResponse.model_fields]
+# Detalle proyectado para la serialización rápida (filas, no objetos del ORM)
+COLUMNAS_DETALLE = [getattr(Solicitud, campo) for campo in SolicitudResponse.model_fields]
+
+
+def consulta_listado(
+    skip: int,
+    limit: int,
+    area: Optional[str],
+    estado: Optional[str],
+    cursor: Optional[str],
+    columnas=COLUMNAS_LISTADO,
+):
+    """SELECT del listado. Con limit=None devuelve todas las filas (exportación)."""
+    query = select(*columnas)
+
+    if area:
+        query = query.where(Solicitud.area_solicitante == area)
+
+    if estado:
+        query = query.where(Solicitud.estado == estado)
+
+    if cursor:
+        fecha, ultimo_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                Solicitud.fecha_creacion < fecha,
+                and_(Solicitud.fecha_creacion == fecha, Solicitud.id < ultimo_id),
+            )
+        )
+    elif skip:
+        query = query.offset(skip)
+
+    query = query.order_by(Solicitud.fecha_creacion.desc(), Solicitud.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+@router.post("/bulk", response_model=SolicitudBulkResponse)
+def crear_solicitudes_bulk(items: List[Dict[str, Any]], db: Session = Depends(get_db)):
+    """
+    Crea varias solicitudes en una sola transacción con un INSERT por lotes.
+    Cada elemento se valida por separado; los inválidos se reportan en
+    `resultados` sin impedir que se inserten los demás.
+    """
+    masivo.validar_tamano(items)
+    validos, resultados = masivo.validar_items(items, SolicitudCreate)
+
+    if validos:
+        numeros = reservar_numeros(db, len(validos))
+        filas = masivo.filas_alta(validos, numeros, reservar_version(db))
+        creadas = db.execute(masivo.sentencia_insertar_solicitudes(), filas).all()
+        creados, sentencias = masivo.completar_alta(db, validos, filas, creadas)
+        for sentencia, parametros in sentencias:
+            db.execute(sentencia, parametros)
+        db.commit()
+
+        resultados += creados
+        escrituras.tras_commit()
+
+    return masivo.armar_respuesta(resultados)
+
+
+@router.patch("/bulk", response_model=SolicitudBulkResponse)
+def actualizar_solicitudes_bulk(items: List[Dict[str, Any]], db: Session = Depends(get_db)):
+    """
+    Actualiza estado y/o notas de varias solicitudes en una sola transacción
+    con un UPDATE por lotes. Cada elemento debe incluir `id`.
+    """
+    masivo.validar_tamano(items)
+    validos, resultados = masivo.validar_items(items, SolicitudBulkUpdate)
+
+    existentes = db.execute(masivo.sentencia_ids_existentes([item.id for _, item in validos])).all() if validos else []
+    version = reservar_version(db) if existentes else 0
+    actualizados, sentencias, con_estado = masivo.planear_actualizacion(db, validos, existentes, version)
+    resultados += actualizados
+
+    if sentencias:
+        for sentencia, parametros in sentencias:
+            db.execute(sentencia, parametros)
+        db.commit()
+        escrituras.tras_commit(con_estado)
+
+    return masivo.armar_respuesta(resultados)
 
 
 @router.get("/", response_model=List[SolicitudListResponse])
 def listar_solicitudes(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=LISTADO_MAX),
     area: str = None,
     estado: str = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    incluir_total: bool = False,
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Solicitud)
+    """
+    Lista paginada por (fecha_creacion, id) descendente.
 
-    if area:
-        query = query.filter(Solicitud.area_solicitante == area)
+    Con `cursor` (tomado del header X-Next-Cursor de la página anterior) se
+    usa paginación por llave y `skip` se ignora. Con `incluir_total` se
+    devuelve X-Total-Count a partir de los conteos agrupados en cache.
 
-    if estado:
-        query = query.filter(Solicitud.estado == estado)
+    Responde 304 sin ejecutar la consulta si el If-None-Match coincide con
+    el ETag, derivado del watermark de la base y de los parámetros.
+    """
+    watermark = db.execute(etag.consulta_watermark()).one()
+    tag = etag.etag_de_request(request, watermark)
+    if etag.coincide(request, tag):
+        return etag.no_modificado(tag)
+    etag.agregar_headers(response, tag)
 
-    solicitudes = query.order_by(Solicitud.fecha_creacion.desc()).offset(skip).limit(limit).all()
+    solicitudes = db.execute(consulta_listado(skip, limit, area, estado, cursor)).all()
+
+    if solicitudes and len(solicitudes) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(solicitudes[-1])
+
+    if incluir_total:
+        response.headers["X-Total-Count"] = str(estadisticas_cache.contar(db, area, estado, watermark))
+
+    if serializacion.SERIALIZACION_RAPIDA:
+        return serializacion.respuesta_filas(solicitudes, response)
     return solicitudes
 
 
+def iterar_exportacion(area: Optional[str], estado: Optional[str]):
+    # Sesión propia: el generador se consume después de que termina el endpoint
+    db = SessionLocal()
+    try:
+        stmt = consulta_listado(0, None, area, estado, None, columnas=exportacion.COLUMNAS_EXPORTACION)
+        resultado = db.execute(stmt.execution_options(yield_per=exportacion.EXPORTACION_YIELD_PER))
+        for row in resultado:
+            yield row
+    finally:
+        db.close()
+
+
+@router.get("/export")
+def exportar_solicitudes(
+    format: str = Query("csv", pattern="^(csv|ndjson|xlsx)$"),
+    area: str = None,
+    estado: str = None,
+):
+    """
+    Exporta todas las solicitudes (con los mismos filtros que el listado)
+    en CSV, NDJSON o XLSX. Las filas se leen con un cursor del lado del
+    servidor y se envían mientras se generan, con memoria constante.
+    """
+    media_type, extension = exportacion.FORMATOS[format]
+    nombre = f"solicitudes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(
+        exportacion.GENERADORES[format](iterar_exportacion(area, estado)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'},
+    )
+
+
+@router.get("/search", response_model=List[SolicitudBusquedaResponse])
+def buscar_solicitudes(
+    q: str = Query(..., min_length=2),
+    limit: int = Query(20, ge=1, le=100),
+    area: str = None,
+    estado: str = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Búsqueda de texto completo en título, descripción, situación actual y
+    sistemas involucrados, ordenada por relevancia. Los términos encontrados
+    se marcan con <mark> en titulo_resaltado y fragmento; el resto del texto
+    va HTML-escapado.
+    """
+    stmt = consulta_busqueda(db.get_bind().dialect.name, busqueda.validar_consulta(q), limit, area, estado)
+    return busqueda.resaltar(db.execute(stmt).mappings())
+
+
+@router.get("/stream")
+async def stream_solicitudes(last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events con las altas (`creada`) y cambios de estado (`estado`),
+    cada uno con el `delta` a aplicar al resumen de estadísticas. `resync`
+    indica que se perdieron eventos y hay que recargar.
+    """
+    return StreamingResponse(
+        eventos.flujo_sse(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{solicitud_id}", response_model=SolicitudResponse)
-def obtener_solicitud(solicitud_id: int, db: Session = Depends(get_db)):
-    solicitud = db.query(Solicitud).filter(Solicitud.id == solicitud_id).first()
-    if not solicitud:
+def obtener_solicitud(solicitud_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    version = db.execute(etag.consulta_version_solicitud(solicitud_id)).first()
+    if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Solicitud no encontrada"
         )
-    return solicitud
 
+    tag = etag.calcular_etag(*version)
+    if etag.coincide(request, tag):
+        return etag.no_modificado(tag)
+    etag.agregar_headers(response, tag)
 
-@router.patch("/{solicitud_id}", response_model=SolicitudResponse)
-def actualizar_solicitud(
+    if serializacion.SERIALIZACION_RAPIDA:
+        fila = db.execute(select(*COLUMNAS_DETALLE).where(Solicitud.id == solicitud_id)).one()
+        return serializacion.respuesta_fila(fila, response)
+    return db.query(Solicitud).filter(Solicitud.id == solicitud_id).first()
+
+
+@router.get("/{solicitud_id}/similares", response_model=List[SolicitudSimilar])
+def obtener_similares(
     solicitud_id: int,
-    solicitud_update: SolicitudUpdate,
-    db: Session = Depends(get_db)
+    umbral: float = Query(similitud.SIMILARES_UMBRAL, ge=0, le=1),
+    limit: int = Query(similitud.SIMILARES_MAX, ge=1, le=50),
+    db: Session = Depends(get_read_db)
 ):
-    solicitud = db.query(Solicitud).filter(Solicitud.id == solicitud_id).first()
-    if not solicitud:
+    """
+    Posibles duplicados de la solicitud por similitud de título y descripción,
+    de mayor a menor. Usa el índice MinHash/LSH: solo se comparan las
+    solicitudes que comparten alguna banda con esta.
+    """
+    fila = db.execute(similitud.consulta_firma(solicitud_id)).first()
+    if not fila:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Solicitud no encontrada"
         )
+    return similitud.similares(db, similitud.firma_de_fila(fila), solicitud_id, umbral, limit)
 
-    update_data = solicitud_update.model_dump(exclude_unset=True)
 
-    for field, value in update_data.items():
-        setattr(solicitud, field, value)
+@router.patch("/{solicitud_id}", response_model=SolicitudResponse)
+def actualizar_solicitud(
+    solicitud_id: int,
+    solicitud_update: SolicitudUpdate,
+    db: Session = Depends(get_db)
+):
+    solicitud = db.query(Solicitud).filter(Solicitud.id == solicitud_id).first()
+    if not solicitud:
+        raise escrituras.solicitud_no_encontrada()
 
+    con_estado, sentencias = escrituras.aplicar_actualizacion(
+        db, solicitud, solicitud_update, reservar_version(db)
+    )
+    for sentencia, filas in sentencias:
+        db.execute(sentencia, filas)
     db.commit()
     db.refresh(solicitud)
 
-    if "estado" in update_data:
-        google_sheets_service.update_estado(
-            solicitud.numero_solicitud,
-            solicitud.estado.value
-        )
-
+    escrituras.tras_commit(con_estado)
     return solicitud
 
 
 @router.get("/estadisticas/resumen")
-def obtener_estadisticas(db: Session = Depends(get_db)):
-    total = db.query(Solicitud).count()
-    recibidas = db.query(Solicitud).filter(Solicitud.estado == "Recibido").count()
-    en_analisis = db.query(Solicitud).filter(Solicitud.estado == "En Análisis").count()
-    en_desarrollo = db.query(Solicitud).filter(Solicitud.estado == "En Desarrollo").count()
-    completadas = db.query(Solicitud).filter(Solicitud.estado == "Completado").count()
-
-    return {
-        "total": total,
-        "recibidas": recibidas,
-        "en_analisis": en_analisis,
-        "en_desarrollo": en_desarrollo,
-        "completadas": completadas
-    }
+def obtener_estadisticas(request: Request, response: Response, db: Session = Depends(get_read_db)):
+    watermark = db.execute(etag.consulta_watermark()).one()
+    tag = etag.etag_de_request(request, watermark)
+    if etag.coincide(request, tag):
+        return etag.no_modificado(tag)
+    etag.agregar_headers(response, tag)
+
+    if escritura_reciente(request):
+        # El cache compartido pudo llenarse desde la réplica atrasada
+        return calcular_estadisticas(db)
+    return estadisticas_cache.obtener(db, watermark)
+
+
+@router.get("/analitica/tiempos-estado")
+def tiempos_en_estado(
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    estado: Optional[str] = None,
+    area: Optional[str] = None,
+    urgencia: Optional[str] = None,
+    agrupar: Optional[str] = Query(None, pattern="^(area|urgencia)$"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Tiempo que las solicitudes pasan en cada estado (cantidad, promedio y
+    estimaciones de mediana y p90 en horas) a partir de los rollups diarios, por
+    defecto de los últimos 30 días. `agrupar` separa los resultados por área o
+    urgencia.
+    """
+    hasta = hasta or datetime.now(timezone.utc).date()
+    desde = desde or hasta - timedelta(days=30)
+    stmt = transiciones.consulta_tiempos(desde, hasta, estado, area, urgencia, agrupar)
+    return transiciones.resumir_tiempos(db.execute(stmt).all())
@@ -0,0 +1,267 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta, timezone
+
+from ..models import get_async_db, get_async_read_db, escritura_reciente, Solicitud
+from ..schemas import (
+    SolicitudCreate,
+    SolicitudResponse,
+    SolicitudListResponse,
+    SolicitudUpdate,
+    SolicitudBusquedaResponse,
+    SolicitudSimilar,
+    SolicitudCreadaResponse,
+    SolicitudBulkUpdate,
+    SolicitudBulkResponse,
+)
+from ..services import (
+    estadisticas_cache,
+    estadisticas,
+    consulta_busqueda,
+    busqueda,
+    masivo,
+    etag,
+    reservar_numeros_async,
+    reservar_version_async,
+    transiciones,
+    almacen_idempotencia,
+    serializacion,
+    similitud,
+    escrituras,
+)
+from .solicitudes import (
+    encode_cursor,
+    consulta_listado,
+    LISTADO_MAX,
+    COLUMNAS_DETALLE,
+    exportar_solicitudes,
+    stream_solicitudes,
+)
+
+# Mismos endpoints que routers/solicitudes.py sobre AsyncSession (DB_ASYNC=true)
+router = APIRouter(prefix="/api/solicitudes", tags=["solicitudes"])
+
+
+@router.post("/", response_model=SolicitudCreadaResponse, status_code=status.HTTP_201_CREATED)
+async def crear_solicitud(
+    solicitud: SolicitudCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if idempotency_key:
+        previa = escrituras.respuesta_idempotencia(response, *await almacen_idempotencia.reservar_async(
+            db, idempotency_key, escrituras.huella_alta(solicitud)
+        ))
+        if previa is not None:
+            return previa
+
+    firma = similitud.firma_de(solicitud.titulo_proceso, solicitud.descripcion_proceso)
+    # Antes de indexar la nueva, para que no se encuentre a sí misma
+    similares = await similitud.similares_async(db, firma) if similitud.SIMILARES_EN_ALTA else []
+    numero_solicitud, = await reservar_numeros_async(db)
+
+    db_solicitud = escrituras.nueva_solicitud(db, solicitud, numero_solicitud, await reservar_version_async(db))
+    await db.flush()
+    respuesta, sentencias = escrituras.completar_alta(db, db_solicitud, firma, similares)
+    for sentencia, filas in sentencias:
+        await db.execute(sentencia, filas)
+    if idempotency_key:
+        await almacen_idempotencia.guardar_async(
+            db, idempotency_key, db_solicitud.id, status.HTTP_201_CREATED, respuesta.model_dump(mode="json")
+        )
+    await db.commit()
+
+    escrituras.tras_commit()
+    return respuesta
+
+
+@router.post("/bulk", response_model=SolicitudBulkResponse)
+async def crear_solicitudes_bulk(items: List[Dict[str, Any]], db: AsyncSession = Depends(get_async_db)):
+    masivo.validar_tamano(items)
+    validos, resultados = masivo.validar_items(items, SolicitudCreate)
+
+    if validos:
+        numeros = await reservar_numeros_async(db, len(validos))
+        filas = masivo.filas_alta(validos, numeros, await reservar_version_async(db))
+        creadas = (await db.execute(masivo.sentencia_insertar_solicitudes(), filas)).all()
+        creados, sentencias = masivo.completar_alta(db, validos, filas, creadas)
+        for sentencia, parametros in sentencias:
+            await db.execute(sentencia, parametros)
+        await db.commit()
+
+        resultados += creados
+        escrituras.tras_commit()
+
+    return masivo.armar_respuesta(resultados)
+
+
+@router.patch("/bulk", response_model=SolicitudBulkResponse)
+async def actualizar_solicitudes_bulk(items: List[Dict[str, Any]], db: AsyncSession = Depends(get_async_db)):
+    masivo.validar_tamano(items)
+    validos, resultados = masivo.validar_items(items, SolicitudBulkUpdate)
+
+    existentes = (
+        await db.execute(masivo.sentencia_ids_existentes([item.id for _, item in validos]))
+    ).all() if validos else []
+    version = await reservar_version_async(db) if existentes else 0
+    actualizados, sentencias, con_estado = masivo.planear_actualizacion(db, validos, existentes, version)
+    resultados += actualizados
+
+    if sentencias:
+        for sentencia, parametros in sentencias:
+            await db.execute(sentencia, parametros)
+        await db.commit()
+        escrituras.tras_commit(con_estado)
+
+    return masivo.armar_respuesta(resultados)
+
+
+@router.get("/", response_model=List[SolicitudListResponse])
+async def listar_solicitudes(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=LISTADO_MAX),
+    area: str = None,
+    estado: str = None,
+    cursor: Optional[str] = None,
+    incluir_total: bool = False,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    watermark = (await db.execute(etag.consulta_watermark())).one()
+    tag = etag.etag_de_request(request, watermark)
+    if etag.coincide(request, tag):
+        return etag.no_modificado(tag)
+    etag.agregar_headers(response, tag)
+
+    solicitudes = (await db.execute(consulta_listado(skip, limit, area, estado, cursor))).all()
+
+    if solicitudes and len(solicitudes) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(solicitudes[-1])
+
+    if incluir_total:
+        response.headers["X-Total-Count"] = str(await estadisticas_cache.contar_async(db, area, estado, watermark))
+
+    if serializacion.SERIALIZACION_RAPIDA:
+        return serializacion.respuesta_filas(solicitudes, response)
+    return solicitudes
+
+
+# La exportación corre en el threadpool con la sesión síncrona y un cursor
+# del lado del servidor, así no bloquea el event loop durante el envío.
+router.add_api_route("/export", exportar_solicitudes, methods=["GET"])
+router.add_api_route("/stream", stream_solicitudes, methods=["GET"])
+
+
+@router.get("/search", response_model=List[SolicitudBusquedaResponse])
+async def buscar_solicitudes(
+    q: str = Query(..., min_length=2),
+    limit: int = Query(20, ge=1, le=100),
+    area: str = None,
+    estado: str = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    stmt = consulta_busqueda(db.get_bind().dialect.name, busqueda.validar_consulta(q), limit, area, estado)
+    return busqueda.resaltar((await db.execute(stmt)).mappings())
+
+
+@router.get("/{solicitud_id}", response_model=SolicitudResponse)
+async def obtener_solicitud(
+    solicitud_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    version = (await db.execute(etag.consulta_version_solicitud(solicitud_id))).first()
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Solicitud no encontrada"
+        )
+
+    tag = etag.calcular_etag(*version)
+    if etag.coincide(request, tag):
+        return etag.no_modificado(tag)
+    etag.agregar_headers(response, tag)
+
+    if serializacion.SERIALIZACION_RAPIDA:
+        fila = (await db.execute(select(*COLUMNAS_DETALLE).where(Solicitud.id == solicitud_id))).one()
+        return serializacion.respuesta_fila(fila, response)
+    return await db.get(Solicitud, solicitud_id)
+
+
+@router.get("/{solicitud_id}/similares", response_model=List[SolicitudSimilar])
+async def obtener_similares(
+    solicitud_id: int,
+    umbral: float = Query(similitud.SIMILARES_UMBRAL, ge=0, le=1),
+    limit: int = Query(similitud.SIMILARES_MAX, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    fila = (await db.execute(similitud.consulta_firma(solicitud_id))).first()
+    if not fila:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Solicitud no encontrada"
+        )
+    return await similitud.similares_async(db, similitud.firma_de_fila(fila), solicitud_id, umbral, limit)
+
+
+@router.patch("/{solicitud_id}", response_model=SolicitudResponse)
+async def actualizar_solicitud(
+    solicitud_id: int,
+    solicitud_update: SolicitudUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    solicitud = await db.get(Solicitud, solicitud_id)
+    if not solicitud:
+        raise escrituras.solicitud_no_encontrada()
+
+    con_estado, sentencias = escrituras.aplicar_actualizacion(
+        db, solicitud, solicitud_update, await reservar_version_async(db)
+    )
+    for sentencia, filas in sentencias:
+        await db.execute(sentencia, filas)
+    await db.commit()
+    await db.refresh(solicitud)
+
+    escrituras.tras_commit(con_estado)
+    return solicitud
+
+
+@router.get("/estadisticas/resumen")
+async def obtener_estadisticas(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    watermark = (await db.execute(etag.consulta_watermark())).one()
+    tag = etag.etag_de_request(request, watermark)
+    if etag.coincide(request, tag):
+        return etag.no_modificado(tag)
+    etag.agregar_headers(response, tag)
+
+    if escritura_reciente(request):
+        # El cache compartido pudo llenarse desde la réplica atrasada
+        return estadisticas.resumir(await estadisticas.contar_por_grupo_async(db))
+    return await estadisticas_cache.obtener_async(db, watermark)
+
+
+@router.get("/analitica/tiempos-estado")
+async def tiempos_en_estado(
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    estado: Optional[str] = None,
+    area: Optional[str] = None,
+    urgencia: Optional[str] = None,
+    agrupar: Optional[str] = Query(None, pattern="^(area|urgencia)$"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Tiempo que las solicitudes pasan en cada estado (cantidad, promedio y
+    estimaciones de mediana y p90 en horas) a partir de los rollups diarios, por
+    defecto de los últimos 30 días. `agrupar` separa los resultados por área o
+    urgencia.
+    """
+    hasta = hasta or datetime.now(timezone.utc).date()
+    desde = desde or hasta - timedelta(days=30)
+    stmt = transiciones.consulta_tiempos(desde, hasta, estado, area, urgencia, agrupar)
+    return transiciones.resumir_tiempos((await db.execute(stmt)).all())
@@ -3,5 +3,11 @@ from .solicitud import (
     SolicitudCreate,
     SolicitudUpdate,
     SolicitudResponse,
-    SolicitudListResponse
+    SolicitudListResponse,
+    SolicitudBusquedaResponse,
+    SolicitudSimilar,
+    SolicitudCreadaResponse,
+    SolicitudBulkUpdate,
+    ResultadoItemBulk,
+    SolicitudBulkResponse
 )
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Optional, List
 from datetime import datetime
 from ..models.solicitud import AreaSolicitante, Urgencia, Estado, Impacto
 
@@ -28,6 +28,14 @@ class SolicitudUpdate(BaseModel):
     estado: Optional[Estado] = None
     notas_internas: Optional[str] = None
 
+    @field_validator("estado")
+    @classmethod
+    def estado_no_nulo(cls, estado):
+        # Omitir el campo deja el estado como está; un null explícito no es un estado
+        if estado is None:
+            raise ValueError("el estado no puede ser null")
+        return estado
+
 
 class SolicitudResponse(SolicitudBase):
     id: int
@@ -52,3 +60,36 @@ class SolicitudListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SolicitudSimilar(SolicitudListResponse):
+    similitud: float
+
+
+class SolicitudCreadaResponse(SolicitudResponse):
+    # Posibles duplicados encontrados al crear (ver services/similitud.py)
+    similares: List[SolicitudSimilar] = []
+
+
+class SolicitudBusquedaResponse(SolicitudListResponse):
+    rank: float
+    titulo_resaltado: str
+    fragmento: Optional[str] = None
+
+
+class SolicitudBulkUpdate(SolicitudUpdate):
+    id: int
+
+
+class ResultadoItemBulk(BaseModel):
+    indice: int
+    ok: bool
+    id: Optional[int] = None
+    numero_solicitud: Optional[str] = None
+    error: Optional[str] = None
+
+
+class SolicitudBulkResponse(BaseModel):
+    procesadas: int
+    errores: int
+    resultados: List[ResultadoItemBulk]
@@ -1 +1,19 @@
 from .google_sheets import google_sheets_service, GoogleSheetsService
+from .sheets_outbox import sheets_outbox_worker, SheetsOutboxWorker, encolar_sheets, solicitud_to_sheets_data
+from .estadisticas import estadisticas_cache, calcular_estadisticas
+from .busqueda import consulta_busqueda, crear_indice_busqueda, eliminar_indice_busqueda
+from . import busqueda
+from . import masivo
+from . import exportacion
+from .sheets_reconciliacion import ReconciliadorSheets
+from . import etag
+from .numeracion import reservar_numeros, reservar_numeros_async, reservar_version, reservar_version_async
+from . import eventos
+from . import idempotencia
+from .idempotencia import almacen_idempotencia
+from . import estadisticas
+from . import transiciones
+from .cache import cache_respuestas
+from . import serializacion
+from . import similitud
+from . import escrituras
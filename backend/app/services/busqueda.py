@@ -0,0 +1,211 @@
+import html
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, Text, bindparam, column, text
+from sqlalchemy.engine import Connection
+
+from ..models import Solicitud
+
+# Campos indexados para búsqueda de texto completo, con su peso en el ranking
+CAMPOS_BUSQUEDA = ("titulo_proceso", "descripcion_proceso", "situacion_actual", "sistemas_involucrados")
+
+INICIO_RESALTADO = "<mark>"
+FIN_RESALTADO = "</mark>"
+# El motor marca los términos con caracteres de control; resaltar() escapa el
+# texto del usuario y recién después los cambia por las etiquetas, así el único
+# HTML que puede salir en la respuesta es <mark> y </mark>.
+_MARCA_INICIO = "\x02"
+_MARCA_FIN = "\x03"
+CAMPOS_RESALTADOS = ("titulo_resaltado", "fragmento")
+
+# === PostgreSQL: columna tsvector generada + índice GIN ===
+# Al ser GENERATED ... STORED, Postgres la mantiene en cada INSERT/UPDATE.
+DDL_POSTGRES = [
+    """
+    ALTER TABLE solicitudes ADD COLUMN IF NOT EXISTS busqueda tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('spanish'::regconfig, coalesce(titulo_proceso, '')), 'A') ||
+        setweight(to_tsvector('spanish'::regconfig, coalesce(descripcion_proceso, '')), 'B') ||
+        setweight(to_tsvector('spanish'::regconfig, coalesce(situacion_actual, '')), 'C') ||
+        setweight(to_tsvector('spanish'::regconfig, coalesce(sistemas_involucrados, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_solicitudes_busqueda ON solicitudes USING GIN (busqueda)",
+]
+
+# === SQLite (desarrollo local): tabla FTS5 de contenido externo + triggers ===
+DDL_SQLITE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS solicitudes_fts USING fts5(
+        titulo_proceso, descripcion_proceso, situacion_actual, sistemas_involucrados,
+        content='solicitudes', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS solicitudes_fts_ai AFTER INSERT ON solicitudes BEGIN
+        INSERT INTO solicitudes_fts(rowid, titulo_proceso, descripcion_proceso, situacion_actual, sistemas_involucrados)
+        VALUES (new.id, new.titulo_proceso, new.descripcion_proceso, new.situacion_actual, new.sistemas_involucrados);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS solicitudes_fts_ad AFTER DELETE ON solicitudes BEGIN
+        INSERT INTO solicitudes_fts(solicitudes_fts, rowid, titulo_proceso, descripcion_proceso, situacion_actual, sistemas_involucrados)
+        VALUES ('delete', old.id, old.titulo_proceso, old.descripcion_proceso, old.situacion_actual, old.sistemas_involucrados);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS solicitudes_fts_au AFTER UPDATE ON solicitudes BEGIN
+        INSERT INTO solicitudes_fts(solicitudes_fts, rowid, titulo_proceso, descripcion_proceso, situacion_actual, sistemas_involucrados)
+        VALUES ('delete', old.id, old.titulo_proceso, old.descripcion_proceso, old.situacion_actual, old.sistemas_involucrados);
+        INSERT INTO solicitudes_fts(rowid, titulo_proceso, descripcion_proceso, situacion_actual, sistemas_involucrados)
+        VALUES (new.id, new.titulo_proceso, new.descripcion_proceso, new.situacion_actual, new.sistemas_involucrados);
+    END
+    """,
+    # Indexa las filas que ya existían antes de crear la tabla FTS
+    "INSERT INTO solicitudes_fts(solicitudes_fts) VALUES ('rebuild')",
+]
+
+DDL_SQLITE_DOWN = [
+    "DROP TRIGGER IF EXISTS solicitudes_fts_au",
+    "DROP TRIGGER IF EXISTS solicitudes_fts_ad",
+    "DROP TRIGGER IF EXISTS solicitudes_fts_ai",
+    "DROP TABLE IF EXISTS solicitudes_fts",
+]
+
+DDL_POSTGRES_DOWN = [
+    "DROP INDEX IF EXISTS ix_solicitudes_busqueda",
+    "ALTER TABLE solicitudes DROP COLUMN IF EXISTS busqueda",
+]
+
+_SQL_POSTGRES = """
+    SELECT r.id, r.numero_solicitud, r.area_solicitante, r.titulo_proceso, r.urgencia, r.estado,
+           r.fecha_creacion, r.rank,
+           ts_headline('spanish', r.titulo_proceso, r.q,
+                       'StartSel={ini}, StopSel={fin}, HighlightAll=true') AS titulo_resaltado,
+           ts_headline('spanish', r.descripcion_proceso, r.q,
+                       'StartSel={ini}, StopSel={fin}, MaxFragments=2, MaxWords=25, MinWords=8') AS fragmento
+    FROM (
+        SELECT s.*, q, ts_rank(s.busqueda, q) AS rank
+        FROM solicitudes s, websearch_to_tsquery('spanish', :q) AS q
+        WHERE s.busqueda @@ q {filtros}
+        ORDER BY rank DESC, s.fecha_creacion DESC
+        LIMIT :limit
+    ) r
+    ORDER BY r.rank DESC, r.fecha_creacion DESC
+"""
+
+_SQL_SQLITE = """
+    SELECT s.id, s.numero_solicitud, s.area_solicitante, s.titulo_proceso, s.urgencia, s.estado,
+           s.fecha_creacion,
+           -bm25(solicitudes_fts, 4.0, 2.0, 1.0, 1.0) AS rank,
+           highlight(solicitudes_fts, 0, '{ini}', '{fin}') AS titulo_resaltado,
+           snippet(solicitudes_fts, 1, '{ini}', '{fin}', '…', 25) AS fragmento
+    FROM solicitudes_fts
+    JOIN solicitudes s ON s.id = solicitudes_fts.rowid
+    WHERE solicitudes_fts MATCH :q {filtros}
+    ORDER BY bm25(solicitudes_fts, 4.0, 2.0, 1.0, 1.0), s.fecha_creacion DESC
+    LIMIT :limit
+"""
+
+
+def crear_indice_busqueda(conn: Connection):
+    """Crea (idempotente) la estructura de búsqueda según el motor."""
+    if conn.dialect.name == "postgresql":
+        ddl = DDL_POSTGRES
+    elif conn.dialect.name == "sqlite":
+        existe = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'solicitudes_fts'")
+        ).first()
+        # El 'rebuild' reindexa toda la tabla: solo al crearla
+        ddl = [] if existe else DDL_SQLITE
+    else:
+        ddl = []
+    for sentencia in ddl:
+        conn.execute(text(sentencia))
+
+
+def eliminar_indice_busqueda(conn: Connection):
+    ddl = DDL_POSTGRES_DOWN if conn.dialect.name == "postgresql" else DDL_SQLITE_DOWN if conn.dialect.name == "sqlite" else []
+    for sentencia in ddl:
+        conn.execute(text(sentencia))
+
+
+def validar_consulta(q: str) -> str:
+    """
+    q sin espacios en los extremos. min_length del Query cuenta los espacios:
+    "  " pasaría y FTS5 rechaza un MATCH vacío con un error de sintaxis.
+    """
+    q = q.strip()
+    if len(q) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="La búsqueda debe tener al menos 2 caracteres además de los espacios"
+        )
+    return q
+
+
+def _consulta_fts5(q: str) -> str:
+    # Cada palabra como término literal (evita que la sintaxis FTS5 del usuario
+    # rompa la consulta); el último admite prefijo para búsqueda mientras se escribe.
+    terminos = ['"{}"'.format(t.replace('"', '""')) for t in q.split()]
+    if terminos:
+        terminos[-1] += "*"
+    return " ".join(terminos)
+
+
+def consulta_busqueda(dialecto: str, q: str, limit: int, area: Optional[str] = None, estado: Optional[str] = None):
+    filtros = ""
+    params = {"q": q, "limit": limit}
+    binds = []
+
+    if area:
+        filtros += " AND s.area_solicitante = :area"
+        params["area"] = area
+        binds.append(bindparam("area", type_=Solicitud.__table__.c.area_solicitante.type))
+    if estado:
+        filtros += " AND s.estado = :estado"
+        params["estado"] = estado
+        binds.append(bindparam("estado", type_=Solicitud.__table__.c.estado.type))
+
+    if dialecto == "postgresql":
+        sql = _SQL_POSTGRES
+    elif dialecto == "sqlite":
+        sql = _SQL_SQLITE
+        params["q"] = _consulta_fts5(q)
+    else:
+        raise ValueError(f"Búsqueda de texto completo no soportada para {dialecto}")
+
+    columnas = Solicitud.__table__.c
+    return (
+        text(sql.format(ini=_MARCA_INICIO, fin=_MARCA_FIN, filtros=filtros))
+        .bindparams(*binds, **params)
+        .columns(
+            columnas.id,
+            columnas.numero_solicitud,
+            columnas.area_solicitante,
+            columnas.titulo_proceso,
+            columnas.urgencia,
+            columnas.estado,
+            columnas.fecha_creacion,
+            column("rank", Float),
+            column("titulo_resaltado", Text),
+            column("fragmento", Text),
+        )
+    )
+
+
+def escapar_resaltado(texto: Optional[str]) -> Optional[str]:
+    """HTML-escapa el texto y convierte las marcas del motor en <mark>."""
+    if texto is None:
+        return None
+    texto = html.escape(texto, quote=True)
+    return texto.replace(_MARCA_INICIO, INICIO_RESALTADO).replace(_MARCA_FIN, FIN_RESALTADO)
+
+
+def resaltar(filas) -> List[Dict]:
+    """Filas de consulta_busqueda() con titulo_resaltado y fragmento seguros para insertar como HTML."""
+    return [
+        {**fila, **{campo: escapar_resaltado(fila[campo]) for campo in CAMPOS_RESALTADOS}}
+        for fila in filas
+    ]
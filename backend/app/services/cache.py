@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .metricas import registro, Contador
+
+# ninguno | memoria (LRU por instancia) | redis (compartido entre instancias)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "ninguno").lower()
+CACHE_TTL = int(os.getenv("CACHE_TTL", "30"))
+CACHE_MAX_ENTRADAS = int(os.getenv("CACHE_MAX_ENTRADAS", "1000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_PREFIJO = os.getenv("CACHE_PREFIJO", "solicitudes:cache")
+
+cache_aciertos = registro.registrar(Contador(
+    "cache_hits_total", "Respuestas servidas desde el cache"
+))
+cache_fallos = registro.registrar(Contador(
+    "cache_misses_total", "Respuestas que no estaban en el cache"
+))
+
+
+# Los backends devuelven con cada lectura la generación vigente, y guardar()
+# solo escribe si sigue siendo la misma: una respuesta armada con datos leídos
+# antes de una escritura no se guarda después de la invalidación.
+
+class CacheMemoria:
+    """LRU con TTL en memoria del proceso."""
+
+    compartido = False
+
+    def __init__(self, maximo: int = CACHE_MAX_ENTRADAS):
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generacion = 0
+
+    def obtener(self, clave: str) -> Tuple[Optional[bytes], int]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None, self._generacion
+            valor, expira = entrada
+            if expira <= time.monotonic():
+                del self._entradas[clave]
+                return None, self._generacion
+            self._entradas.move_to_end(clave)
+            return valor, self._generacion
+
+    def guardar(self, clave: str, valor: bytes, ttl: int, generacion: int) -> bool:
+        with self._lock:
+            if generacion != self._generacion:
+                return False
+            self._entradas[clave] = (valor, time.monotonic() + ttl)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+            return True
+
+    def invalidar(self):
+        with self._lock:
+            self._generacion += 1
+            self._entradas.clear()
+
+
+# Las claves llevan la generación actual: invalidar es un INCR y las entradas
+# viejas simplemente expiran. Cada script resuelve la generación y la clave en
+# un solo round trip; guardar recibe la generación leída al buscar.
+_LUA_OBTENER = """
+local gen = redis.call('GET', KEYS[1]) or '0'
+return {gen, redis.call('GET', ARGV[1] .. ':' .. gen .. ':' .. ARGV[2])}
+"""
+
+_LUA_GUARDAR = """
+local gen = redis.call('GET', KEYS[1]) or '0'
+if gen ~= ARGV[5] then
+    return 0
+end
+redis.call('SET', ARGV[1] .. ':' .. gen .. ':' .. ARGV[2], ARGV[3], 'EX', ARGV[4])
+return 1
+"""
+
+
+class CacheRedis:
+    """
+    Cache compartido sobre cualquier servidor que hable el protocolo de Redis.
+    `cliente` permite pasar un cliente ya construido (p. ej. un fake en pruebas).
+    """
+
+    compartido = True
+
+    def __init__(self, url: str = REDIS_URL, prefijo: str = CACHE_PREFIJO, cliente=None):
+        if cliente is None:
+            import redis
+
+            cliente = redis.Redis.from_url(url)
+        self.cliente = cliente
+        self.prefijo = prefijo
+        self.clave_generacion = f"{prefijo}:generacion"
+        self._obtener = cliente.register_script(_LUA_OBTENER)
+        self._guardar = cliente.register_script(_LUA_GUARDAR)
+
+    def obtener(self, clave: str) -> Tuple[Optional[bytes], Optional[bytes]]:
+        try:
+            generacion, valor = self._obtener(keys=[self.clave_generacion], args=[self.prefijo, clave])
+            return valor, generacion
+        except Exception as e:
+            # Sin Redis se responde desde la base como si no hubiera cache
+            print(f"Error leyendo cache de Redis: {e}")
+            return None, None
+
+    def guardar(self, clave: str, valor: bytes, ttl: int, generacion: Optional[bytes]) -> bool:
+        if generacion is None:
+            # La lectura falló: no se sabe contra qué generación se armó la respuesta
+            return False
+        try:
+            return bool(self._guardar(keys=[self.clave_generacion], args=[self.prefijo, clave, valor, ttl, generacion]))
+        except Exception as e:
+            print(f"Error escribiendo cache de Redis: {e}")
+            return False
+
+    def invalidar(self):
+        try:
+            self.cliente.incr(self.clave_generacion)
+        except Exception as e:
+            print(f"Error invalidando cache de Redis: {e}")
+
+
+class CacheRespuestas:
+    """
+    Respuestas HTTP completas (status, headers, cuerpo) por ruta + query params.
+    Las escrituras llaman a invalidar(); con el backend en memoria, las demás
+    instancias se enteran por los eventos (ver services/eventos.py).
+    """
+
+    def __init__(self, backend=None, ttl: int = CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+
+    @property
+    def activo(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def clave(ruta: str, query_string: bytes) -> str:
+        params = sorted(p for p in query_string.decode("latin-1").split("&") if p)
+        return f"{ruta}?{'&'.join(params)}"
+
+    def obtener(self, clave: str, plantilla: str) -> tuple:
+        """
+        (respuesta guardada o None, generación). La generación se pasa a
+        guardar() para descartar la respuesta si hubo una escritura entre medio.
+        """
+        valor, generacion = self.backend.obtener(clave)
+        if valor is None:
+            cache_fallos.inc(ruta=plantilla)
+            return None, generacion
+        cache_aciertos.inc(ruta=plantilla)
+        return json.loads(valor), generacion
+
+    def guardar(self, clave: str, generacion, status: int, headers: list, cuerpo: bytes) -> bool:
+        valor = json.dumps({
+            "status": status,
+            "headers": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in headers],
+            "cuerpo": cuerpo.decode("utf-8"),
+        })
+        return self.backend.guardar(clave, valor.encode("utf-8"), self.ttl, generacion)
+
+    def invalidar(self):
+        if self.backend is not None:
+            self.backend.invalidar()
+
+    def invalidar_por_evento(self, tipo: str, datos: dict):
+        # Un cache compartido ya quedó invalidado por quien escribió
+        if self.backend is not None and not self.backend.compartido:
+            self.backend.invalidar()
+
+
+def crear_backend(nombre: str = CACHE_BACKEND):
+    if nombre == "memoria":
+        return CacheMemoria()
+    if nombre == "redis":
+        return CacheRedis()
+    return None
+
+
+cache_respuestas = CacheRespuestas(crear_backend())
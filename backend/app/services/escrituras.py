@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+
+from ..models import Solicitud, SheetsOutbox
+from ..schemas import SolicitudCreate, SolicitudCreadaResponse, SolicitudSimilar, SolicitudUpdate
+from . import eventos, idempotencia, similitud, transiciones
+from .cache import cache_respuestas
+from .estadisticas import estadisticas_cache
+from .sheets_outbox import encolar_sheets, sheets_outbox_worker
+
+# Alta y actualización de una solicitud, compartidas por routers/solicitudes.py
+# y routers/solicitudes_async.py. Lo que escribe en la base se devuelve como
+# [(sentencia, filas)] para que cada router lo ejecute con su sesión.
+
+
+def respuesta_idempotencia(response: Response, resultado: str, respuesta, status_guardado):
+    """
+    Devuelve la respuesta ya enviada para esta Idempotency-Key, o None si hay
+    que crear la solicitud (la clave quedó reservada en la transacción).
+    """
+    if resultado == idempotencia.CONFLICTO:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="La Idempotency-Key ya se usó con otro contenido"
+        )
+    if resultado == idempotencia.REPETIDA:
+        response.headers["Idempotent-Replayed"] = "true"
+        response.status_code = status_guardado
+    return respuesta
+
+
+def huella_alta(solicitud: SolicitudCreate) -> str:
+    return idempotencia.huella(solicitud.model_dump(mode="json"))
+
+
+def nueva_solicitud(db, solicitud: SolicitudCreate, numero_solicitud: str, version: int) -> Solicitud:
+    """Agrega la solicitud a la sesión; id y fecha_creacion llegan con el flush."""
+    db_solicitud = Solicitud(numero_solicitud=numero_solicitud, version=version, **solicitud.model_dump())
+    db.add(db_solicitud)
+    return db_solicitud
+
+
+def completar_alta(db, db_solicitud: Solicitud, firma, similares: List[dict]) -> Tuple[SolicitudCreadaResponse, List[tuple]]:
+    """
+    Después del flush: encola la fila para Sheets, registra el evento y arma
+    la respuesta. Devuelve también las sentencias del índice de similitud.
+    """
+    encolar_sheets(db, db_solicitud, SheetsOutbox.OP_APPEND)
+    eventos.emitir_creada(db, db_solicitud)
+    # El flush ya trajo id y fecha_creacion vía RETURNING: armar la respuesta
+    # antes del commit evita recargar la fila expirada.
+    respuesta = SolicitudCreadaResponse.model_validate(db_solicitud)
+    respuesta.similares = [SolicitudSimilar(**s) for s in similares]
+    return respuesta, similitud.sentencias_indice([(db_solicitud.id, firma)])
+
+
+def solicitud_no_encontrada() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Solicitud no encontrada"
+    )
+
+
+def aplicar_actualizacion(
+    db, solicitud: Solicitud, cambios: SolicitudUpdate, version: int, ahora: Optional[datetime] = None
+) -> Tuple[bool, List[tuple]]:
+    """
+    Aplica el PATCH a la solicitud cargada: encola el estado para Sheets y
+    registra los eventos. Devuelve si el PATCH traía estado y las sentencias
+    del historial de transiciones.
+    """
+    datos = cambios.model_dump(exclude_unset=True)
+    estado_anterior = solicitud.estado
+
+    for campo, valor in datos.items():
+        setattr(solicitud, campo, valor)
+    solicitud.version = version
+
+    sentencias = []
+    if "estado" in datos:
+        encolar_sheets(db, solicitud, SheetsOutbox.OP_UPDATE_ESTADO)
+        if solicitud.estado != estado_anterior:
+            ahora = ahora or datetime.now(timezone.utc)
+            sentencias = transiciones.sentencias_transiciones(db.get_bind().dialect.name, [transiciones.transicion(
+                solicitud.id, solicitud.area_solicitante, solicitud.urgencia,
+                estado_anterior, solicitud.estado, solicitud.fecha_estado or solicitud.fecha_creacion, ahora
+            )])
+            solicitud.fecha_estado = ahora
+        eventos.emitir_estado(
+            db, solicitud.id, solicitud.numero_solicitud, solicitud.area_solicitante, solicitud.urgencia,
+            solicitud.estado, estado_anterior
+        )
+    if datos and solicitud.estado == estado_anterior:
+        eventos.emitir_actualizada(db, solicitud.id)
+
+    return "estado" in datos, sentencias
+
+
+def tras_commit(con_outbox: bool = True):
+    """
+    Invalida el cache de respuestas y, si se encolaron altas o estados para
+    Sheets, despierta al worker del outbox e invalida las estadísticas.
+    """
+    cache_respuestas.invalidar()
+    if con_outbox:
+        sheets_outbox_worker.notificar()
+        estadisticas_cache.invalidar()
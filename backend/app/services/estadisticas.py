@@ -0,0 +1,177 @@
+import os
+import time
+import threading
+from typing import Optional, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models import Solicitud, Estado, AreaSolicitante, Urgencia
+
+ESTADISTICAS_TTL = float(os.getenv("ESTADISTICAS_TTL", "30"))
+
+# Claves históricas del payload que usa el dashboard
+CLAVES_ESTADO = {
+    Estado.RECIBIDO: "recibidas",
+    Estado.EN_ANALISIS: "en_analisis",
+    Estado.EN_DESARROLLO: "en_desarrollo",
+    Estado.COMPLETADO: "completadas",
+}
+
+
+def consulta_conteo_por_grupo():
+    """Una sola consulta GROUP BY (estado, área, urgencia)."""
+    return (
+        select(
+            Solicitud.estado,
+            Solicitud.area_solicitante,
+            Solicitud.urgencia,
+            func.count(Solicitud.id),
+        )
+        .group_by(Solicitud.estado, Solicitud.area_solicitante, Solicitud.urgencia)
+    )
+
+
+def normalizar_grupos(filas) -> List[Tuple[str, str, str, int]]:
+    return [
+        (estado.value if estado else None, area.value, urgencia.value, cantidad)
+        for estado, area, urgencia, cantidad in filas
+    ]
+
+
+def contar_por_grupo(db: Session) -> List[Tuple[str, str, str, int]]:
+    return normalizar_grupos(db.execute(consulta_conteo_por_grupo()).all())
+
+
+async def contar_por_grupo_async(db) -> List[Tuple[str, str, str, int]]:
+    return normalizar_grupos((await db.execute(consulta_conteo_por_grupo())).all())
+
+
+def resumir(grupos: List[Tuple[str, str, str, int]]) -> dict:
+    por_estado = {e.value: 0 for e in Estado}
+    por_area = {a.value: 0 for a in AreaSolicitante}
+    por_urgencia = {u.value: 0 for u in Urgencia}
+    total = 0
+
+    for estado, area, urgencia, cantidad in grupos:
+        total += cantidad
+        if estado is not None:
+            por_estado[estado] += cantidad
+        por_area[area] += cantidad
+        por_urgencia[urgencia] += cantidad
+
+    resultado = {"total": total}
+    for estado, clave in CLAVES_ESTADO.items():
+        resultado[clave] = por_estado[estado.value]
+    resultado["por_estado"] = por_estado
+    resultado["por_area"] = por_area
+    resultado["por_urgencia"] = por_urgencia
+    return resultado
+
+
+def delta_estadisticas(area: str, urgencia: str, estado_nuevo: str, estado_anterior: Optional[str] = None) -> dict:
+    """
+    Cambio en el resumen de resumir() por un alta (sin estado_anterior) o un
+    cambio de estado. Solo incluye las claves que cambian.
+    """
+    if estado_anterior == estado_nuevo:
+        return {}
+
+    claves = {e.value: clave for e, clave in CLAVES_ESTADO.items()}
+    delta = {"por_estado": {estado_nuevo: 1}}
+    if estado_nuevo in claves:
+        delta[claves[estado_nuevo]] = 1
+
+    if estado_anterior is None:
+        delta["total"] = 1
+        delta["por_area"] = {area: 1}
+        delta["por_urgencia"] = {urgencia: 1}
+    else:
+        delta["por_estado"][estado_anterior] = -1
+        if estado_anterior in claves:
+            delta[claves[estado_anterior]] = -1
+    return delta
+
+
+def calcular_estadisticas(db: Session) -> dict:
+    """Calcula todas las estadísticas con una sola consulta GROUP BY."""
+    return resumir(contar_por_grupo(db))
+
+
+class EstadisticasCache:
+    """
+    Cache en proceso con TTL corto de los conteos agrupados; se invalida en
+    cada alta o cambio. Sirve tanto el resumen del dashboard como el total
+    del listado para cualquier combinación de filtros área/estado.
+
+    Las entradas se guardan con el watermark de la base (etag.consulta_watermark)
+    leído en el mismo request: otra instancia no invalida este cache, así que
+    si el watermark cambió se recalcula y un ETag nuevo nunca lleva conteos viejos.
+    """
+
+    def __init__(self, ttl: float = ESTADISTICAS_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._grupos: Optional[List[Tuple[str, str, str, int]]] = None
+        self._resumen: Optional[dict] = None
+        self._watermark = None
+        self._expira = 0.0
+
+    def _vigente(self, watermark):
+        with self._lock:
+            if (
+                self._grupos is not None
+                and time.monotonic() < self._expira
+                and (watermark is None or tuple(watermark) == self._watermark)
+            ):
+                return self._grupos, self._resumen
+        return None
+
+    def _guardar(self, grupos, watermark):
+        resumen = resumir(grupos)
+        with self._lock:
+            self._grupos = grupos
+            self._resumen = resumen
+            self._watermark = tuple(watermark) if watermark is not None else None
+            self._expira = time.monotonic() + self.ttl
+        return grupos, resumen
+
+    def _obtener_grupos(self, db: Session, watermark):
+        return self._vigente(watermark) or self._guardar(contar_por_grupo(db), watermark)
+
+    async def _obtener_grupos_async(self, db, watermark):
+        return self._vigente(watermark) or self._guardar(await contar_por_grupo_async(db), watermark)
+
+    def obtener(self, db: Session, watermark=None) -> dict:
+        return self._obtener_grupos(db, watermark)[1]
+
+    async def obtener_async(self, db, watermark=None) -> dict:
+        return (await self._obtener_grupos_async(db, watermark))[1]
+
+    def contar(self, db: Session, area: Optional[str] = None, estado: Optional[str] = None,
+               watermark=None) -> int:
+        grupos, _ = self._obtener_grupos(db, watermark)
+        return self._filtrar(grupos, area, estado)
+
+    async def contar_async(self, db, area: Optional[str] = None, estado: Optional[str] = None,
+                           watermark=None) -> int:
+        grupos, _ = await self._obtener_grupos_async(db, watermark)
+        return self._filtrar(grupos, area, estado)
+
+    @staticmethod
+    def _filtrar(grupos, area: Optional[str], estado: Optional[str]) -> int:
+        return sum(
+            cantidad
+            for e, a, _u, cantidad in grupos
+            if (not area or a == area) and (not estado or e == estado)
+        )
+
+    def invalidar(self):
+        with self._lock:
+            self._grupos = None
+            self._resumen = None
+            self._watermark = None
+            self._expira = 0.0
+
+
+estadisticas_cache = EstadisticasCache()
@@ -0,0 +1,60 @@
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+
+from ..models import Solicitud
+
+# Las respuestas se pueden guardar, pero el cliente debe revalidar con If-None-Match
+CACHE_CONTROL_API = os.getenv("CACHE_CONTROL_API", "private, no-cache")
+
+
+def consulta_watermark():
+    """
+    Marca de cambios barata: max(id) cubre las altas y max(version) las
+    modificaciones; ambas se resuelven con un índice. No se usa
+    fecha_actualizacion: now() es el inicio de la transacción en Postgres (un
+    commit tardío no la hace avanzar) y en SQLite tiene resolución de segundos.
+    """
+    return select(func.max(Solicitud.id), func.max(Solicitud.version))
+
+
+def consulta_version_solicitud(solicitud_id: int):
+    return select(Solicitud.id, Solicitud.version).where(Solicitud.id == solicitud_id)
+
+
+def calcular_etag(*partes) -> str:
+    digest = hashlib.sha1("|".join(str(p) for p in partes).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_de_request(request: Request, watermark) -> str:
+    """ETag del recurso: ruta + query params + watermark de la base."""
+    params = sorted(request.query_params.multi_items())
+    return calcular_etag(request.url.path, params, *watermark)
+
+
+def coincide(request: Request, etag: str) -> bool:
+    valor = request.headers.get("if-none-match")
+    if not valor:
+        return False
+    if valor.strip() == "*":
+        return True
+    # Comparación débil: se ignora el prefijo W/
+    candidatos = {v.strip().removeprefix("W/") for v in valor.split(",")}
+    return etag.removeprefix("W/") in candidatos
+
+
+def no_modificado(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL_API},
+    )
+
+
+def agregar_headers(response: Response, etag: Optional[str]):
+    if etag:
+        response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL_API
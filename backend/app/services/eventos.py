@@ -0,0 +1,257 @@
+import os
+import json
+import uuid
+import select
+import asyncio
+import threading
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import event, func
+from sqlalchemy import select as sa_select
+from sqlalchemy.orm import Session
+
+from ..models import engine
+from ..schemas import SolicitudListResponse
+from .estadisticas import delta_estadisticas
+
+# "memoria": solo llegan los eventos de esta instancia.
+# "postgres": pg_notify en la misma transacción y LISTEN en cada instancia.
+EVENTOS_BACKEND = os.getenv("EVENTOS_BACKEND", "memoria").lower()
+EVENTOS_CANAL = os.getenv("EVENTOS_CANAL", "solicitudes_eventos")
+EVENTOS_COLA = int(os.getenv("EVENTOS_COLA", "100"))
+EVENTOS_HISTORIAL = int(os.getenv("EVENTOS_HISTORIAL", "500"))
+EVENTOS_HEARTBEAT = float(os.getenv("EVENTOS_HEARTBEAT", "15"))
+
+TIPO_CREADA = "creada"
+TIPO_ESTADO = "estado"
+# Otros cambios (p. ej. notas_internas); solo sirve para invalidar caches
+TIPO_ACTUALIZADA = "actualizada"
+TIPO_RESYNC = "resync"
+
+_CLAVE_PENDIENTES = "eventos_pendientes"
+
+
+def _valor(x):
+    return getattr(x, "value", x)
+
+
+class Suscripcion:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.cola: asyncio.Queue = asyncio.Queue(maxsize=EVENTOS_COLA)
+
+    def _entregar(self, evento: dict):
+        if self.cola.full():
+            # Cliente lento: descartar lo acumulado y pedirle que recargue
+            while not self.cola.empty():
+                self.cola.get_nowait()
+            evento = {"id": evento["id"], "tipo": TIPO_RESYNC, "datos": {}}
+        self.cola.put_nowait(evento)
+
+
+class Difusor:
+    """
+    Reparte eventos a las conexiones SSE de este proceso. publicar() se puede
+    llamar desde cualquier hilo; cada suscripción recibe en su event loop.
+    Guarda los últimos eventos para reanudar con Last-Event-ID; los ids llevan
+    el identificador de la instancia porque la numeración es local.
+    """
+
+    def __init__(self, historial: int = EVENTOS_HISTORIAL):
+        self.instancia = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._suscripciones = set()
+        self._historial = deque(maxlen=historial)
+        self._ultimo_id = 0
+        self._oyentes = []
+
+    def agregar_oyente(self, funcion):
+        """funcion(tipo, datos) se llama en el hilo que publica, para cada evento."""
+        self._oyentes.append(funcion)
+
+    def _perdidos(self, ultimo_evento: str) -> list:
+        instancia, _, numero = ultimo_evento.partition("-")
+        resync = [{"id": self._ultimo_id, "tipo": TIPO_RESYNC, "datos": {}}]
+        if instancia != self.instancia or not numero.isdigit():
+            # Reconexión contra otra instancia o tras un reinicio
+            return resync
+        ultimo_id = int(numero)
+        if ultimo_id >= self._ultimo_id:
+            return []
+        if not self._historial or self._historial[0]["id"] > ultimo_id + 1:
+            return resync
+        return [e for e in self._historial if e["id"] > ultimo_id]
+
+    def suscribir(self, ultimo_evento: Optional[str] = None) -> Suscripcion:
+        suscripcion = Suscripcion(asyncio.get_running_loop())
+        with self._lock:
+            if ultimo_evento:
+                for evento in self._perdidos(ultimo_evento):
+                    suscripcion._entregar(evento)
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def desuscribir(self, suscripcion: Suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def publicar(self, tipo: str, datos: dict):
+        with self._lock:
+            self._ultimo_id += 1
+            evento = {"id": self._ultimo_id, "tipo": tipo, "datos": datos}
+            self._historial.append(evento)
+            suscripciones = list(self._suscripciones)
+        for oyente in self._oyentes:
+            try:
+                oyente(tipo, datos)
+            except Exception as e:
+                print(f"Error en oyente de eventos: {e}")
+        for suscripcion in suscripciones:
+            try:
+                suscripcion.loop.call_soon_threadsafe(suscripcion._entregar, evento)
+            except RuntimeError:
+                # Event loop cerrado: la conexión ya terminó
+                self.desuscribir(suscripcion)
+
+    def cantidad(self) -> int:
+        with self._lock:
+            return len(self._suscripciones)
+
+
+difusor = Difusor()
+
+
+def emitir(db: Session, tipo: str, datos: dict):
+    """
+    Registra un evento en la sesión (sirve también con AsyncSession); se
+    publica solo si la transacción hace commit.
+    """
+    db.info.setdefault(_CLAVE_PENDIENTES, []).append((tipo, datos))
+
+
+def emitir_creada(db: Session, solicitud):
+    fila = SolicitudListResponse.model_validate(solicitud).model_dump(mode="json")
+    emitir(db, TIPO_CREADA, {
+        "solicitud": fila,
+        "delta": delta_estadisticas(fila["area_solicitante"], fila["urgencia"], fila["estado"]),
+    })
+
+
+def emitir_estado(db: Session, solicitud_id: int, numero_solicitud: str, area, urgencia, estado, estado_anterior):
+    estado, estado_anterior = _valor(estado), _valor(estado_anterior)
+    if estado == estado_anterior:
+        return
+    emitir(db, TIPO_ESTADO, {
+        "id": solicitud_id,
+        "numero_solicitud": numero_solicitud,
+        "estado": estado,
+        "estado_anterior": estado_anterior,
+        "area_solicitante": _valor(area),
+        "delta": delta_estadisticas(_valor(area), _valor(urgencia), estado, estado_anterior),
+    })
+
+
+def emitir_actualizada(db: Session, solicitud_id: int):
+    emitir(db, TIPO_ACTUALIZADA, {"id": solicitud_id})
+
+
+@event.listens_for(Session, "before_commit")
+def _notificar_postgres(session: Session):
+    if EVENTOS_BACKEND != "postgres":
+        return
+    for tipo, datos in session.info.pop(_CLAVE_PENDIENTES, []):
+        # NOTIFY es transaccional: se entrega a los LISTEN recién con el commit
+        carga = json.dumps({"tipo": tipo, "datos": datos})
+        session.execute(sa_select(func.pg_notify(EVENTOS_CANAL, carga)))
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_pendientes(session: Session):
+    for tipo, datos in session.info.pop(_CLAVE_PENDIENTES, []):
+        difusor.publicar(tipo, datos)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_pendientes(session: Session):
+    session.info.pop(_CLAVE_PENDIENTES, None)
+
+
+class EscuchaPostgres:
+    """Hilo con una conexión dedicada en LISTEN que reenvía los NOTIFY al difusor local."""
+
+    def __init__(self, canal: str = EVENTOS_CANAL):
+        self.canal = canal
+        self._detener = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._detener.clear()
+        self._thread = threading.Thread(target=self._run, name="eventos-listen", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._detener.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _conectar(self):
+        import psycopg2
+
+        url = engine.url.set(drivername="postgresql")
+        conn = psycopg2.connect(**url.translate_connect_args(database="dbname", username="user"), **url.query)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN "{self.canal}"')
+        return conn
+
+    def _run(self):
+        while not self._detener.is_set():
+            conn = None
+            try:
+                conn = self._conectar()
+                # Lo publicado mientras no había conexión se perdió
+                difusor.publicar(TIPO_RESYNC, {})
+                while not self._detener.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        carga = json.loads(conn.notifies.pop(0).payload)
+                        difusor.publicar(carga["tipo"], carga["datos"])
+            except Exception as e:
+                print(f"Error en LISTEN de eventos: {e}")
+                self._detener.wait(5)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+escucha_postgres = EscuchaPostgres()
+
+
+def formatear_sse(evento: dict) -> str:
+    return (
+        f"id: {difusor.instancia}-{evento['id']}\n"
+        f"event: {evento['tipo']}\n"
+        f"data: {json.dumps(evento['datos'])}\n\n"
+    )
+
+
+async def flujo_sse(ultimo_evento: Optional[str] = None):
+    """Generador para StreamingResponse: eventos más un comentario periódico de keep-alive."""
+    suscripcion = difusor.suscribir(ultimo_evento)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                evento = await asyncio.wait_for(suscripcion.cola.get(), EVENTOS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield formatear_sse(evento)
+    finally:
+        difusor.desuscribir(suscripcion)
@@ -0,0 +1,111 @@
+import csv
+import enum
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from ..models import Solicitud
+
+EXPORTACION_YIELD_PER = int(os.getenv("EXPORTACION_YIELD_PER", "1000"))
+
+# Mismo orden de columnas que la hoja de Google Sheets, más id y fechas
+CAMPOS_EXPORTACION = [
+    "id",
+    "numero_solicitud",
+    "fecha_creacion",
+    "area_solicitante",
+    "nombre_solicitante",
+    "email_solicitante",
+    "titulo_proceso",
+    "descripcion_proceso",
+    "situacion_actual",
+    "resultado_esperado",
+    "urgencia",
+    "impacto",
+    "frecuencia_proceso",
+    "tiempo_manual_estimado",
+    "sistemas_involucrados",
+    "enlaces_documentacion",
+    "estado",
+    "fecha_actualizacion",
+    "notas_internas",
+]
+COLUMNAS_EXPORTACION = [getattr(Solicitud, campo) for campo in CAMPOS_EXPORTACION]
+
+FORMATOS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+
+def _valor(v):
+    if isinstance(v, enum.Enum):
+        return v.value
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return v
+
+
+def _fila(row) -> list:
+    return [_valor(v) for v in row]
+
+
+def generar_csv(filas: Iterable) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM para que Excel detecte UTF-8 (acentos en nombres y descripciones)
+    buffer.write("\ufeff")
+    writer.writerow(CAMPOS_EXPORTACION)
+    for i, row in enumerate(filas, 1):
+        writer.writerow(["" if v is None else v for v in _fila(row)])
+        if i % 100 == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def generar_ndjson(filas: Iterable) -> Iterator[bytes]:
+    lote = []
+    for row in filas:
+        lote.append(json.dumps(dict(zip(CAMPOS_EXPORTACION, _fila(row))), ensure_ascii=False))
+        if len(lote) >= 100:
+            yield ("\n".join(lote) + "\n").encode("utf-8")
+            lote = []
+    if lote:
+        yield ("\n".join(lote) + "\n").encode("utf-8")
+
+
+def generar_xlsx(filas: Iterable, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    XLSX es un zip: no se puede enviar hasta cerrarlo. Se escribe con
+    XlsxWriter en modo constant_memory a un archivo temporal (memoria
+    constante) y después se envía por bloques.
+    """
+    import xlsxwriter
+
+    with tempfile.TemporaryFile() as tmp:
+        workbook = xlsxwriter.Workbook(tmp, {"constant_memory": True, "in_memory": False})
+        hoja = workbook.add_worksheet("Solicitudes")
+        hoja.write_row(0, 0, CAMPOS_EXPORTACION)
+        for i, row in enumerate(filas, 1):
+            hoja.write_row(i, 0, _fila(row))
+        workbook.close()
+
+        tmp.seek(0)
+        while True:
+            bloque = tmp.read(chunk_size)
+            if not bloque:
+                break
+            yield bloque
+
+
+GENERADORES = {
+    "csv": generar_csv,
+    "ndjson": generar_ndjson,
+    "xlsx": generar_xlsx,
+}
@@ -1,113 +1,389 @@
 import os
+import re
 import json
-from typing import Optional
+import threading
+from typing import Optional, Dict, List, Set
 
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from httplib2 import ServerNotFoundError  # 👈 importa este
 
+from ..models import SessionLocal, SheetsFila
+from .metricas import medir_sheets
+from .limites import compuerta_sheets, sheets_diferidas, SheetsSaturado, SHEETS_PAUSA_CUOTA
+
+# Leer la celda A antes de escribir; desactivarlo ahorra una lectura por lote
+# pero escribe en la fila equivocada si alguien reordena la hoja
+SHEETS_VERIFICAR_FILA = os.getenv("SHEETS_VERIFICAR_FILA", "true").lower() == "true"
+
+_FILA_RE = re.compile(r"![A-Z]+(\d+)")
+
+
+def fila_desde_rango(rango: str) -> Optional[int]:
+    """Extrae el número de fila de un rango A1 como 'Solicitudes!A12:P12'."""
+    match = _FILA_RE.search(rango or "")
+    return int(match.group(1)) if match else None
+
+
+class IndiceFilas:
+    """
+    Índice numero_solicitud -> fila de la hoja.
+
+    Se mantiene en memoria y se persiste en la tabla sheets_filas para que
+    sobreviva reinicios y sea compartido entre instancias.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._filas: Dict[str, int] = {}
+        self._cargado = False
+        self._lock = threading.Lock()
+
+    def obtener(self, numero_solicitud: str) -> Optional[int]:
+        with self._lock:
+            if numero_solicitud not in self._filas:
+                self._cargar_de_bd(numero_solicitud)
+            return self._filas.get(numero_solicitud)
+
+    def registrar(self, numero_solicitud: str, fila: int):
+        self.registrar_varias({numero_solicitud: fila})
+
+    def registrar_varias(self, filas: Dict[str, int]):
+        with self._lock:
+            self._filas.update(filas)
+        db = self.session_factory()
+        try:
+            for numero_solicitud, fila in filas.items():
+                db.merge(SheetsFila(numero_solicitud=numero_solicitud, fila=fila))
+            db.commit()
+        except Exception as e:
+            # El índice es solo una optimización: si falla, se reconstruye luego
+            db.rollback()
+            print(f"Error persistiendo índice de filas de Google Sheets: {e}")
+        finally:
+            db.close()
+
+    def reemplazar(self, filas: Dict[str, int]):
+        """Sustituye el índice completo (tras reconstruirlo desde la columna A)."""
+        with self._lock:
+            self._filas = dict(filas)
+            self._cargado = True
+        db = self.session_factory()
+        try:
+            db.query(SheetsFila).delete(synchronize_session=False)
+            db.bulk_insert_mappings(
+                SheetsFila,
+                [{"numero_solicitud": n, "fila": f} for n, f in filas.items()]
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error persistiendo índice de filas de Google Sheets: {e}")
+        finally:
+            db.close()
+
+    def _cargar_de_bd(self, numero_solicitud: str):
+        db = self.session_factory()
+        try:
+            if not self._cargado:
+                self._filas.update({r.numero_solicitud: r.fila for r in db.query(SheetsFila).all()})
+                self._cargado = True
+            else:
+                # Otra instancia pudo registrar la fila después de la carga inicial
+                registro = db.get(SheetsFila, numero_solicitud)
+                if registro:
+                    self._filas[numero_solicitud] = registro.fila
+        finally:
+            db.close()
+
 class GoogleSheetsService:
+    """
+    El cliente de la API se construye en el primer uso (no al importar) para
+    no pagar la importación de googleapiclient ni build() en el arranque.
+    """
+
     def __init__(self):
         self.spreadsheet_id = os.getenv("GOOGLE_SHEET_ID", "")
         self.credentials_json = os.getenv("GOOGLE_CREDENTIALS_JSON", "")
-        self.service = None
+        self.indice_filas = IndiceFilas()
+        self._service = None
+        self._inicializado = False
+        self._init_lock = threading.Lock()
 
-        if self.credentials_json and self.spreadsheet_id:
-            self._initialize_service()
-        else:
+        if not self.configurado:
             print("Google Sheets: variables de entorno no configuradas, se desactiva integración.")
 
+    @property
+    def configurado(self) -> bool:
+        return bool(self.credentials_json and self.spreadsheet_id)
+
+    @property
+    def service(self):
+        if not self._inicializado:
+            with self._init_lock:
+                if not self._inicializado:
+                    if self.configurado:
+                        self._initialize_service()
+                    self._inicializado = True
+        return self._service
+
     def _initialize_service(self):
         try:
+            from google.oauth2 import service_account
+            from googleapiclient.discovery import build
+
             credentials_info = json.loads(self.credentials_json)
             credentials = service_account.Credentials.from_service_account_info(
                 credentials_info,
                 scopes=['https://www.googleapis.com/auth/spreadsheets']
             )
-            self.service = build('sheets', 'v4', credentials=credentials)
+            # Documento de discovery empaquetado con la librería: sin llamada de red
+            self._service = build(
+                'sheets', 'v4',
+                credentials=credentials,
+                static_discovery=True,
+                cache_discovery=False,
+            )
             print("Google Sheets service inicializado correctamente.")
         except Exception as e:
             print(f"Error initializing Google Sheets service: {e}")
-            self.service = None
+            self._service = None
+
+    @staticmethod
+    def _ejecutar(operacion: str, request):
+        """
+        Ejecuta un request dentro de la compuerta de concurrencia y cuota.
+        Un 429 de Google pausa las demás llamadas en lugar de seguir insistiendo.
+        """
+        with compuerta_sheets.turno(operacion):
+            try:
+                return medir_sheets(operacion, request)
+            except HttpError as error:
+                if error.resp.status == 429:
+                    retry_after = error.resp.get("retry-after", "")
+                    pausa = float(retry_after) if retry_after.isdigit() else SHEETS_PAUSA_CUOTA
+                    compuerta_sheets.pausar(pausa)
+                    sheets_diferidas.inc(operacion="cuota")
+                    print(f"Cuota de Google Sheets agotada, se pausan las llamadas {pausa:.0f}s")
+                raise
 
     def append_solicitud(self, solicitud_data: dict) -> bool:
+        return self.append_solicitudes([solicitud_data])
+
+    def append_solicitudes(self, lista_datos: List[dict]) -> bool:
+        """Agrega varias solicitudes con una sola llamada values().append."""
         if not self.service:
             print("Google Sheets service not initialized, se omite append.")
             return False
 
+        if not lista_datos:
+            return True
+
         try:
-            values = [[
-                solicitud_data.get("numero_solicitud", ""),
-                solicitud_data.get("fecha_creacion", ""),
-                solicitud_data.get("area_solicitante", ""),
-                solicitud_data.get("nombre_solicitante", ""),
-                solicitud_data.get("email_solicitante", ""),
-                solicitud_data.get("titulo_proceso", ""),
-                solicitud_data.get("descripcion_proceso", ""),
-                solicitud_data.get("situacion_actual", ""),
-                solicitud_data.get("resultado_esperado", ""),
-                solicitud_data.get("urgencia", ""),
-                solicitud_data.get("impacto", ""),
-                solicitud_data.get("frecuencia_proceso", ""),
-                solicitud_data.get("tiempo_manual_estimado", ""),
-                solicitud_data.get("sistemas_involucrados", ""),
-                solicitud_data.get("enlaces_documentacion", ""),
-                solicitud_data.get("estado", "Recibido"),
-            ]]
+            values = [self.fila_solicitud(datos) for datos in lista_datos]
 
             body = {'values': values}
 
-            result = self.service.spreadsheets().values().append(
-                spreadsheetId=self.spreadsheet_id,
-                range='Solicitudes!A:P',
-                valueInputOption='USER_ENTERED',
-                insertDataOption='INSERT_ROWS',
-                body=body
-            ).execute()
+            result = self._ejecutar(
+                "append",
+                self.service.spreadsheets().values().append(
+                    spreadsheetId=self.spreadsheet_id,
+                    range='Solicitudes!A:P',
+                    valueInputOption='USER_ENTERED',
+                    insertDataOption='INSERT_ROWS',
+                    body=body
+                )
+            )
+
+            print(f"{len(values)} solicitud(es) added to Google Sheets: {result.get('updates', {}).get('updatedRange')}")
 
-            print(f"Solicitud added to Google Sheets: {result}")
+            # Las filas agregadas son consecutivas a partir de la primera del rango
+            primera = fila_desde_rango(result.get("updates", {}).get("updatedRange", ""))
+            if primera:
+                self.indice_filas.registrar_varias({
+                    datos.get("numero_solicitud", ""): primera + i
+                    for i, datos in enumerate(lista_datos)
+                })
             return True
 
+        except SheetsSaturado:
+            # El outbox la deja pendiente sin contar un intento fallido
+            raise
         except (HttpError, ServerNotFoundError, Exception) as error:
             # 👈 ahora se captura también el problema de red
             print(f"Error appending to Google Sheets: {error}")
             return False
 
     def update_estado(self, numero_solicitud: str, nuevo_estado: str) -> bool:
+        return numero_solicitud in self.update_estados({numero_solicitud: nuevo_estado})
+
+    def update_estados(self, estados: Dict[str, str]) -> Set[str]:
+        """
+        Actualiza la columna Estado de varias solicitudes con un solo
+        values().batchUpdate. Devuelve los numero_solicitud actualizados.
+        """
         if not self.service:
             print("Google Sheets service not initialized, se omite update_estado.")
-            return False
+            return set()
+
+        if not estados:
+            return set()
 
         try:
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range='Solicitudes!A:P'
-            ).execute()
-
-            values = result.get('values', [])
-
-            for i, row in enumerate(values):
-                if row and row[0] == numero_solicitud:
-                    range_to_update = f'Solicitudes!P{i+1}'
-                    body = {'values': [[nuevo_estado]]}
-
-                    self.service.spreadsheets().values().update(
-                        spreadsheetId=self.spreadsheet_id,
-                        range=range_to_update,
-                        valueInputOption='USER_ENTERED',
-                        body=body
-                    ).execute()
-                    print(f"Estado actualizado en Google Sheets para {numero_solicitud} -> {nuevo_estado}")
-                    return True
-
-            print(f"No se encontró la solicitud {numero_solicitud} en Google Sheets.")
+            filas = self._localizar_filas(list(estados))
+
+            faltantes = set(estados) - set(filas)
+            for numero_solicitud in faltantes:
+                print(f"No se encontró la solicitud {numero_solicitud} en Google Sheets.")
+
+            if not filas:
+                return set()
+
+            data = [
+                {'range': f'Solicitudes!P{fila}', 'values': [[estados[numero]]]}
+                for numero, fila in filas.items()
+            ]
+
+            self._ejecutar(
+                "batchUpdate",
+                self.service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=self.spreadsheet_id,
+                    body={'valueInputOption': 'USER_ENTERED', 'data': data}
+                )
+            )
+            print(f"Estado actualizado en Google Sheets para {len(filas)} solicitud(es)")
+            return set(filas)
+
+        except SheetsSaturado:
+            # El outbox la deja pendiente sin contar un intento fallido
+            raise
+        except (HttpError, ServerNotFoundError, Exception) as error:
+            print(f"Error updating Google Sheets: {error}")
+            return set()
+
+    def leer_filas(self, inicio: int, fin: int) -> Optional[List[list]]:
+        """Lee las filas inicio..fin (A:P). Devuelve None si hubo error."""
+        if not self.service:
+            print("Google Sheets service not initialized, se omite leer_filas.")
+            return None
+
+        try:
+            result = self._ejecutar(
+                "get",
+                self.service.spreadsheets().values().get(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f'Solicitudes!A{inicio}:P{fin}'
+                )
+            )
+            return result.get('values', [])
+
+        except (HttpError, ServerNotFoundError, Exception) as error:
+            print(f"Error reading Google Sheets: {error}")
+            return None
+
+    def actualizar_filas(self, filas: Dict[int, list]) -> bool:
+        """Reescribe filas completas (A:P) con un solo values().batchUpdate."""
+        if not self.service:
+            print("Google Sheets service not initialized, se omite actualizar_filas.")
             return False
 
+        if not filas:
+            return True
+
+        try:
+            data = [
+                {'range': f'Solicitudes!A{fila}:P{fila}', 'values': [valores]}
+                for fila, valores in filas.items()
+            ]
+            self._ejecutar(
+                "batchUpdate",
+                self.service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=self.spreadsheet_id,
+                    body={'valueInputOption': 'USER_ENTERED', 'data': data}
+                )
+            )
+            print(f"{len(filas)} fila(s) reescritas en Google Sheets")
+            return True
+
         except (HttpError, ServerNotFoundError, Exception) as error:
             print(f"Error updating Google Sheets: {error}")
             return False
 
+    @staticmethod
+    def fila_solicitud(solicitud_data: dict) -> list:
+        return [
+            solicitud_data.get("numero_solicitud", ""),
+            solicitud_data.get("fecha_creacion", ""),
+            solicitud_data.get("area_solicitante", ""),
+            solicitud_data.get("nombre_solicitante", ""),
+            solicitud_data.get("email_solicitante", ""),
+            solicitud_data.get("titulo_proceso", ""),
+            solicitud_data.get("descripcion_proceso", ""),
+            solicitud_data.get("situacion_actual", ""),
+            solicitud_data.get("resultado_esperado", ""),
+            solicitud_data.get("urgencia", ""),
+            solicitud_data.get("impacto", ""),
+            solicitud_data.get("frecuencia_proceso", ""),
+            solicitud_data.get("tiempo_manual_estimado", ""),
+            solicitud_data.get("sistemas_involucrados", ""),
+            solicitud_data.get("enlaces_documentacion", ""),
+            solicitud_data.get("estado", "Recibido"),
+        ]
+
+    def _localizar_filas(self, numeros: List[str]) -> Dict[str, int]:
+        """
+        Devuelve las filas de las solicitudes usando el índice. Antes de
+        escribir se lee en un solo batchGet la celda A de esas filas: si alguna
+        no está indexada o no coincide (filas movidas, ordenadas o borradas a
+        mano), se reconstruye el índice leyendo únicamente la columna A.
+        """
+        filas = {}
+        for numero in numeros:
+            fila = self.indice_filas.obtener(numero)
+            if fila:
+                filas[numero] = fila
+
+        if filas and SHEETS_VERIFICAR_FILA:
+            filas = self._verificar_filas(filas)
+
+        if len(filas) == len(numeros):
+            return filas
+
+        indice = self._leer_columna_numeros()
+        self.indice_filas.reemplazar(indice)
+        return {n: indice[n] for n in numeros if n in indice}
+
+    def _verificar_filas(self, filas: Dict[str, int]) -> Dict[str, int]:
+        """Las filas del índice cuya celda A todavía tiene ese numero_solicitud."""
+        orden = list(filas)
+        result = self._ejecutar(
+            "batchGet",
+            self.service.spreadsheets().values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=[f'Solicitudes!A{filas[n]}' for n in orden]
+            )
+        )
+        rangos = result.get('valueRanges', [])
+        verificadas = {}
+        for i, numero in enumerate(orden):
+            values = rangos[i].get('values', []) if i < len(rangos) else []
+            if values and values[0] and values[0][0] == numero:
+                verificadas[numero] = filas[numero]
+        return verificadas
+
+    def _leer_columna_numeros(self) -> Dict[str, int]:
+        result = self._ejecutar(
+            "get",
+            self.service.spreadsheets().values().get(
+                spreadsheetId=self.spreadsheet_id,
+                range='Solicitudes!A:A'
+            )
+        )
+        return {
+            row[0]: i + 1
+            for i, row in enumerate(result.get('values', []))
+            if row and row[0]
+        }
+
     def setup_headers(self) -> bool:
         if not self.service:
             print("Google Sheets service not initialized, se omite setup_headers.")
@@ -135,12 +411,15 @@ class GoogleSheetsService:
 
             body = {'values': headers}
 
-            self.service.spreadsheets().values().update(
-                spreadsheetId=self.spreadsheet_id,
-                range='Solicitudes!A1:P1',
-                valueInputOption='USER_ENTERED',
-                body=body
-            ).execute()
+            self._ejecutar(
+                "update",
+                self.service.spreadsheets().values().update(
+                    spreadsheetId=self.spreadsheet_id,
+                    range='Solicitudes!A1:P1',
+                    valueInputOption='USER_ENTERED',
+                    body=body
+                )
+            )
 
             print("Encabezados configurados en Google Sheets.")
             return True
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..models import ClaveIdempotencia
+
+IDEMPOTENCIA_TTL = float(os.getenv("IDEMPOTENCIA_TTL", "86400"))
+# Cada cuánto una instancia borra las claves vencidas (en la transacción de un alta)
+IDEMPOTENCIA_PURGA = float(os.getenv("IDEMPOTENCIA_PURGA", "600"))
+
+NUEVA = "nueva"
+REPETIDA = "repetida"
+CONFLICTO = "conflicto"
+
+
+def huella(datos: dict) -> str:
+    """Hash del cuerpo para detectar la misma clave usada con otro contenido."""
+    return hashlib.sha256(json.dumps(datos, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class AlmacenIdempotencia:
+    """
+    Respuestas ya enviadas por Idempotency-Key, en la tabla claves_idempotencia
+    para que un reintento que llega a otra instancia también las encuentre.
+
+    reservar() inserta la clave en la transacción del alta. Un duplicado
+    concurrente choca con la llave primaria: en Postgres su INSERT espera al
+    commit del primero y luego ve la respuesta guardada. Si el alta falla, el
+    rollback se lleva la clave y el cliente puede reintentar.
+    """
+
+    def __init__(self, ttl: float = IDEMPOTENCIA_TTL, purga: float = IDEMPOTENCIA_PURGA):
+        self.ttl = ttl
+        self.purga = purga
+        self._ultima_purga = 0.0
+        self._lock = threading.Lock()
+
+    def sentencia_reservar(self, dialecto: str, clave: str, huella_cuerpo: str, ahora: datetime):
+        """Inserta la clave, o la reutiliza si venció. RETURNING vacío: ya existe y sigue vigente."""
+        insertar = pg_insert if dialecto == "postgresql" else sqlite_insert
+        valores = {"huella": huella_cuerpo, "solicitud_id": None, "status": None, "respuesta": None,
+                   "expira": ahora + timedelta(seconds=self.ttl)}
+        stmt = insertar(ClaveIdempotencia).values(clave=clave, **valores)
+        return stmt.on_conflict_do_update(
+            index_elements=[ClaveIdempotencia.clave],
+            set_=valores,
+            where=ClaveIdempotencia.expira <= ahora,
+        ).returning(ClaveIdempotencia.clave)
+
+    @staticmethod
+    def consulta_clave(clave: str):
+        return select(ClaveIdempotencia.huella, ClaveIdempotencia.status, ClaveIdempotencia.respuesta).where(
+            ClaveIdempotencia.clave == clave
+        )
+
+    @staticmethod
+    def _resultado(fila, huella_cuerpo: str) -> Tuple[str, Optional[Any], Optional[int]]:
+        if fila.huella != huella_cuerpo:
+            return CONFLICTO, None, None
+        return REPETIDA, json.loads(fila.respuesta), fila.status
+
+    def _toca_purgar(self) -> bool:
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora - self._ultima_purga < self.purga:
+                return False
+            self._ultima_purga = ahora
+            return True
+
+    def reservar(self, db, clave: str, huella_cuerpo: str) -> Tuple[str, Optional[Any], Optional[int]]:
+        """(NUEVA | REPETIDA | CONFLICTO, respuesta guardada, status guardado)."""
+        ahora = datetime.now(timezone.utc)
+        stmt = self.sentencia_reservar(db.get_bind().dialect.name, clave, huella_cuerpo, ahora)
+        if db.execute(stmt).first() is not None:
+            return NUEVA, None, None
+        return self._resultado(db.execute(self.consulta_clave(clave)).one(), huella_cuerpo)
+
+    async def reservar_async(self, db, clave: str, huella_cuerpo: str) -> Tuple[str, Optional[Any], Optional[int]]:
+        ahora = datetime.now(timezone.utc)
+        stmt = self.sentencia_reservar(db.get_bind().dialect.name, clave, huella_cuerpo, ahora)
+        if (await db.execute(stmt)).first() is not None:
+            return NUEVA, None, None
+        return self._resultado((await db.execute(self.consulta_clave(clave))).one(), huella_cuerpo)
+
+    def _sentencias_guardar(self, clave: str, solicitud_id: int, status: int, respuesta: dict):
+        sentencias = [
+            update(ClaveIdempotencia)
+            .where(ClaveIdempotencia.clave == clave)
+            .values(solicitud_id=solicitud_id, status=status, respuesta=json.dumps(respuesta, default=str))
+        ]
+        if self._toca_purgar():
+            sentencias.append(
+                delete(ClaveIdempotencia).where(ClaveIdempotencia.expira <= datetime.now(timezone.utc))
+            )
+        return sentencias
+
+    def guardar(self, db, clave: str, solicitud_id: int, status: int, respuesta: dict):
+        """Completa la clave reservada; se confirma con el commit del alta."""
+        for stmt in self._sentencias_guardar(clave, solicitud_id, status, respuesta):
+            db.execute(stmt)
+
+    async def guardar_async(self, db, clave: str, solicitud_id: int, status: int, respuesta: dict):
+        for stmt in self._sentencias_guardar(clave, solicitud_id, status, respuesta):
+            await db.execute(stmt)
+
+
+almacen_idempotencia = AlmacenIdempotencia()
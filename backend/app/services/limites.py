@@ -0,0 +1,245 @@
+import os
+import math
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from .metricas import registro, Contador
+
+# Escrituras por cliente y totales de la instancia (tokens por segundo y ráfaga); 0 desactiva
+LIMITE_CLIENTE_POR_SEGUNDO = float(os.getenv("LIMITE_CLIENTE_POR_SEGUNDO", "1"))
+LIMITE_CLIENTE_RAFAGA = int(os.getenv("LIMITE_CLIENTE_RAFAGA", "10"))
+LIMITE_GLOBAL_POR_SEGUNDO = float(os.getenv("LIMITE_GLOBAL_POR_SEGUNDO", "50"))
+LIMITE_GLOBAL_RAFAGA = int(os.getenv("LIMITE_GLOBAL_RAFAGA", "100"))
+LIMITE_CLIENTES_MAX = int(os.getenv("LIMITE_CLIENTES_MAX", "10000"))
+# Proxies que agregan una entrada a X-Forwarded-For (Cloud Run agrega una); 0 usa la IP del socket
+LIMITE_SALTOS_PROXY = int(os.getenv("LIMITE_SALTOS_PROXY", "1"))
+
+# Escrituras simultáneas contra la base y cuánto puede esperar turno una nueva
+LIMITE_ESCRITURAS_CONCURRENTES = int(os.getenv("LIMITE_ESCRITURAS_CONCURRENTES", "20"))
+LIMITE_ESPERA_ESCRITURA = float(os.getenv("LIMITE_ESPERA_ESCRITURA", "2"))
+
+# Llamadas a Google Sheets: simultáneas y por minuto (cuota de escritura de la API: 60/min)
+SHEETS_CONCURRENCIA = int(os.getenv("SHEETS_CONCURRENCIA", "2"))
+SHEETS_POR_MINUTO = float(os.getenv("SHEETS_POR_MINUTO", "60"))
+SHEETS_ESPERA_MAX = float(os.getenv("SHEETS_ESPERA_MAX", "10"))
+# Pausa tras un 429 de Google si la respuesta no trae Retry-After
+SHEETS_PAUSA_CUOTA = float(os.getenv("SHEETS_PAUSA_CUOTA", "60"))
+
+MOTIVO_CLIENTE = "cliente"
+MOTIVO_GLOBAL = "global"
+MOTIVO_CONCURRENCIA = "concurrencia"
+
+limite_rechazos = registro.registrar(Contador(
+    "limite_rechazos_total", "Escrituras rechazadas con 429 por motivo"
+))
+limite_esperas = registro.registrar(Contador(
+    "limite_esperas_total", "Escrituras que esperaron turno por el límite de concurrencia"
+))
+sheets_esperas = registro.registrar(Contador(
+    "sheets_esperas_total", "Llamadas a Google Sheets que esperaron turno o token"
+))
+sheets_diferidas = registro.registrar(Contador(
+    "sheets_diferidas_total", "Llamadas o lotes de Google Sheets postergados por el límite o la cuota"
+))
+
+
+def segundos_reintento(espera: float) -> str:
+    """Valor para el header Retry-After (segundos enteros, al menos 1)."""
+    return str(max(1, math.ceil(espera)))
+
+
+class CuboTokens:
+    """Token bucket: `tasa` tokens por segundo hasta `capacidad` acumulados."""
+
+    def __init__(self, tasa: float, capacidad: float):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._tokens = float(capacidad)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _recargar(self, ahora: float):
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def tomar(self, cantidad: float = 1) -> float:
+        """Consume tokens y devuelve 0, o devuelve los segundos que faltan sin consumir."""
+        with self._lock:
+            self._recargar(time.monotonic())
+            if self._tokens >= cantidad:
+                self._tokens -= cantidad
+                return 0.0
+            return (cantidad - self._tokens) / self.tasa
+
+    def faltante(self, cantidad: float = 1) -> float:
+        """Segundos hasta tener `cantidad` tokens, sin consumirlos."""
+        with self._lock:
+            self._recargar(time.monotonic())
+            return max(0.0, (cantidad - self._tokens) / self.tasa)
+
+    def devolver(self, cantidad: float = 1):
+        with self._lock:
+            self._tokens = min(self.capacidad, self._tokens + cantidad)
+
+    def lleno(self) -> bool:
+        with self._lock:
+            self._recargar(time.monotonic())
+            return self._tokens >= self.capacidad
+
+
+class LimitadorEscrituras:
+    """
+    Un cubo por cliente (los menos usados se descartan al pasar `maximo`) y
+    uno global para la instancia. admitir() devuelve None o (motivo, segundos
+    para reintentar).
+    """
+
+    def __init__(
+        self,
+        tasa_cliente: float = LIMITE_CLIENTE_POR_SEGUNDO,
+        rafaga_cliente: int = LIMITE_CLIENTE_RAFAGA,
+        tasa_global: float = LIMITE_GLOBAL_POR_SEGUNDO,
+        rafaga_global: int = LIMITE_GLOBAL_RAFAGA,
+        maximo: int = LIMITE_CLIENTES_MAX,
+    ):
+        self.tasa_cliente = tasa_cliente
+        self.rafaga_cliente = rafaga_cliente
+        self.maximo = maximo
+        self.global_ = CuboTokens(tasa_global, rafaga_global) if tasa_global > 0 else None
+        self._lock = threading.Lock()
+        self._clientes: "OrderedDict[str, CuboTokens]" = OrderedDict()
+
+    @property
+    def activo(self) -> bool:
+        return self.tasa_cliente > 0 or self.global_ is not None
+
+    def _cubo_cliente(self, cliente: str) -> CuboTokens:
+        with self._lock:
+            cubo = self._clientes.get(cliente)
+            if cubo is None:
+                cubo = self._clientes[cliente] = CuboTokens(self.tasa_cliente, self.rafaga_cliente)
+                # Solo se descartan cubos llenos: olvidar uno a medio gastar regalaría su ráfaga
+                while len(self._clientes) > self.maximo and next(iter(self._clientes.values())).lleno():
+                    self._clientes.popitem(last=False)
+            else:
+                self._clientes.move_to_end(cliente)
+            return cubo
+
+    def admitir(self, cliente: str) -> Optional[Tuple[str, float]]:
+        cubo = self._cubo_cliente(cliente) if self.tasa_cliente > 0 else None
+        if cubo is not None:
+            espera = cubo.tomar()
+            if espera:
+                return MOTIVO_CLIENTE, espera
+        if self.global_ is not None:
+            espera = self.global_.tomar()
+            if espera:
+                # El cliente no llegó a usar su token
+                if cubo is not None:
+                    cubo.devolver()
+                return MOTIVO_GLOBAL, espera
+        return None
+
+
+class CompuertaEscrituras:
+    """
+    Límite de escrituras en curso en esta instancia. Una escritura que no
+    consigue turno en `espera` segundos se rechaza en vez de acumularse
+    sobre el pool de conexiones.
+    """
+
+    def __init__(self, maximo: int = LIMITE_ESCRITURAS_CONCURRENTES, espera: float = LIMITE_ESPERA_ESCRITURA):
+        self.maximo = maximo
+        self.espera = espera
+        self.en_curso = 0
+        self._semaforo: Optional[asyncio.Semaphore] = None
+
+    @property
+    def activo(self) -> bool:
+        return self.maximo > 0
+
+    async def entrar(self) -> bool:
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.maximo)
+        if self._semaforo.locked():
+            limite_esperas.inc()
+            try:
+                await asyncio.wait_for(self._semaforo.acquire(), self.espera)
+            except asyncio.TimeoutError:
+                return False
+        else:
+            await self._semaforo.acquire()
+        self.en_curso += 1
+        return True
+
+    def salir(self):
+        self.en_curso -= 1
+        self._semaforo.release()
+
+
+class SheetsSaturado(Exception):
+    """No hubo turno o token para llamar a Google Sheets dentro de la espera máxima."""
+
+    def __init__(self, espera: float):
+        super().__init__(f"Google Sheets saturado, reintentar en {espera:.1f}s")
+        self.espera = espera
+
+
+class CompuertaSheets:
+    """
+    Concurrencia y ritmo de las llamadas a Google Sheets de esta instancia.
+    Un 429 de Google pausa todas las llamadas hasta su Retry-After.
+    """
+
+    def __init__(
+        self,
+        concurrencia: int = SHEETS_CONCURRENCIA,
+        por_minuto: float = SHEETS_POR_MINUTO,
+        espera_max: float = SHEETS_ESPERA_MAX,
+    ):
+        self.espera_max = espera_max
+        self._semaforo = threading.BoundedSemaphore(concurrencia) if concurrencia > 0 else None
+        # Ráfaga de un sexto de la cuota por minuto: un lote grande no la agota de golpe
+        self.cubo = CuboTokens(por_minuto / 60, max(1.0, por_minuto / 6)) if por_minuto > 0 else None
+        self._pausa_hasta = 0.0
+
+    def pausar(self, segundos: float):
+        self._pausa_hasta = max(self._pausa_hasta, time.monotonic() + segundos)
+
+    def espera(self) -> float:
+        """Segundos que faltan para poder llamar (pausa por cuota o cubo vacío), sin consumir."""
+        espera = max(0.0, self._pausa_hasta - time.monotonic())
+        if self.cubo is not None:
+            espera = max(espera, self.cubo.faltante())
+        return espera
+
+    @contextmanager
+    def turno(self, operacion: str):
+        limite = time.monotonic() + self.espera_max
+        if self._semaforo is not None and not self._semaforo.acquire(timeout=self.espera_max):
+            sheets_diferidas.inc(operacion=operacion)
+            raise SheetsSaturado(self.espera_max)
+        try:
+            while True:
+                pausa = max(0.0, self._pausa_hasta - time.monotonic())
+                espera = pausa or (self.cubo.tomar() if self.cubo is not None else 0.0)
+                if not espera:
+                    break
+                if time.monotonic() + espera > limite:
+                    sheets_diferidas.inc(operacion=operacion)
+                    raise SheetsSaturado(espera)
+                sheets_esperas.inc(operacion=operacion)
+                time.sleep(espera)
+            yield
+        finally:
+            if self._semaforo is not None:
+                self._semaforo.release()
+
+
+limitador_escrituras = LimitadorEscrituras()
+compuerta_escrituras = CompuertaEscrituras()
+compuerta_sheets = CompuertaSheets()
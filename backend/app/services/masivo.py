@@ -0,0 +1,168 @@
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select, update
+
+from ..models import Solicitud, SheetsOutbox, Estado
+from ..schemas import ResultadoItemBulk, SolicitudBulkResponse
+from . import eventos, similitud, transiciones
+
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "500"))
+
+
+def validar_tamano(items: list):
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {BULK_MAX_ITEMS} elementos por solicitud"
+        )
+
+
+def validar_items(items: List[Dict[str, Any]], schema: Type[BaseModel]):
+    """
+    Valida cada elemento por separado para reportar errores por ítem en lugar
+    de rechazar todo el lote. Devuelve [(indice, modelo)] y los resultados fallidos.
+    """
+    validos: List[Tuple[int, BaseModel]] = []
+    fallidos: List[ResultadoItemBulk] = []
+    for indice, item in enumerate(items):
+        try:
+            validos.append((indice, schema.model_validate(item)))
+        except ValidationError as e:
+            errores = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            fallidos.append(ResultadoItemBulk(indice=indice, ok=False, error=errores))
+    return validos, fallidos
+
+
+def sentencia_insertar_solicitudes():
+    # executemany con RETURNING en el orden de los parámetros (insertmanyvalues)
+    return insert(Solicitud).returning(
+        Solicitud.id,
+        Solicitud.numero_solicitud,
+        Solicitud.fecha_creacion,
+        sort_by_parameter_order=True,
+    )
+
+
+def sentencia_ids_existentes(ids: List[int]):
+    # area/urgencia/estado/fecha_estado para los eventos y el historial de transiciones
+    return select(
+        Solicitud.id,
+        Solicitud.numero_solicitud,
+        Solicitud.area_solicitante,
+        Solicitud.urgencia,
+        Solicitud.estado,
+        Solicitud.fecha_estado,
+    ).where(Solicitud.id.in_(ids))
+
+
+def sentencia_actualizar_solicitudes():
+    # UPDATE por llave primaria en bloque (ORM bulk update)
+    return update(Solicitud)
+
+
+def sentencia_encolar_sheets():
+    return insert(SheetsOutbox)
+
+
+def filas_outbox(ids: List[int], operacion: str) -> List[dict]:
+    return [{"solicitud_id": solicitud_id, "operacion": operacion, "intentos": 0} for solicitud_id in ids]
+
+
+def filas_alta(validos: List[Tuple[int, BaseModel]], numeros: List[str], version: int) -> List[dict]:
+    return [
+        {"numero_solicitud": numero, "estado": Estado.RECIBIDO, "version": version, **item.model_dump()}
+        for numero, (_, item) in zip(numeros, validos)
+    ]
+
+
+def completar_alta(db, validos: List[Tuple[int, BaseModel]], filas: List[dict], creadas) -> Tuple[List[ResultadoItemBulk], List[tuple]]:
+    """
+    Después del INSERT: registra los eventos y arma los resultados por ítem.
+    Devuelve también las sentencias del outbox y del índice de similitud.
+    """
+    for fila, c in zip(filas, creadas):
+        eventos.emitir_creada(db, {**fila, **c._mapping})
+    sentencias = [
+        (sentencia_encolar_sheets(), filas_outbox([c.id for c in creadas], SheetsOutbox.OP_APPEND)),
+        *similitud.sentencias_indice([
+            (c.id, similitud.firma_de(fila["titulo_proceso"], fila["descripcion_proceso"]))
+            for fila, c in zip(filas, creadas)
+        ]),
+    ]
+    resultados = [
+        ResultadoItemBulk(indice=indice, ok=True, id=c.id, numero_solicitud=c.numero_solicitud)
+        for (indice, _), c in zip(validos, creadas)
+    ]
+    return resultados, sentencias
+
+
+def planear_actualizacion(
+    db, validos: List[Tuple[int, BaseModel]], existentes: list, version: int, ahora: Optional[datetime] = None
+) -> Tuple[List[ResultadoItemBulk], List[tuple], bool]:
+    """
+    Arma el UPDATE por lotes, el outbox y el historial de transiciones de un
+    PATCH masivo a partir de las filas de sentencia_ids_existentes(), y
+    registra los eventos. Devuelve los resultados por ítem, las sentencias
+    (vacía si no hay nada que escribir) y si se encoló algún estado.
+    """
+    existentes = {r.id: r for r in existentes}
+    estados = {solicitud_id: r.estado for solicitud_id, r in existentes.items()}
+    fechas_estado = {solicitud_id: r.fecha_estado for solicitud_id, r in existentes.items()}
+    ahora = ahora or datetime.now(timezone.utc)
+
+    resultados = []
+    cambios = []
+    con_estado = []
+    historial = []
+    for indice, item in validos:
+        if item.id not in existentes:
+            resultados.append(ResultadoItemBulk(indice=indice, ok=False, id=item.id, error="Solicitud no encontrada"))
+            continue
+        datos = item.model_dump(exclude_unset=True)
+        cambia_estado = "estado" in datos and item.estado != estados[item.id]
+        if len(datos) > 1:
+            datos["version"] = version
+            cambios.append(datos)
+            if not cambia_estado:
+                eventos.emitir_actualizada(db, item.id)
+        if "estado" in datos:
+            con_estado.append(item.id)
+            actual = existentes[item.id]
+            eventos.emitir_estado(
+                db, item.id, actual.numero_solicitud, actual.area_solicitante, actual.urgencia,
+                item.estado, estados[item.id]
+            )
+            if cambia_estado:
+                historial.append(transiciones.transicion(
+                    item.id, actual.area_solicitante, actual.urgencia,
+                    estados[item.id], item.estado, fechas_estado[item.id], ahora
+                ))
+                datos["fecha_estado"] = fechas_estado[item.id] = ahora
+            estados[item.id] = item.estado
+        resultados.append(ResultadoItemBulk(
+            indice=indice, ok=True, id=item.id, numero_solicitud=existentes[item.id].numero_solicitud
+        ))
+
+    if not cambios:
+        return resultados, [], False
+    sentencias = [(sentencia_actualizar_solicitudes(), cambios)]
+    if con_estado:
+        sentencias.append((sentencia_encolar_sheets(), filas_outbox(con_estado, SheetsOutbox.OP_UPDATE_ESTADO)))
+    sentencias += transiciones.sentencias_transiciones(db.get_bind().dialect.name, historial)
+    return resultados, sentencias, bool(con_estado)
+
+
+def armar_respuesta(resultados: List[ResultadoItemBulk]) -> SolicitudBulkResponse:
+    resultados = sorted(resultados, key=lambda r: r.indice)
+    errores = sum(1 for r in resultados if not r.ok)
+    return SolicitudBulkResponse(
+        procesadas=len(resultados) - errores,
+        errores=errores,
+        resultados=resultados,
+    )
@@ -0,0 +1,182 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+
+# === Registro mínimo de métricas en formato Prometheus ===
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _etiquetas(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    partes = []
+    for k, v in labels:
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        partes.append(f'{k}="{v}"')
+    return "{" + ",".join(partes) + "}"
+
+
+class Contador:
+    def __init__(self, nombre: str, ayuda: str):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self._lock = threading.Lock()
+        self._valores: Dict[Tuple, float] = {}
+
+    def inc(self, valor: float = 1, **labels):
+        clave = tuple(sorted(labels.items()))
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def exponer(self) -> str:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        with self._lock:
+            for clave, valor in sorted(self._valores.items()):
+                lineas.append(f"{self.nombre}{_etiquetas(clave)} {valor}")
+        return "\n".join(lineas)
+
+
+class Histograma:
+    def __init__(self, nombre: str, ayuda: str, buckets=BUCKETS_SEGUNDOS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple, list] = {}
+
+    def observar(self, valor: float, **labels):
+        clave = tuple(sorted(labels.items()))
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                # conteos por bucket (+Inf al final), suma, total
+                serie = self._series[clave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][bisect_left(self.buckets, valor)] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exponer(self) -> str:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            for clave, (conteos, suma, total) in sorted(self._series.items()):
+                acumulado = 0
+                for limite, conteo in zip(self.buckets + (float("inf"),), conteos):
+                    acumulado += conteo
+                    le = "+Inf" if limite == float("inf") else repr(limite)
+                    lineas.append(f"{self.nombre}_bucket{_etiquetas(clave + (('le', le),))} {acumulado}")
+                lineas.append(f"{self.nombre}_sum{_etiquetas(clave)} {suma}")
+                lineas.append(f"{self.nombre}_count{_etiquetas(clave)} {total}")
+        return "\n".join(lineas)
+
+
+class Gauge:
+    """Valor calculado al momento de exponer (p. ej. conexiones del pool)."""
+
+    def __init__(self, nombre: str, ayuda: str, funcion):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.funcion = funcion
+
+    def exponer(self) -> str:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} gauge"]
+        try:
+            valores = self.funcion()
+        except Exception:
+            valores = {}
+        for labels, valor in (valores.items() if isinstance(valores, dict) else [((), valores)]):
+            lineas.append(f"{self.nombre}{_etiquetas(labels)} {valor}")
+        return "\n".join(lineas)
+
+
+class Registro:
+    def __init__(self):
+        self._metricas = []
+
+    def registrar(self, metrica):
+        self._metricas.append(metrica)
+        return metrica
+
+    def exponer(self) -> str:
+        return "\n".join(m.exponer() for m in self._metricas) + "\n"
+
+
+registro = Registro()
+
+http_duracion = registro.registrar(Histograma(
+    "http_request_duration_seconds", "Latencia de los requests HTTP por ruta"
+))
+http_requests = registro.registrar(Contador(
+    "http_requests_total", "Requests HTTP por ruta, método y código"
+))
+sql_duracion = registro.registrar(Histograma(
+    "db_query_duration_seconds", "Duración de cada sentencia SQL"
+))
+sql_por_request = registro.registrar(Histograma(
+    "db_queries_per_request", "Sentencias SQL ejecutadas por request",
+    buckets=(1, 2, 3, 5, 8, 13, 21, 50, 100),
+))
+sheets_duracion = registro.registrar(Histograma(
+    "sheets_api_duration_seconds", "Latencia de cada llamada a la API de Google Sheets"
+))
+sheets_errores = registro.registrar(Contador(
+    "sheets_api_errors_total", "Llamadas a la API de Google Sheets que fallaron"
+))
+
+
+# === Acumulado por request (Server-Timing) ===
+
+class TiemposRequest:
+    __slots__ = ("sql_cantidad", "sql_tiempo", "sheets_cantidad", "sheets_tiempo")
+
+    def __init__(self):
+        self.sql_cantidad = 0
+        self.sql_tiempo = 0.0
+        self.sheets_cantidad = 0
+        self.sheets_tiempo = 0.0
+
+
+# El objeto es mutable: los endpoints síncronos corren en el threadpool con una
+# copia del contexto que apunta a la misma instancia.
+tiempos_request: ContextVar[Optional[TiemposRequest]] = ContextVar("tiempos_request", default=None)
+
+
+def instrumentar_engine(engine):
+    """Cuenta y cronometra cada sentencia SQL ejecutada por el engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("inicio_sql", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        pila = conn.info.get("inicio_sql")
+        if not pila:
+            return
+        duracion = time.perf_counter() - pila.pop()
+        sql_duracion.observar(duracion)
+        tiempos = tiempos_request.get()
+        if tiempos is not None:
+            tiempos.sql_cantidad += 1
+            tiempos.sql_tiempo += duracion
+
+
+def medir_sheets(operacion: str, request):
+    """Ejecuta un request de googleapiclient registrando latencia y errores."""
+    inicio = time.perf_counter()
+    try:
+        return request.execute()
+    except Exception:
+        sheets_errores.inc(operacion=operacion)
+        raise
+    finally:
+        duracion = time.perf_counter() - inicio
+        sheets_duracion.observar(duracion, operacion=operacion)
+        tiempos = tiempos_request.get()
+        if tiempos is not None:
+            tiempos.sheets_cantidad += 1
+            tiempos.sheets_tiempo += duracion
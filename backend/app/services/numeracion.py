@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..models import ContadorSolicitud, VersionSolicitudes
+
+PREFIJO = "AUTO"
+
+
+def formatear_numero(fecha: str, correlativo: int) -> str:
+    return f"{PREFIJO}-{fecha}-{correlativo:06d}"
+
+
+def sentencia_reservar(dialecto: str, fecha: str, cantidad: int):
+    """
+    Incrementa atómicamente el contador del día en `cantidad` y devuelve el
+    nuevo último valor (INSERT ... ON CONFLICT DO UPDATE ... RETURNING).
+    En Postgres la fila del contador queda bloqueada hasta el commit, lo que
+    serializa las altas del mismo día sin colisiones ni reintentos.
+    """
+    insertar = pg_insert if dialecto == "postgresql" else sqlite_insert
+    stmt = insertar(ContadorSolicitud).values(fecha=fecha, ultimo=cantidad)
+    return stmt.on_conflict_do_update(
+        index_elements=[ContadorSolicitud.fecha],
+        set_={"ultimo": ContadorSolicitud.ultimo + cantidad},
+    ).returning(ContadorSolicitud.ultimo)
+
+
+def numeros_reservados(fecha: str, ultimo: int, cantidad: int) -> List[str]:
+    return [formatear_numero(fecha, n) for n in range(ultimo - cantidad + 1, ultimo + 1)]
+
+
+def _fecha_actual(fecha: Optional[datetime]) -> str:
+    return (fecha or datetime.now()).strftime("%Y%m%d")
+
+
+def reservar_numeros(db, cantidad: int = 1, fecha: Optional[datetime] = None) -> List[str]:
+    """Reserva `cantidad` números consecutivos dentro de la transacción de `db`."""
+    dia = _fecha_actual(fecha)
+    ultimo = db.execute(sentencia_reservar(db.get_bind().dialect.name, dia, cantidad)).scalar_one()
+    return numeros_reservados(dia, ultimo, cantidad)
+
+
+async def reservar_numeros_async(db, cantidad: int = 1, fecha: Optional[datetime] = None) -> List[str]:
+    dia = _fecha_actual(fecha)
+    ultimo = (await db.execute(sentencia_reservar(db.get_bind().dialect.name, dia, cantidad))).scalar_one()
+    return numeros_reservados(dia, ultimo, cantidad)
+
+
+def sentencia_version(dialecto: str):
+    """
+    Incrementa la versión global de escritura y la devuelve. Igual que el
+    contador del día, la fila queda bloqueada hasta el commit: las versiones
+    se hacen visibles en orden y max(solicitudes.version) nunca retrocede.
+    """
+    insertar = pg_insert if dialecto == "postgresql" else sqlite_insert
+    stmt = insertar(VersionSolicitudes).values(id=1, ultima=1)
+    return stmt.on_conflict_do_update(
+        index_elements=[VersionSolicitudes.id],
+        set_={"ultima": VersionSolicitudes.ultima + 1},
+    ).returning(VersionSolicitudes.ultima)
+
+
+def reservar_version(db) -> int:
+    """Versión para las filas que escribe la transacción de `db`; pedirla justo antes de escribir."""
+    return db.execute(sentencia_version(db.get_bind().dialect.name)).scalar_one()
+
+
+async def reservar_version_async(db) -> int:
+    return (await db.execute(sentencia_version(db.get_bind().dialect.name))).scalar_one()
@@ -0,0 +1,58 @@
+import os
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+# Listado y detalle arman el JSON desde las filas proyectadas, sin pasar por
+# los modelos de Pydantic: los datos salen de nuestra base y ya son válidos.
+SERIALIZACION_RAPIDA = os.getenv("SERIALIZACION_RAPIDA", "false").lower() == "true"
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _por_defecto(valor: Any):
+    """Tipos que json no conoce, con el mismo formato que genera Pydantic."""
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, datetime):
+        texto = valor.isoformat()
+        return texto[:-6] + "Z" if texto.endswith("+00:00") else texto
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"No se puede serializar {type(valor).__name__}")
+
+
+def dumps(contenido: Any) -> bytes:
+    if orjson is not None:
+        # OPT_UTC_Z: "Z" en lugar de "+00:00", igual que Pydantic
+        return orjson.dumps(contenido, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        contenido, default=_por_defecto, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class RespuestaJSON(JSONResponse):
+    """JSONResponse con orjson si está instalado (default_response_class de la app)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def respuesta_filas(filas, response: Response) -> RespuestaJSON:
+    """
+    Lista de filas de un select(*columnas) serializada tal cual. Lleva los
+    headers puestos en `response` (ETag, X-Next-Cursor...), que FastAPI no
+    copia cuando el endpoint devuelve su propia respuesta.
+    """
+    return RespuestaJSON([dict(f._mapping) for f in filas], headers=dict(response.headers))
+
+
+def respuesta_fila(fila, response: Response) -> RespuestaJSON:
+    return RespuestaJSON(dict(fila._mapping), headers=dict(response.headers))
@@ -0,0 +1,356 @@
+import os
+import time
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, exists
+from sqlalchemy.orm import Session, aliased
+
+from ..models import SessionLocal, Solicitud, SheetsOutbox
+from .google_sheets import google_sheets_service
+from .limites import compuerta_sheets, sheets_diferidas, SheetsSaturado
+
+SHEETS_OUTBOX_INTERVALO = float(os.getenv("SHEETS_OUTBOX_INTERVALO", "5"))
+SHEETS_OUTBOX_LOTE = int(os.getenv("SHEETS_OUTBOX_LOTE", "50"))
+SHEETS_OUTBOX_BACKOFF_BASE = float(os.getenv("SHEETS_OUTBOX_BACKOFF_BASE", "5"))
+SHEETS_OUTBOX_BACKOFF_MAX = float(os.getenv("SHEETS_OUTBOX_BACKOFF_MAX", "3600"))
+# Intentos fallidos tras los que una entrada se descarta (dead letter) y deja de bloquear la cola
+SHEETS_OUTBOX_MAX_INTENTOS = int(os.getenv("SHEETS_OUTBOX_MAX_INTENTOS", "10"))
+# Ventana para acumular operaciones después de un aviso antes de enviar el lote
+SHEETS_OUTBOX_VENTANA = float(os.getenv("SHEETS_OUTBOX_VENTANA", "1"))
+# Segundos que se conservan las entradas ya enviadas y cada cuánto se borran las
+# más viejas; las descartadas se conservan hasta que la reconciliación las revise
+SHEETS_OUTBOX_RETENCION = float(os.getenv("SHEETS_OUTBOX_RETENCION", "604800"))
+SHEETS_OUTBOX_PURGA = float(os.getenv("SHEETS_OUTBOX_PURGA", "600"))
+
+OPERACIONES = (SheetsOutbox.OP_APPEND, SheetsOutbox.OP_UPDATE_ESTADO)
+
+
+def solicitud_to_sheets_data(solicitud: Solicitud) -> dict:
+    return {
+        "numero_solicitud": solicitud.numero_solicitud,
+        "fecha_creacion": solicitud.fecha_creacion.isoformat() if solicitud.fecha_creacion else "",
+        "area_solicitante": solicitud.area_solicitante.value,
+        "nombre_solicitante": solicitud.nombre_solicitante,
+        "email_solicitante": solicitud.email_solicitante,
+        "titulo_proceso": solicitud.titulo_proceso,
+        "descripcion_proceso": solicitud.descripcion_proceso,
+        "situacion_actual": solicitud.situacion_actual,
+        "resultado_esperado": solicitud.resultado_esperado,
+        "urgencia": solicitud.urgencia.value,
+        "impacto": solicitud.impacto.value,
+        "frecuencia_proceso": solicitud.frecuencia_proceso or "",
+        "tiempo_manual_estimado": solicitud.tiempo_manual_estimado or "",
+        "sistemas_involucrados": solicitud.sistemas_involucrados or "",
+        "enlaces_documentacion": solicitud.enlaces_documentacion or "",
+        "estado": solicitud.estado.value,
+    }
+
+
+def filtro_pendientes():
+    """Entradas que todavía hay que enviar: ni procesadas ni descartadas."""
+    return and_(SheetsOutbox.fecha_procesado.is_(None), SheetsOutbox.fecha_descartado.is_(None))
+
+
+def filtro_no_bloqueadas(ahora: datetime):
+    """
+    Sin una operación anterior de la misma solicitud esperando reintento (p. ej.
+    no actualizar el estado de una fila que aún no se agregó). Se filtra en la
+    consulta: si no, las bloqueadas ocupaban el lote hasta que venciera el backoff.
+    """
+    anterior = aliased(SheetsOutbox)
+    return ~exists().where(
+        anterior.solicitud_id == SheetsOutbox.solicitud_id,
+        anterior.id < SheetsOutbox.id,
+        anterior.fecha_procesado.is_(None),
+        anterior.fecha_descartado.is_(None),
+        anterior.proximo_intento > ahora,
+    )
+
+
+def encolar_sheets(db: Session, solicitud: Solicitud, operacion: str) -> SheetsOutbox:
+    """
+    Agrega una operación al outbox dentro de la transacción actual.
+    La solicitud debe tener id (hacer flush antes si es nueva).
+    """
+    entrada = SheetsOutbox(solicitud_id=solicitud.id, operacion=operacion)
+    db.add(entrada)
+    return entrada
+
+
+def calcular_backoff(intentos: int) -> float:
+    return min(SHEETS_OUTBOX_BACKOFF_BASE * (2 ** max(intentos - 1, 0)), SHEETS_OUTBOX_BACKOFF_MAX)
+
+
+class MetricasLotes:
+    """Tamaños de lote y latencia de envío a Google Sheets."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.lotes = 0
+        self.appends = 0
+        self.updates = 0
+        self.tamano_max = 0
+        self.ultimo_tamano = 0
+        self.latencia_total = 0.0
+        self.latencia_max = 0.0
+
+    def registrar(self, appends: int, updates: int, latencia: float):
+        with self._lock:
+            tamano = appends + updates
+            self.lotes += 1
+            self.appends += appends
+            self.updates += updates
+            self.ultimo_tamano = tamano
+            self.tamano_max = max(self.tamano_max, tamano)
+            self.latencia_total += latencia
+            self.latencia_max = max(self.latencia_max, latencia)
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                "lotes": self.lotes,
+                "appends": self.appends,
+                "updates": self.updates,
+                "tamano_promedio": round((self.appends + self.updates) / self.lotes, 2) if self.lotes else 0,
+                "tamano_max": self.tamano_max,
+                "ultimo_tamano": self.ultimo_tamano,
+                "latencia_promedio_ms": round(self.latencia_total / self.lotes * 1000, 2) if self.lotes else 0,
+                "latencia_max_ms": round(self.latencia_max * 1000, 2),
+            }
+
+
+class SheetsOutboxWorker:
+    """Hilo en segundo plano que drena el outbox hacia Google Sheets."""
+
+    def __init__(self, session_factory=SessionLocal, sheets_service=google_sheets_service,
+                 retencion: float = SHEETS_OUTBOX_RETENCION, purga: float = SHEETS_OUTBOX_PURGA):
+        self.session_factory = session_factory
+        self.sheets_service = sheets_service
+        self.retencion = retencion
+        self.purga = purga
+        self._ultima_purga = 0.0
+        self.metricas = MetricasLotes()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._detener.clear()
+        self._thread = threading.Thread(target=self._run, name="sheets-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._detener.set()
+        self._despertar.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def notificar(self):
+        """Despierta al worker tras un commit para no esperar el intervalo completo."""
+        self._despertar.set()
+
+    def _run(self):
+        while not self._detener.is_set():
+            try:
+                procesadas = self.drenar()
+            except Exception as e:
+                print(f"Error drenando outbox de Google Sheets: {e}")
+                procesadas = 0
+
+            # Si el lote vino lleno, seguir drenando sin esperar
+            if procesadas >= SHEETS_OUTBOX_LOTE:
+                continue
+
+            if self._despertar.wait(SHEETS_OUTBOX_INTERVALO) and not self._detener.is_set():
+                # Dar tiempo a que lleguen más operaciones y enviarlas juntas
+                self._detener.wait(SHEETS_OUTBOX_VENTANA)
+            self._despertar.clear()
+
+    def drenar(self) -> int:
+        """
+        Procesa un lote de operaciones vencidas: todos los appends en una sola
+        llamada y todos los cambios de estado en un solo batchUpdate.
+        Devuelve cuántas entradas se intentaron.
+        """
+        if not self.sheets_service.configurado:
+            # Sin integración configurada se conservan pendientes hasta que exista
+            return 0
+
+        if compuerta_sheets.espera() > 0:
+            # Cuota pausada o sin tokens: el lote espera en el outbox al próximo ciclo
+            sheets_diferidas.inc(operacion="lote")
+            return 0
+
+        db = self.session_factory()
+        try:
+            ahora = datetime.now(timezone.utc)
+            if self._toca_purgar():
+                self.purgar(db, ahora)
+            entradas = (
+                db.query(SheetsOutbox)
+                .filter(filtro_pendientes())
+                .filter(SheetsOutbox.proximo_intento <= ahora)
+                .filter(filtro_no_bloqueadas(ahora))
+                .order_by(SheetsOutbox.id)
+                .limit(SHEETS_OUTBOX_LOTE)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            # El cliente de Sheets se construye recién cuando hay algo que enviar
+            if not entradas or not self.sheets_service.service:
+                db.commit()
+                return 0
+
+            ids_lote = {e.solicitud_id for e in entradas}
+            solicitudes = {
+                s.id: s for s in db.query(Solicitud).filter(Solicitud.id.in_(ids_lote)).all()
+            }
+
+            appends = {}
+            updates = {}
+            for entrada in entradas:
+                if entrada.solicitud_id not in solicitudes or entrada.operacion not in OPERACIONES:
+                    # Solicitud eliminada u operación desconocida: nada que sincronizar
+                    self._marcar_ok(entrada)
+                    continue
+                if entrada.operacion == SheetsOutbox.OP_APPEND:
+                    appends.setdefault(entrada.solicitud_id, []).append(entrada)
+                else:
+                    updates.setdefault(entrada.solicitud_id, []).append(entrada)
+
+            # La fila agregada ya lleva el estado actual: los cambios de estado
+            # de la misma solicitud en este lote quedan cubiertos por el append.
+            for solicitud_id in list(updates):
+                if solicitud_id in appends:
+                    appends[solicitud_id].extend(updates.pop(solicitud_id))
+
+            inicio = time.perf_counter()
+
+            diferidas = False
+
+            # Cada fila se arma por separado: una solicitud con datos inválidos
+            # cuenta un intento fallido solo para sus entradas y no frena el lote.
+            filas = {}
+            for solicitud_id in list(appends):
+                try:
+                    filas[solicitud_id] = solicitud_to_sheets_data(solicitudes[solicitud_id])
+                except Exception as e:
+                    self._fallo_armado(appends.pop(solicitud_id), e)
+
+            estados = {}
+            for solicitud_id in list(updates):
+                try:
+                    estados[solicitud_id] = solicitudes[solicitud_id].estado.value
+                except Exception as e:
+                    self._fallo_armado(updates.pop(solicitud_id), e)
+
+            if appends:
+                try:
+                    ok = self.sheets_service.append_solicitudes([filas[solicitud_id] for solicitud_id in appends])
+                except SheetsSaturado:
+                    # Sin turno en la compuerta: quedan pendientes sin contar un intento
+                    appends, diferidas = {}, True
+                for pendientes in appends.values():
+                    for entrada in pendientes:
+                        if ok:
+                            self._marcar_ok(entrada)
+                        else:
+                            self._marcar_error(entrada, "append devolvió False")
+
+            if updates:
+                try:
+                    actualizadas = self.sheets_service.update_estados({
+                        solicitudes[solicitud_id].numero_solicitud: estados[solicitud_id]
+                        for solicitud_id in updates
+                    })
+                except SheetsSaturado:
+                    updates, diferidas = {}, True
+                for solicitud_id, pendientes in updates.items():
+                    ok = solicitudes[solicitud_id].numero_solicitud in actualizadas
+                    for entrada in pendientes:
+                        if ok:
+                            self._marcar_ok(entrada)
+                        else:
+                            self._marcar_error(entrada, "update_estado no encontró o no actualizó la fila")
+
+            if appends or updates:
+                self.metricas.registrar(
+                    len(appends),
+                    len(updates),
+                    time.perf_counter() - inicio
+                )
+
+            db.commit()
+            if diferidas:
+                # No seguir drenando en caliente: esperar el intervalo normal
+                return 0
+            return len(entradas)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _toca_purgar(self) -> bool:
+        ahora = time.monotonic()
+        if ahora - self._ultima_purga < self.purga:
+            return False
+        self._ultima_purga = ahora
+        return True
+
+    def purgar(self, db: Session, ahora: datetime) -> int:
+        """Borra las entradas enviadas hace más de `retencion` segundos (se confirma con el lote)."""
+        borradas = db.execute(
+            delete(SheetsOutbox).where(SheetsOutbox.fecha_procesado < ahora - timedelta(seconds=self.retencion))
+        ).rowcount
+        if borradas:
+            print(f"Outbox de Google Sheets: {borradas} entrada(s) enviadas purgadas")
+        return borradas
+
+    def pendientes(self) -> int:
+        db = self.session_factory()
+        try:
+            return db.query(SheetsOutbox).filter(filtro_pendientes()).count()
+        finally:
+            db.close()
+
+    def descartadas(self) -> int:
+        db = self.session_factory()
+        try:
+            return db.query(SheetsOutbox).filter(SheetsOutbox.fecha_descartado.isnot(None)).count()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _marcar_ok(entrada: SheetsOutbox):
+        entrada.intentos = (entrada.intentos or 0) + 1
+        entrada.fecha_procesado = datetime.now(timezone.utc)
+        entrada.ultimo_error = None
+
+    @classmethod
+    def _fallo_armado(cls, entradas, error: Exception):
+        print(f"No se pudo armar la fila de Google Sheets de la solicitud {entradas[0].solicitud_id}: {error!r}")
+        for entrada in entradas:
+            cls._marcar_error(entrada, f"No se pudo armar la fila: {error!r}")
+
+    @staticmethod
+    def _marcar_error(entrada: SheetsOutbox, error: str):
+        entrada.intentos = (entrada.intentos or 0) + 1
+        entrada.ultimo_error = error
+        if entrada.intentos >= SHEETS_OUTBOX_MAX_INTENTOS:
+            entrada.fecha_descartado = datetime.now(timezone.utc)
+            print(
+                f"Outbox de Google Sheets: se descarta la entrada {entrada.id} ({entrada.operacion} "
+                f"de la solicitud {entrada.solicitud_id}) tras {entrada.intentos} intentos: {error}"
+            )
+            return
+        entrada.proximo_intento = datetime.now(timezone.utc) + timedelta(
+            seconds=calcular_backoff(entrada.intentos)
+        )
+
+
+sheets_outbox_worker = SheetsOutboxWorker()
@@ -0,0 +1,191 @@
+import hashlib
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from ..models import SessionLocal, Solicitud, SheetsOutbox, SheetsMetadato
+from .google_sheets import google_sheets_service
+from .sheets_outbox import solicitud_to_sheets_data, filtro_pendientes
+
+RECONCILIACION_CHUNK = int(os.getenv("RECONCILIACION_CHUNK", "1000"))
+CLAVE_WATERMARK = "reconciliacion_watermark"
+# El watermark guardado retrocede este margen: una transacción que hizo commit
+# después del escaneo con una fecha anterior se vuelve a revisar en la próxima corrida
+RECONCILIACION_MARGEN = float(os.getenv("RECONCILIACION_MARGEN", "300"))
+
+# fecha_creacion (columna B) no se compara: con USER_ENTERED Sheets la convierte
+# a fecha y la devuelve con otro formato, y nunca cambia después del alta.
+COLUMNAS_IGNORADAS = {1}
+
+
+def hash_fila(valores: list) -> str:
+    normalizados = [
+        "" if v is None else str(v).strip()
+        for i, v in enumerate(list(valores) + [""] * (16 - len(valores)))
+        if i not in COLUMNAS_IGNORADAS
+    ]
+    return hashlib.sha1("\x1f".join(normalizados).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ResultadoReconciliacion:
+    filas_hoja: int = 0
+    revisadas: int = 0
+    insertar: List[str] = field(default_factory=list)
+    actualizar: List[str] = field(default_factory=list)
+    duplicadas_en_hoja: List[str] = field(default_factory=list)
+    omitidas_pendientes: int = 0
+    aplicado: bool = False
+    watermark: Optional[str] = None
+
+    def resumen(self) -> dict:
+        return {
+            "filas_hoja": self.filas_hoja,
+            "revisadas": self.revisadas,
+            "insertar": len(self.insertar),
+            "actualizar": len(self.actualizar),
+            "duplicadas_en_hoja": self.duplicadas_en_hoja,
+            "omitidas_pendientes_outbox": self.omitidas_pendientes,
+            "aplicado": self.aplicado,
+            "watermark": self.watermark,
+        }
+
+
+class ReconciliadorSheets:
+    """
+    Compara la hoja contra la base y aplica solo las diferencias.
+
+    Lee la hoja en rangos de `chunk` filas y guarda un hash por fila; revisa
+    las solicitudes modificadas desde el último watermark (o todas con
+    completo=True) y agrega las faltantes en un solo append y reescribe las
+    distintas en un solo batchUpdate. Las solicitudes con operaciones
+    pendientes en el outbox se omiten: ya las sincronizará el worker, y el
+    watermark no pasa de la más antigua de ellas para volver a revisarlas.
+    """
+
+    def __init__(
+        self,
+        sheets_service=google_sheets_service,
+        session_factory=SessionLocal,
+        chunk: int = RECONCILIACION_CHUNK,
+        margen: float = RECONCILIACION_MARGEN,
+    ):
+        self.sheets_service = sheets_service
+        self.session_factory = session_factory
+        self.chunk = chunk
+        self.margen = timedelta(seconds=margen)
+
+    def leer_hoja(self) -> Tuple[Dict[str, Tuple[int, str]], List[str]]:
+        """Devuelve {numero_solicitud: (fila, hash)} y los números repetidos."""
+        filas: Dict[str, Tuple[int, str]] = {}
+        duplicadas: List[str] = []
+        inicio = 2  # la fila 1 son los encabezados
+
+        while True:
+            fin = inicio + self.chunk - 1
+            valores = self.sheets_service.leer_filas(inicio, fin)
+            if valores is None:
+                raise RuntimeError(f"No se pudo leer la hoja (filas {inicio}-{fin})")
+
+            for offset, row in enumerate(valores):
+                if not row or not row[0]:
+                    continue
+                numero = row[0]
+                if numero in filas:
+                    duplicadas.append(numero)
+                    continue
+                filas[numero] = (inicio + offset, hash_fila(row))
+
+            if len(valores) < self.chunk:
+                return filas, duplicadas
+            inicio = fin + 1
+
+    def reconciliar(self, dry_run: bool = False, completo: bool = False) -> ResultadoReconciliacion:
+        resultado = ResultadoReconciliacion()
+        hoja, resultado.duplicadas_en_hoja = self.leer_hoja()
+        resultado.filas_hoja = len(hoja)
+
+        db = self.session_factory()
+        try:
+            marca = func.coalesce(Solicitud.fecha_actualizacion, Solicitud.fecha_creacion)
+            watermark = None if completo else self._leer_watermark(db)
+
+            query = db.query(Solicitud)
+            if watermark:
+                query = query.filter(marca >= watermark)
+
+            pendientes = {
+                solicitud_id for (solicitud_id,) in
+                db.query(SheetsOutbox.solicitud_id).filter(filtro_pendientes()).distinct()
+            }
+
+            nuevas = []
+            reescribir = {}
+            maxima = None
+            omitida_mas_antigua = None
+
+            for solicitud in query.order_by(Solicitud.id).yield_per(self.chunk):
+                resultado.revisadas += 1
+                fecha = solicitud.fecha_actualizacion or solicitud.fecha_creacion
+                if fecha and (maxima is None or fecha > maxima):
+                    maxima = fecha
+
+                if solicitud.id in pendientes:
+                    resultado.omitidas_pendientes += 1
+                    if fecha and (omitida_mas_antigua is None or fecha < omitida_mas_antigua):
+                        omitida_mas_antigua = fecha
+                    continue
+
+                datos = solicitud_to_sheets_data(solicitud)
+                valores = self.sheets_service.fila_solicitud(datos)
+
+                if solicitud.numero_solicitud not in hoja:
+                    resultado.insertar.append(solicitud.numero_solicitud)
+                    nuevas.append(datos)
+                else:
+                    fila, hash_hoja = hoja[solicitud.numero_solicitud]
+                    if hash_hoja != hash_fila(valores):
+                        resultado.actualizar.append(solicitud.numero_solicitud)
+                        reescribir[fila] = valores
+
+            nuevo_watermark = self._siguiente_watermark(watermark, maxima, omitida_mas_antigua)
+            resultado.watermark = nuevo_watermark.isoformat() if nuevo_watermark else None
+
+            if dry_run:
+                return resultado
+
+            ok = self.sheets_service.append_solicitudes(nuevas) if nuevas else True
+            ok = (self.sheets_service.actualizar_filas(reescribir) if reescribir else True) and ok
+
+            if ok and nuevo_watermark:
+                db.merge(SheetsMetadato(clave=CLAVE_WATERMARK, valor=nuevo_watermark.isoformat()))
+                db.commit()
+            resultado.aplicado = ok
+            return resultado
+        finally:
+            db.close()
+
+    def _siguiente_watermark(
+        self, anterior: Optional[datetime], maxima: Optional[datetime], omitida_mas_antigua: Optional[datetime]
+    ) -> Optional[datetime]:
+        """
+        La fecha más alta revisada, sin pasar de la solicitud omitida más
+        antigua y menos el margen. Nunca retrocede respecto del anterior salvo
+        por una omitida.
+        """
+        if maxima is None:
+            return anterior
+        siguiente = maxima - self.margen
+        if anterior is not None:
+            siguiente = max(siguiente, anterior)
+        if omitida_mas_antigua is not None:
+            siguiente = min(siguiente, omitida_mas_antigua)
+        return siguiente
+
+    @staticmethod
+    def _leer_watermark(db) -> Optional[datetime]:
+        registro = db.get(SheetsMetadato, CLAVE_WATERMARK)
+        return datetime.fromisoformat(registro.valor) if registro and registro.valor else None
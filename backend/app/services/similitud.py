@@ -0,0 +1,190 @@
+import os
+import re
+import zlib
+import struct
+import hashlib
+import random
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, or_, select
+
+from ..models import Solicitud, SimilitudFirma, SimilitudBanda
+from ..schemas import SolicitudListResponse
+
+# Similitud de Jaccard estimada mínima para informar un posible duplicado
+SIMILARES_UMBRAL = float(os.getenv("SIMILARES_UMBRAL", "0.5"))
+SIMILARES_MAX = int(os.getenv("SIMILARES_MAX", "5"))
+# Candidatos del índice LSH que se comparan firma contra firma
+SIMILARES_CANDIDATOS = int(os.getenv("SIMILARES_CANDIDATOS", "50"))
+# Buscar duplicados al crear (la indexación se hace siempre)
+SIMILARES_EN_ALTA = os.getenv("SIMILARES_EN_ALTA", "true").lower() == "true"
+
+# Cambiar estos valores invalida las firmas guardadas (reindexar con
+# scripts/indexar_similitud.py --completo). 16 bandas de 4 filas dan
+# probabilidad 0.5 de ser candidato con similitud ~0.5 y > 0.99 desde 0.8.
+PERMUTACIONES = 64
+BANDAS = 16
+FILAS_POR_BANDA = PERMUTACIONES // BANDAS
+
+_PRIMO = (1 << 61) - 1
+_MASCARA = (1 << 32) - 1
+_azar = random.Random(20261018)
+_COEFICIENTES = [(_azar.getrandbits(61) | 1, _azar.getrandbits(61)) for _ in range(PERMUTACIONES)]
+_FORMATO = f"<{PERMUTACIONES}I"
+
+_PALABRA_RE = re.compile(r"[a-z0-9]+")
+_VACIAS = frozenset(
+    "a al con de del el en es la las lo los o para por que se su sus un una y".split()
+)
+
+COLUMNAS_SIMILAR = [getattr(Solicitud, campo) for campo in SolicitudListResponse.model_fields]
+
+
+def tokens(texto: str) -> List[str]:
+    """Palabras en minúsculas y sin acentos, sin las más frecuentes del español."""
+    texto = unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode("ascii")
+    return [t for t in _PALABRA_RE.findall(texto) if t not in _VACIAS]
+
+
+def shingles(titulo: str, descripcion: str) -> set:
+    """Pares de palabras consecutivas (hash de 32 bits) del título y la descripción."""
+    palabras = tokens(f"{titulo} {descripcion}")
+    if len(palabras) < 2:
+        return {zlib.crc32(p.encode()) for p in palabras}
+    return {zlib.crc32(f"{a} {b}".encode()) for a, b in zip(palabras, palabras[1:])}
+
+
+def firma_de(titulo: str, descripcion: str) -> Optional[Tuple[int, ...]]:
+    """Firma MinHash de PERMUTACIONES valores, o None si el texto no tiene palabras."""
+    hashes = shingles(titulo or "", descripcion or "")
+    if not hashes:
+        return None
+    return tuple(
+        min(((a * h + b) % _PRIMO) & _MASCARA for h in hashes)
+        for a, b in _COEFICIENTES
+    )
+
+
+def empacar(firma: Tuple[int, ...]) -> bytes:
+    return struct.pack(_FORMATO, *firma)
+
+
+def desempacar(datos: bytes) -> Tuple[int, ...]:
+    return struct.unpack(_FORMATO, datos)
+
+
+def bandas(firma: Tuple[int, ...]) -> List[Tuple[int, int]]:
+    """(banda, valor): cada banda de FILAS_POR_BANDA mínimos resumida en un entero de 64 bits."""
+    resultado = []
+    for banda in range(BANDAS):
+        inicio = banda * FILAS_POR_BANDA
+        datos = struct.pack(f"<{FILAS_POR_BANDA}I", *firma[inicio:inicio + FILAS_POR_BANDA])
+        valor = int.from_bytes(hashlib.blake2b(datos, digest_size=8).digest(), "little", signed=True)
+        resultado.append((banda, valor))
+    return resultado
+
+
+def similitud(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimación de la similitud de Jaccard: fracción de mínimos iguales."""
+    return sum(1 for x, y in zip(a, b) if x == y) / PERMUTACIONES
+
+
+def filas_indice(pares: Iterable[Tuple[int, Optional[Tuple[int, ...]]]]) -> Tuple[List[dict], List[dict]]:
+    """Filas de similitud_firmas y similitud_bandas para (solicitud_id, firma)."""
+    firmas, filas_bandas = [], []
+    for solicitud_id, firma in pares:
+        if firma is None:
+            continue
+        firmas.append({"solicitud_id": solicitud_id, "firma": empacar(firma)})
+        filas_bandas.extend(
+            {"banda": banda, "valor": valor, "solicitud_id": solicitud_id}
+            for banda, valor in bandas(firma)
+        )
+    return firmas, filas_bandas
+
+
+def sentencias_indice(pares: Iterable[Tuple[int, Optional[Tuple[int, ...]]]]) -> List[tuple]:
+    """[(sentencia, filas)] que agregan las firmas al índice; vacía si ninguna tiene texto."""
+    firmas, filas_bandas = filas_indice(pares)
+    if not firmas:
+        return []
+    return [(insert(SimilitudFirma), firmas), (insert(SimilitudBanda), filas_bandas)]
+
+
+def indexar(db, pares: Iterable[Tuple[int, Optional[Tuple[int, ...]]]]):
+    """Agrega las firmas al índice en la transacción de `db`."""
+    for sentencia, filas in sentencias_indice(pares):
+        db.execute(sentencia, filas)
+
+
+def consulta_candidatos(firma: Tuple[int, ...], excluir_id: Optional[int] = None,
+                        limite: int = SIMILARES_CANDIDATOS):
+    """
+    Solicitudes que comparten alguna banda con la firma, con su firma guardada.
+    Cada (banda, valor) se resuelve con la llave primaria: el costo depende de
+    cuántas coincidan, no del total de solicitudes.
+    """
+    coincidencias = func.count().label("coincidencias")
+    candidatos = (
+        select(SimilitudBanda.solicitud_id, coincidencias)
+        .where(or_(*[
+            and_(SimilitudBanda.banda == banda, SimilitudBanda.valor == valor)
+            for banda, valor in bandas(firma)
+        ]))
+        .group_by(SimilitudBanda.solicitud_id)
+        .order_by(coincidencias.desc())
+        .limit(limite)
+    )
+    if excluir_id is not None:
+        candidatos = candidatos.where(SimilitudBanda.solicitud_id != excluir_id)
+    candidatos = candidatos.subquery()
+
+    return (
+        select(*COLUMNAS_SIMILAR, SimilitudFirma.firma)
+        .join(candidatos, candidatos.c.solicitud_id == Solicitud.id)
+        .join(SimilitudFirma, SimilitudFirma.solicitud_id == Solicitud.id)
+    )
+
+
+def resumir_similares(filas, firma: Tuple[int, ...], umbral: float = SIMILARES_UMBRAL,
+                      maximo: int = SIMILARES_MAX) -> List[Dict]:
+    resultado = []
+    for fila in filas:
+        datos = dict(fila._mapping)
+        valor = similitud(firma, desempacar(datos.pop("firma")))
+        if valor >= umbral:
+            resultado.append({**datos, "similitud": round(valor, 3)})
+    resultado.sort(key=lambda s: (-s["similitud"], -s["id"]))
+    return resultado[:maximo]
+
+
+def similares(db, firma: Optional[Tuple[int, ...]], excluir_id: Optional[int] = None,
+              umbral: float = SIMILARES_UMBRAL, maximo: int = SIMILARES_MAX) -> List[Dict]:
+    if firma is None:
+        return []
+    filas = db.execute(consulta_candidatos(firma, excluir_id)).all()
+    return resumir_similares(filas, firma, umbral, maximo)
+
+
+async def similares_async(db, firma: Optional[Tuple[int, ...]], excluir_id: Optional[int] = None,
+                          umbral: float = SIMILARES_UMBRAL, maximo: int = SIMILARES_MAX) -> List[Dict]:
+    if firma is None:
+        return []
+    filas = (await db.execute(consulta_candidatos(firma, excluir_id))).all()
+    return resumir_similares(filas, firma, umbral, maximo)
+
+
+def consulta_firma(solicitud_id: int):
+    """Firma guardada de la solicitud y su texto, por si todavía no está indexada."""
+    return (
+        select(Solicitud.titulo_proceso, Solicitud.descripcion_proceso, SimilitudFirma.firma)
+        .outerjoin(SimilitudFirma, SimilitudFirma.solicitud_id == Solicitud.id)
+        .where(Solicitud.id == solicitud_id)
+    )
+
+
+def firma_de_fila(fila) -> Optional[Tuple[int, ...]]:
+    if fila.firma is not None:
+        return desempacar(fila.firma)
+    return firma_de(fila.titulo_proceso, fila.descripcion_proceso)
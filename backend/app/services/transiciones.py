@@ -0,0 +1,193 @@
+from bisect import bisect_left
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..models import TransicionEstado, RollupEstadoDiario
+from ..models.transicion_estado import BUCKETS_HORAS, COLUMNAS_BUCKETS
+
+
+def _valor(x):
+    return getattr(x, "value", x)
+
+
+def _como_utc(fecha: Optional[datetime]) -> Optional[datetime]:
+    # SQLite devuelve fechas sin zona (CURRENT_TIMESTAMP es UTC)
+    if fecha is not None and fecha.tzinfo is None:
+        return fecha.replace(tzinfo=timezone.utc)
+    return fecha
+
+
+def indice_bucket(segundos: float) -> int:
+    return bisect_left(BUCKETS_HORAS, segundos / 3600)
+
+
+def transicion(solicitud_id: int, area, urgencia, estado_anterior, estado_nuevo,
+               fecha_estado: Optional[datetime], ahora: datetime) -> dict:
+    """Fila de transiciones_estado; fecha_estado es cuándo entró a estado_anterior."""
+    desde = _como_utc(fecha_estado)
+    return {
+        "solicitud_id": solicitud_id,
+        "estado_anterior": _valor(estado_anterior),
+        "estado_nuevo": _valor(estado_nuevo),
+        "area_solicitante": _valor(area),
+        "urgencia": _valor(urgencia),
+        "segundos_en_estado": max((ahora - desde).total_seconds(), 0.0) if desde else None,
+        "fecha": ahora,
+    }
+
+
+def filas_rollup(transiciones: List[dict]) -> List[dict]:
+    """
+    Agrega las transiciones por fila de rollup antes del upsert: Postgres no
+    permite que un mismo INSERT ... ON CONFLICT actualice dos veces la misma fila.
+    """
+    filas: Dict[tuple, dict] = {}
+    for t in transiciones:
+        if t["estado_anterior"] is None or t["segundos_en_estado"] is None:
+            continue
+        clave = (t["fecha"].date(), t["estado_anterior"], t["area_solicitante"], t["urgencia"])
+        fila = filas.get(clave)
+        if fila is None:
+            fila = filas[clave] = {
+                "fecha": clave[0],
+                "estado": clave[1],
+                "area_solicitante": clave[2],
+                "urgencia": clave[3],
+                "cantidad": 0,
+                "suma_segundos": 0.0,
+                "min_segundos": t["segundos_en_estado"],
+                "max_segundos": t["segundos_en_estado"],
+                **{columna: 0 for columna in COLUMNAS_BUCKETS},
+            }
+        fila["cantidad"] += 1
+        fila["suma_segundos"] += t["segundos_en_estado"]
+        fila["min_segundos"] = min(fila["min_segundos"], t["segundos_en_estado"])
+        fila["max_segundos"] = max(fila["max_segundos"], t["segundos_en_estado"])
+        fila[COLUMNAS_BUCKETS[indice_bucket(t["segundos_en_estado"])]] += 1
+    return list(filas.values())
+
+
+def sentencia_rollup(dialecto: str):
+    """Upsert que suma la transición al agregado del día (una fila por fecha/estado/área/urgencia)."""
+    insertar = pg_insert if dialecto == "postgresql" else sqlite_insert
+    # min()/max() con dos argumentos son escalares en SQLite; Postgres usa least()/greatest()
+    menor, mayor = (func.least, func.greatest) if dialecto == "postgresql" else (func.min, func.max)
+    stmt = insertar(RollupEstadoDiario)
+    acumulables = ("cantidad", "suma_segundos") + COLUMNAS_BUCKETS
+    extremos = {
+        "min_segundos": menor(
+            func.coalesce(RollupEstadoDiario.min_segundos, stmt.excluded.min_segundos), stmt.excluded.min_segundos
+        ),
+        "max_segundos": mayor(
+            func.coalesce(RollupEstadoDiario.max_segundos, stmt.excluded.max_segundos), stmt.excluded.max_segundos
+        ),
+    }
+    return stmt.on_conflict_do_update(
+        index_elements=[
+            RollupEstadoDiario.fecha,
+            RollupEstadoDiario.estado,
+            RollupEstadoDiario.area_solicitante,
+            RollupEstadoDiario.urgencia,
+        ],
+        set_={**{c: getattr(RollupEstadoDiario, c) + getattr(stmt.excluded, c) for c in acumulables}, **extremos},
+    )
+
+
+def sentencias_transiciones(dialecto: str, transiciones: List[dict]) -> List[tuple]:
+    """[(sentencia, filas)] que insertan el historial y suman a los rollups."""
+    if not transiciones:
+        return []
+    sentencias = [(insert(TransicionEstado), transiciones)]
+    rollups = filas_rollup(transiciones)
+    if rollups:
+        sentencias.append((sentencia_rollup(dialecto), rollups))
+    return sentencias
+
+
+def consulta_tiempos(desde: date, hasta: date, estado: Optional[str] = None,
+                     area: Optional[str] = None, urgencia: Optional[str] = None,
+                     agrupar: Optional[str] = None):
+    """Suma los rollups del rango; el costo depende de los días y grupos, no del historial."""
+    grupos = [RollupEstadoDiario.estado]
+    if agrupar == "area":
+        grupos.append(RollupEstadoDiario.area_solicitante)
+    elif agrupar == "urgencia":
+        grupos.append(RollupEstadoDiario.urgencia)
+
+    stmt = (
+        select(
+            *grupos,
+            func.sum(RollupEstadoDiario.cantidad).label("cantidad"),
+            func.sum(RollupEstadoDiario.suma_segundos).label("suma_segundos"),
+            func.min(RollupEstadoDiario.min_segundos).label("min_segundos"),
+            func.max(RollupEstadoDiario.max_segundos).label("max_segundos"),
+            *[func.sum(getattr(RollupEstadoDiario, c)).label(c) for c in COLUMNAS_BUCKETS],
+        )
+        .where(RollupEstadoDiario.fecha >= desde)
+        .where(RollupEstadoDiario.fecha <= hasta)
+        .group_by(*grupos)
+        .order_by(*grupos)
+    )
+    if estado:
+        stmt = stmt.where(RollupEstadoDiario.estado == estado)
+    if area:
+        stmt = stmt.where(RollupEstadoDiario.area_solicitante == area)
+    if urgencia:
+        stmt = stmt.where(RollupEstadoDiario.urgencia == urgencia)
+    return stmt
+
+
+def percentil_histograma(buckets: List[int], p: float, minimo: Optional[float] = None,
+                         maximo: Optional[float] = None) -> Optional[float]:
+    """
+    Estima el percentil p (0-100) en horas interpolando linealmente dentro del
+    bucket. minimo y maximo (en segundos, los extremos observados) acotan el
+    bucket: si todas las transiciones tardaron 0s el resultado es 0 y no la
+    mitad del primer bucket. Sin maximo, el último bucket informa su límite
+    inferior.
+    """
+    total = sum(buckets)
+    if not total:
+        return None
+    objetivo = p / 100 * total
+    acumulado = 0
+    for i, cantidad in enumerate(buckets):
+        if cantidad and acumulado + cantidad >= objetivo:
+            inferior = BUCKETS_HORAS[i - 1] if i > 0 else 0
+            superior = BUCKETS_HORAS[i] if i < len(BUCKETS_HORAS) else None
+            if minimo is not None:
+                inferior = max(inferior, minimo / 3600)
+            if maximo is not None:
+                superior = maximo / 3600 if superior is None else min(superior, maximo / 3600)
+            if superior is None:
+                return round(inferior, 2)
+            return round(inferior + (superior - inferior) * (objetivo - acumulado) / cantidad, 2)
+        acumulado += cantidad
+    return round(maximo / 3600, 2) if maximo is not None else float(BUCKETS_HORAS[-1])
+
+
+def resumir_tiempos(filas) -> List[Dict]:
+    """
+    Mediana y p90 salen del histograma, no de los tiempos individuales: se
+    informan como estimaciones (mediana_estimada_horas, p90_estimado_horas).
+    """
+    resultado = []
+    for fila in filas:
+        datos = dict(fila._mapping)
+        buckets = [datos.pop(c) or 0 for c in COLUMNAS_BUCKETS]
+        cantidad = datos.pop("cantidad") or 0
+        suma = datos.pop("suma_segundos") or 0
+        minimo = datos.pop("min_segundos")
+        maximo = datos.pop("max_segundos")
+        resultado.append({
+            **datos,
+            "cantidad": cantidad,
+            "promedio_horas": round(suma / cantidad / 3600, 2) if cantidad else None,
+            "mediana_estimada_horas": percentil_histograma(buckets, 50, minimo, maximo),
+            "p90_estimado_horas": percentil_histograma(buckets, 90, minimo, maximo),
+        })
+    return resultado
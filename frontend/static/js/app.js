@@ -17,12 +17,17 @@ const impactos = ['Bajo', 'Medio', 'Alto'];
 const estados = ['Recibido', 'En Análisis', 'En Desarrollo', 'Completado'];
 
 let currentSolicitudes = [];
+let currentEstadisticas = null;
+let streamConectado = false;
+// Misma Idempotency-Key mientras se reintenta el mismo contenido
+let pendingSubmit = null;
 
 document.addEventListener('DOMContentLoaded', () => {
     initializeTabs();
     initializeForm();
     loadSolicitudes();
     loadEstadisticas();
+    initializeStream();
 });
 
 function initializeTabs() {
@@ -39,7 +44,8 @@ function initializeTabs() {
             });
             document.getElementById(tabId).classList.add('active');
 
-            if (tabId === 'listado') {
+            // Con el stream abierto el listado ya está al día
+            if (tabId === 'listado' && !streamConectado) {
                 loadSolicitudes();
             }
         });
@@ -75,6 +81,11 @@ async function submitSolicitud() {
         enlaces_documentacion: document.getElementById('enlaces').value || null
     };
 
+    const body = JSON.stringify(formData);
+    if (!pendingSubmit || pendingSubmit.body !== body) {
+        pendingSubmit = { body, key: generateIdempotencyKey() };
+    }
+
     submitBtn.disabled = true;
     submitBtn.textContent = 'Enviando...';
 
@@ -82,20 +93,35 @@ async function submitSolicitud() {
         const response = await fetch(API_BASE_URL + '/', {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Idempotency-Key': pendingSubmit.key
             },
-            body: JSON.stringify(formData)
+            body
         });
 
+        if (response.status === 429) {
+            // Se conserva la Idempotency-Key: reintentar no duplica la solicitud
+            const segundos = response.headers.get('Retry-After') || 'unos';
+            throw new Error(`Hay muchas solicitudes en este momento, intente de nuevo en ${segundos} segundos`);
+        }
+
         if (!response.ok) {
             const error = await response.json();
             throw new Error(error.detail || 'Error al enviar la solicitud');
         }
 
         const result = await response.json();
-        showToast(`Solicitud ${result.numero_solicitud} creada exitosamente`, 'success');
+        pendingSubmit = null;
+        let mensaje = `Solicitud ${result.numero_solicitud} creada exitosamente`;
+        if (result.similares && result.similares.length) {
+            const numeros = result.similares.map(s => s.numero_solicitud).join(', ');
+            mensaje += `. Posibles duplicados: ${numeros}`;
+        }
+        showToast(mensaje, 'success');
         form.reset();
-        loadEstadisticas();
+        if (!streamConectado) {
+            loadEstadisticas();
+        }
 
         document.querySelector('[data-tab="listado"]').click();
 
@@ -108,6 +134,13 @@ async function submitSolicitud() {
     }
 }
 
+function generateIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return Date.now().toString(36) + Math.random().toString(36).slice(2);
+}
+
 async function loadSolicitudes() {
     const tableBody = document.getElementById('solicitudesTableBody');
     const areaFilter = document.getElementById('filterArea').value;
@@ -209,19 +242,97 @@ async function loadEstadisticas() {
         const response = await fetch(API_BASE_URL + '/estadisticas/resumen');
         if (!response.ok) throw new Error('Error al cargar estadísticas');
 
-        const stats = await response.json();
-
-        document.getElementById('statTotal').textContent = stats.total;
-        document.getElementById('statRecibidas').textContent = stats.recibidas;
-        document.getElementById('statAnalisis').textContent = stats.en_analisis;
-        document.getElementById('statDesarrollo').textContent = stats.en_desarrollo;
-        document.getElementById('statCompletadas').textContent = stats.completadas;
+        currentEstadisticas = await response.json();
+        renderEstadisticas(currentEstadisticas);
 
     } catch (error) {
         console.error('Error loading stats:', error);
     }
 }
 
+function renderEstadisticas(stats) {
+    document.getElementById('statTotal').textContent = stats.total;
+    document.getElementById('statRecibidas').textContent = stats.recibidas;
+    document.getElementById('statAnalisis').textContent = stats.en_analisis;
+    document.getElementById('statDesarrollo').textContent = stats.en_desarrollo;
+    document.getElementById('statCompletadas').textContent = stats.completadas;
+}
+
+function initializeStream() {
+    if (!window.EventSource) return;
+
+    // EventSource reconecta solo y envía Last-Event-ID; si el servidor no
+    // puede reponer los eventos perdidos manda 'resync'.
+    const source = new EventSource(API_BASE_URL + '/stream');
+
+    source.addEventListener('open', () => {
+        streamConectado = true;
+    });
+    source.addEventListener('error', () => {
+        streamConectado = false;
+    });
+    source.addEventListener('creada', (e) => applySolicitudCreada(JSON.parse(e.data)));
+    source.addEventListener('estado', (e) => applyCambioEstado(JSON.parse(e.data)));
+    source.addEventListener('resync', () => {
+        loadSolicitudes();
+        loadEstadisticas();
+    });
+}
+
+function coincideFiltros(area, estado) {
+    const areaFilter = document.getElementById('filterArea').value;
+    const estadoFilter = document.getElementById('filterEstado').value;
+    return (!areaFilter || areaFilter === area) && (!estadoFilter || estadoFilter === estado);
+}
+
+function applySolicitudCreada(datos) {
+    applyStatsDelta(datos.delta);
+
+    const sol = datos.solicitud;
+    if (!coincideFiltros(sol.area_solicitante, sol.estado)) return;
+    if (currentSolicitudes.some(s => s.id === sol.id)) return;
+
+    currentSolicitudes.unshift(sol);
+    renderSolicitudesTable(currentSolicitudes);
+}
+
+function applyCambioEstado(datos) {
+    applyStatsDelta(datos.delta);
+
+    const index = currentSolicitudes.findIndex(s => s.id === datos.id);
+    if (index === -1) {
+        // Entra al filtro actual pero no tenemos la fila completa
+        if (coincideFiltros(datos.area_solicitante, datos.estado)) {
+            loadSolicitudes();
+        }
+        return;
+    }
+
+    if (coincideFiltros(datos.area_solicitante, datos.estado)) {
+        currentSolicitudes[index] = { ...currentSolicitudes[index], estado: datos.estado };
+    } else {
+        currentSolicitudes.splice(index, 1);
+    }
+    renderSolicitudesTable(currentSolicitudes);
+}
+
+function sumarDelta(destino, delta) {
+    Object.entries(delta).forEach(([clave, valor]) => {
+        if (typeof valor === 'object') {
+            destino[clave] = destino[clave] || {};
+            sumarDelta(destino[clave], valor);
+        } else {
+            destino[clave] = (destino[clave] || 0) + valor;
+        }
+    });
+}
+
+function applyStatsDelta(delta) {
+    if (!currentEstadisticas || !delta) return;
+    sumarDelta(currentEstadisticas, delta);
+    renderEstadisticas(currentEstadisticas);
+}
+
 async function viewSolicitudDetails(id) {
     try {
         const response = await fetch(`${API_BASE_URL}/${id}`);
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks de la API de solicitudes (en proceso, sin red).
+
+Levanta la app FastAPI contra la base indicada (SQLite temporal por
+defecto), carga N solicitudes con el generador de init_db.py, sustituye
+Google Sheets por un fake con latencia configurable y mide throughput y
+latencias p50/p99 de: crear, listar (con filtros, offset profundo y
+cursor), detalle, PATCH y estadísticas. Los resultados se guardan en JSON
+junto con el commit actual para comparar entre versiones:
+
+    python scripts/benchmark_api.py --filas 10000 --output bench_antes.json
+    python scripts/benchmark_api.py --filas 10000 --output bench_despues.json --comparar bench_antes.json
+
+    # Contra Postgres local
+    python scripts/benchmark_api.py --database-url postgresql://postgres:pw@localhost/bench
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Por defecto, SQLite en un archivo temporal")
+    parser.add_argument("--filas", type=int, default=10_000, help="Solicitudes a precargar")
+    parser.add_argument("--requests", type=int, default=500, help="Requests por escenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latencia-sheets", type=float, default=0.2, help="Segundos por llamada del fake de Sheets")
+    parser.add_argument("--async-db", action="store_true", help="Usar la ruta DB_ASYNC")
+    parser.add_argument("--sin-cache", action="store_true", help="ESTADISTICAS_TTL=0")
+    parser.add_argument("--con-limites", action="store_true", help="Mantener los límites de escritura (429) de la configuración")
+    parser.add_argument("--only", nargs="*", help="Escenarios a ejecutar")
+    parser.add_argument("--output", help="Archivo JSON con los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para mostrar diferencias")
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# La configuración se lee al importar la app: fijar el entorno antes
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+os.environ["DB_ASYNC"] = "true" if args.async_db else "false"
+os.environ["GOOGLE_SHEET_ID"] = ""
+os.environ["GOOGLE_CREDENTIALS_JSON"] = ""
+if args.sin_cache:
+    os.environ["ESTADISTICAS_TTL"] = "0"
+if not args.con_limites:
+    # Todas las altas salen de un mismo cliente: sin esto se mediría el 429
+    os.environ["LIMITE_CLIENTE_POR_SEGUNDO"] = "0"
+    os.environ["LIMITE_GLOBAL_POR_SEGUNDO"] = "0"
+    os.environ["LIMITE_ESCRITURAS_CONCURRENTES"] = "0"
+
+import httpx
+
+from app.main import app
+from app.models import Estado, AreaSolicitante
+from app.services import sheets_outbox_worker, GoogleSheetsService
+from benchmark_busqueda import sembrar
+from load_test import ejecutar, payload_solicitud
+
+
+class FakeSheetsService:
+    """Sustituto de GoogleSheetsService que solo simula la latencia de la API."""
+
+    fila_solicitud = staticmethod(GoogleSheetsService.fila_solicitud)
+
+    def __init__(self, latencia: float):
+        self.latencia = latencia
+        self.service = True
+        self.configurado = True
+        self.llamadas = 0
+
+    def append_solicitudes(self, lista_datos):
+        self.llamadas += 1
+        time.sleep(self.latencia)
+        return True
+
+    def update_estados(self, estados):
+        self.llamadas += 1
+        time.sleep(self.latencia)
+        return set(estados)
+
+
+def commit_actual() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "desconocido"
+
+
+async def main():
+    sembrar(args.filas)
+
+    fake = FakeSheetsService(args.latencia_sheets)
+    sheets_outbox_worker.sheets_service = fake
+    sheets_outbox_worker.start()
+
+    areas = [a.value for a in AreaSolicitante]
+    estados = [e.value for e in Estado]
+    offset_profundo = max(args.filas - 100, 0)
+
+    escenarios = {
+        "crear": lambda c: c.post("/api/solicitudes/", json=payload_solicitud()),
+        "listar": lambda c: c.get("/api/solicitudes/", params={"limit": 100}),
+        "listar_filtrado": lambda c: c.get(
+            "/api/solicitudes/", params={"limit": 100, "area": random.choice(areas), "estado": random.choice(estados)}
+        ),
+        "listar_offset_profundo": lambda c: c.get(
+            "/api/solicitudes/", params={"limit": 100, "skip": offset_profundo}
+        ),
+        "detalle": lambda c: c.get(f"/api/solicitudes/{random.randint(1, args.filas)}"),
+        "patch": lambda c: c.patch(
+            f"/api/solicitudes/{random.randint(1, args.filas)}", json={"estado": random.choice(estados)}
+        ),
+        "estadisticas": lambda c: c.get("/api/solicitudes/estadisticas/resumen"),
+    }
+
+    resultados = {
+        "commit": commit_actual(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "parametros": {
+            "motor": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "filas": args.filas,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latencia_sheets": args.latencia_sheets,
+            "async_db": args.async_db,
+        },
+        "escenarios": {},
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for nombre, fn in escenarios.items():
+                if args.only and nombre not in args.only:
+                    continue
+                resultados["escenarios"][nombre] = await ejecutar(client, args.requests, args.concurrency, fn)
+                print(f"{nombre}: {resultados['escenarios'][nombre]}")
+    finally:
+        sheets_outbox_worker.stop()
+
+    resultados["sheets_llamadas"] = fake.llamadas
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            anterior = json.load(f)
+        print(f"\nComparación contra {anterior.get('commit')} ({args.comparar}):")
+        for nombre, actual in resultados["escenarios"].items():
+            previo = anterior.get("escenarios", {}).get(nombre)
+            if not previo:
+                continue
+            print(
+                f"  {nombre}: rps {previo['rps']} -> {actual['rps']}, "
+                f"p50 {previo['p50_ms']} -> {actual['p50_ms']} ms, "
+                f"p99 {previo['p99_ms']} -> {actual['p99_ms']} ms"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
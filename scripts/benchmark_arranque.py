@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque en frío.
+
+Cada corrida lanza un intérprete nuevo que mide cuánto tarda `import app.main`
+y la latencia del primer request (/health y el listado) a través del
+transporte ASGI de httpx, como le pasa a una instancia nueva con
+min_instances: 0. Reporta mediana y máximo de cada fase:
+
+    python scripts/benchmark_arranque.py --corridas 10 --output arranque.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+
+async def primer_request(app, ruta: str) -> float:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://arranque") as client:
+        inicio = time.perf_counter()
+        response = await client.get(ruta)
+        response.raise_for_status()
+        return time.perf_counter() - inicio
+
+
+def medir_hijo():
+    """Se ejecuta en el subproceso: imprime un JSON con los tiempos en ms."""
+    sys.path.insert(0, BACKEND)
+
+    inicio = time.perf_counter()
+    from app.main import app
+    importacion = time.perf_counter() - inicio
+
+    health = asyncio.run(primer_request(app, "/health"))
+    listado = asyncio.run(primer_request(app, "/api/solicitudes/?limit=20"))
+
+    print(json.dumps({
+        "import_ms": round(importacion * 1000, 2),
+        "primer_health_ms": round(health * 1000, 2),
+        "primer_listado_ms": round(listado * 1000, 2),
+        "modulos_google_cargados": "googleapiclient.discovery" in sys.modules,
+    }))
+
+
+def main(args):
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'arranque.db')}"
+
+    # Preparar el esquema y datos fuera de la medición
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from benchmark_busqueda import sembrar
+    sembrar(args.filas)
+
+    corridas = []
+    for i in range(args.corridas):
+        salida = subprocess.check_output([sys.executable, __file__, "--hijo"], env=os.environ, text=True)
+        corridas.append(json.loads(salida.strip().splitlines()[-1]))
+        print(f"corrida {i + 1}: {corridas[-1]}")
+
+    resumen = {}
+    for clave in ("import_ms", "primer_health_ms", "primer_listado_ms"):
+        valores = [c[clave] for c in corridas]
+        resumen[clave] = {"mediana": round(statistics.median(valores), 2), "max": round(max(valores), 2)}
+    resumen["modulos_google_cargados"] = any(c["modulos_google_cargados"] for c in corridas)
+
+    print(json.dumps(resumen, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"resumen": resumen, "corridas": corridas}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Por defecto, SQLite en un archivo temporal")
+    parser.add_argument("--filas", type=int, default=1000)
+    parser.add_argument("--corridas", type=int, default=5)
+    parser.add_argument("--output")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        medir_hijo()
+    else:
+        main(args)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la búsqueda de texto completo contra la base de DATABASE_URL.
+
+Carga solicitudes sintéticas hasta llegar a --filas (100k por defecto),
+asegura el índice de búsqueda y compara la consulta indexada (tsvector/GIN
+en Postgres, FTS5 en SQLite) contra un escaneo con ILIKE:
+
+    python scripts/benchmark_busqueda.py --filas 100000 --repeticiones 50
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import or_, select
+
+from app.models import Base, engine, SessionLocal, Solicitud
+from app.services.busqueda import consulta_busqueda, crear_indice_busqueda
+from init_db import generar_solicitudes
+
+CONSULTAS = ["reportes satisfacción", "citas", "documentos validación", "Excel", "recordatorios clientes"]
+
+
+def sembrar(filas: int, lote: int = 5000):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        crear_indice_busqueda(conn)
+
+    db = SessionLocal()
+    try:
+        existentes = db.query(Solicitud).count()
+        faltantes = filas - existentes
+        if faltantes <= 0:
+            print(f"Ya existen {existentes} solicitudes.")
+            return
+        print(f"Insertando {faltantes} solicitudes sintéticas...")
+        buffer = []
+        for data in generar_solicitudes(faltantes, prefijo=f"BENCH-{existentes:06d}"):
+            buffer.append(data)
+            if len(buffer) >= lote:
+                db.bulk_insert_mappings(Solicitud, buffer)
+                db.commit()
+                buffer = []
+        if buffer:
+            db.bulk_insert_mappings(Solicitud, buffer)
+            db.commit()
+    finally:
+        db.close()
+
+
+def medir(fn, repeticiones: int) -> dict:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return {
+        "p50_ms": round(statistics.median(tiempos) * 1000, 2),
+        "p99_ms": round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))] * 1000, 2),
+    }
+
+
+def main(args):
+    sembrar(args.filas)
+    dialecto = engine.dialect.name
+    resultados = {"dialecto": dialecto, "filas": args.filas, "consultas": {}}
+
+    db = SessionLocal()
+    try:
+        for q in CONSULTAS:
+            def indexada():
+                db.execute(consulta_busqueda(dialecto, q, 20)).all()
+
+            def escaneo():
+                patron = f"%{q.split()[0]}%"
+                db.execute(
+                    select(Solicitud.id)
+                    .where(or_(
+                        Solicitud.titulo_proceso.ilike(patron),
+                        Solicitud.descripcion_proceso.ilike(patron),
+                        Solicitud.situacion_actual.ilike(patron),
+                        Solicitud.sistemas_involucrados.ilike(patron),
+                    ))
+                    .order_by(Solicitud.fecha_creacion.desc())
+                    .limit(20)
+                ).all()
+
+            resultados["consultas"][q] = {
+                "indexada": medir(indexada, args.repeticiones),
+                "ilike": medir(escaneo, args.repeticiones),
+            }
+            print(f"{q!r}: {resultados['consultas'][q]}")
+    finally:
+        db.close()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    main(parser.parse_args())
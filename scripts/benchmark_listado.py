@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark del listado: entidades completas vs proyección de columnas.
+
+Compara cargar objetos Solicitud completos (incluyendo los campos Text)
+contra la proyección COLUMNAS_LISTADO que usa GET /api/solicitudes/,
+midiendo latencia y memoria pico (tracemalloc) para varios tamaños de página:
+
+    python scripts/benchmark_listado.py --filas 20000 --limites 100 1000 5000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import select
+
+from app.models import SessionLocal, Solicitud
+from app.routers.solicitudes import COLUMNAS_LISTADO
+from app.schemas import SolicitudListResponse
+from benchmark_busqueda import sembrar
+
+
+def medir(fn, repeticiones: int) -> dict:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    fn()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(statistics.median(tiempos) * 1000, 2),
+        "max_ms": round(max(tiempos) * 1000, 2),
+        "memoria_pico_kb": round(pico / 1024, 1),
+    }
+
+
+def main(args):
+    sembrar(args.filas)
+    resultados = {"filas": args.filas, "limites": {}}
+
+    for limite in args.limites:
+        def completa():
+            db = SessionLocal()
+            try:
+                filas = db.scalars(
+                    select(Solicitud).order_by(Solicitud.fecha_creacion.desc(), Solicitud.id.desc()).limit(limite)
+                ).all()
+                [SolicitudListResponse.model_validate(f).model_dump(mode="json") for f in filas]
+            finally:
+                db.close()
+
+        def proyectada():
+            db = SessionLocal()
+            try:
+                filas = db.execute(
+                    select(*COLUMNAS_LISTADO).order_by(Solicitud.fecha_creacion.desc(), Solicitud.id.desc()).limit(limite)
+                ).all()
+                [SolicitudListResponse.model_validate(f).model_dump(mode="json") for f in filas]
+            finally:
+                db.close()
+
+        resultados["limites"][limite] = {
+            "entidad_completa": medir(completa, args.repeticiones),
+            "proyeccion": medir(proyectada, args.repeticiones),
+        }
+        print(f"limit={limite}: {resultados['limites'][limite]}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=20_000)
+    parser.add_argument("--limites", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    main(parser.parse_args())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de serialización del listado y del detalle.
+
+Compara el CPU por respuesta del camino actual (filas/ORM -> validación de
+Pydantic con from_attributes -> dump -> json) contra la serialización rápida
+(filas proyectadas -> orjson), y el costo y tamaño de comprimir el cuerpo con
+gzip y brotli. Usa SQLite en un archivo temporal:
+
+    python scripts/benchmark_serializacion.py --limit 100 --repeticiones 500
+    python scripts/benchmark_serializacion.py --largo-texto 4000 --output serializacion.json
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def medir(fn, repeticiones: int) -> dict:
+    """CPU del proceso (no reloj de pared) por llamada."""
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.process_time()
+        resultado = fn()
+        tiempos.append(time.process_time() - inicio)
+    return {
+        "cpu_media_us": round(statistics.mean(tiempos) * 1e6, 1),
+        "cpu_p99_us": round(sorted(tiempos)[int(0.99 * (len(tiempos) - 1))] * 1e6, 1),
+        "bytes": len(resultado),
+    }
+
+
+def main(args):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'serializacion.db')}"
+
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+
+    from app.models import Base, engine, SessionLocal, Solicitud
+    from app.schemas import SolicitudListResponse, SolicitudResponse
+    from app.services import serializacion
+    from app.routers.solicitudes import COLUMNAS_DETALLE, consulta_listado
+    from init_db import generar_solicitudes
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    relleno = " Detalle adicional del proceso." * (args.largo_texto // 30)
+    filas = [
+        {**datos, "descripcion_proceso": datos["descripcion_proceso"] + relleno}
+        for datos in generar_solicitudes(max(args.limit, 1), prefijo="SER")
+    ]
+    db.bulk_insert_mappings(Solicitud, filas)
+    db.commit()
+
+    listado = db.execute(consulta_listado(0, args.limit, None, None, None)).all()
+    detalle_orm = db.query(Solicitud).first()
+    detalle_fila = db.execute(select(*COLUMNAS_DETALLE).where(Solicitud.id == detalle_orm.id)).one()
+
+    adaptador_lista = TypeAdapter(List[SolicitudListResponse])
+    adaptador_detalle = TypeAdapter(SolicitudResponse)
+
+    # Lo que hace FastAPI con response_model: validar, volcar a JSON y JSONResponse
+    def actual_listado():
+        return JSONResponse(adaptador_lista.dump_python(
+            adaptador_lista.validate_python(listado, from_attributes=True), mode="json"
+        )).body
+
+    def actual_detalle():
+        return JSONResponse(adaptador_detalle.dump_python(
+            adaptador_detalle.validate_python(detalle_orm, from_attributes=True), mode="json"
+        )).body
+
+    def rapido_listado():
+        return serializacion.RespuestaJSON([dict(f._mapping) for f in listado]).body
+
+    def rapido_detalle():
+        return serializacion.RespuestaJSON(dict(detalle_fila._mapping)).body
+
+    # Mismo contenido por ambos caminos
+    assert json.loads(actual_listado()) == json.loads(rapido_listado())
+    assert json.loads(actual_detalle()) == json.loads(rapido_detalle())
+
+    resultados = {
+        "motor_json": "orjson" if serializacion.orjson is not None else "json",
+        "limit": args.limit,
+        "largo_texto": args.largo_texto,
+        "escenarios": {},
+    }
+    for nombre, fn in [
+        ("listado_actual", actual_listado),
+        ("listado_rapido", rapido_listado),
+        ("detalle_actual", actual_detalle),
+        ("detalle_rapido", rapido_detalle),
+    ]:
+        resultados["escenarios"][nombre] = medir(fn, args.repeticiones)
+
+    cuerpo = rapido_listado()
+    resultados["escenarios"]["listado_gzip"] = medir(lambda: gzip.compress(cuerpo, 6), args.repeticiones)
+    try:
+        import brotli
+
+        resultados["escenarios"]["listado_brotli"] = medir(
+            lambda: brotli.compress(cuerpo, quality=4), args.repeticiones
+        )
+    except ImportError:
+        print("brotli no está instalado: se omite")
+
+    print(f"Motor JSON: {resultados['motor_json']}; limit={args.limit}; texto extra={args.largo_texto}")
+    print(f"{'escenario':<18}{'CPU media (us)':>16}{'CPU p99 (us)':>14}{'bytes':>10}")
+    for nombre, r in resultados["escenarios"].items():
+        print(f"{nombre:<18}{r['cpu_media_us']:>16}{r['cpu_p99_us']:>14}{r['bytes']:>10}")
+
+    for recurso in ("listado", "detalle"):
+        actual = resultados["escenarios"][f"{recurso}_actual"]["cpu_media_us"]
+        rapido = resultados["escenarios"][f"{recurso}_rapido"]["cpu_media_us"]
+        if rapido:
+            print(f"{recurso}: {actual / rapido:.1f}x menos CPU con la serialización rápida")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(resultados, f, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=100, help="Filas del listado")
+    parser.add_argument("--largo-texto", type=int, default=2000, help="Caracteres extra en descripcion_proceso")
+    parser.add_argument("--repeticiones", type=int, default=500)
+    parser.add_argument("--output", help="Archivo JSON con los resultados")
+    main(parser.parse_args())
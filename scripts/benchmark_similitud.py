@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la detección de duplicados con el índice MinHash/LSH.
+
+Carga --filas solicitudes con textos sintéticos variados, de las cuales una
+fracción (--duplicados) son copias editadas de otras, las indexa y mide:
+latencia de la búsqueda de similares, candidatos que devuelve el índice,
+cuántas copias plantadas encuentra y, para unas pocas consultas, la
+comparación contra todas las firmas (lo que el índice evita):
+
+    python scripts/benchmark_similitud.py --filas 100000
+    python scripts/benchmark_similitud.py --database-url postgresql://postgres:pw@localhost/bench --output similitud.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+SILABAS = "ba be bi bo bu ca ce ci co cu da de di do du fa fe fi fo ga ge go la le li lo lu ma me mi mo mu na ne ni no pa pe pi po ra re ri ro sa se si so ta te ti to va ve vi".split()
+
+
+def vocabulario(azar: random.Random, tamano: int = 3000) -> list:
+    palabras = set()
+    while len(palabras) < tamano:
+        palabras.add("".join(azar.choice(SILABAS) for _ in range(azar.randint(2, 4))))
+    return sorted(palabras)
+
+
+def editar(texto: str, azar: random.Random, vocab: list, fraccion: float) -> str:
+    """Copia con una fracción de palabras reemplazadas, como otra área que reescribe el pedido."""
+    palabras = texto.split()
+    for i in azar.sample(range(len(palabras)), max(1, int(len(palabras) * fraccion))):
+        palabras[i] = azar.choice(vocab)
+    return " ".join(palabras)
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def main(args):
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'similitud.db')}"
+
+    from sqlalchemy import func, select
+
+    from app.models import Base, engine, SessionLocal, Solicitud, SimilitudFirma
+    from app.services import similitud
+    from init_db import SAMPLE_SOLICITUDES
+    from indexar_similitud import indexar_pendientes
+
+    Base.metadata.create_all(bind=engine)
+    azar = random.Random(7)
+    vocab = vocabulario(azar)
+    base = SAMPLE_SOLICITUDES[0]
+
+    # (titulo, descripcion, índice de la original si es una copia)
+    textos = []
+    for i in range(args.filas):
+        if textos and azar.random() < args.duplicados:
+            origen = azar.randrange(len(textos))
+            titulo, descripcion, _ = textos[origen]
+            textos.append((titulo, editar(descripcion, azar, vocab, args.edicion), origen))
+        else:
+            titulo = " ".join(azar.choices(vocab, k=6))
+            descripcion = " ".join(azar.choices(vocab, k=azar.randint(40, 120)))
+            textos.append((titulo, descripcion, None))
+
+    db = SessionLocal()
+    try:
+        print(f"Insertando {args.filas} solicitudes...")
+        inicio = time.perf_counter()
+        for desde in range(0, args.filas, 5000):
+            db.bulk_insert_mappings(Solicitud, [
+                {**base, "numero_solicitud": f"SIM-{i:08d}", "titulo_proceso": t, "descripcion_proceso": d}
+                for i, (t, d, _) in enumerate(textos[desde:desde + 5000], start=desde)
+            ])
+            db.commit()
+        print(f"  {time.perf_counter() - inicio:.1f}s")
+
+        print("Indexando...")
+        inicio = time.perf_counter()
+        indexar_pendientes(db, 5000, progreso=False)
+        duracion_indexado = time.perf_counter() - inicio
+        print(f"  {duracion_indexado:.1f}s ({args.filas / duracion_indexado:.0f} solicitudes/s)")
+
+        ids = dict(db.execute(
+            select(Solicitud.numero_solicitud, Solicitud.id).where(Solicitud.numero_solicitud.like("SIM-%"))
+        ).all())
+        id_de = lambda i: ids[f"SIM-{i:08d}"]
+
+        copias = [i for i, (_, _, origen) in enumerate(textos) if origen is not None]
+        muestra = azar.sample(copias, min(args.consultas, len(copias)))
+
+        latencias, candidatos, encontradas = [], [], 0
+        for i in muestra:
+            titulo, descripcion, origen = textos[i]
+            firma = similitud.firma_de(titulo, descripcion)
+            inicio = time.perf_counter()
+            resultado = similitud.similares(db, firma, id_de(i))
+            latencias.append(time.perf_counter() - inicio)
+            candidatos.append(len(db.execute(similitud.consulta_candidatos(firma, id_de(i))).all()))
+            encontradas += any(s["id"] == id_de(origen) for s in resultado)
+
+        print("Comparando contra todas las firmas...")
+        todas = [(sid, similitud.desempacar(f)) for sid, f in db.execute(
+            select(SimilitudFirma.solicitud_id, SimilitudFirma.firma)
+        ).all()]
+        fuerza, coincide_exacto = [], 0
+        exactas_total = 0
+        for i in muestra[:args.consultas_fuerza]:
+            titulo, descripcion, _ = textos[i]
+            firma = similitud.firma_de(titulo, descripcion)
+            inicio = time.perf_counter()
+            exactas = {
+                sid for sid, otra in todas
+                if sid != id_de(i) and similitud.similitud(firma, otra) >= similitud.SIMILARES_UMBRAL
+            }
+            fuerza.append(time.perf_counter() - inicio)
+            lsh = {s["id"] for s in similitud.similares(db, firma, id_de(i), maximo=len(exactas) or 1)}
+            exactas_total += len(exactas)
+            coincide_exacto += len(exactas & lsh)
+
+        total_indice = db.execute(select(func.count()).select_from(SimilitudFirma)).scalar_one()
+    finally:
+        db.close()
+
+    resultados = {
+        "motor": engine.dialect.name,
+        "filas": args.filas,
+        "indexadas": total_indice,
+        "copias_plantadas": len(copias),
+        "indexado_por_segundo": round(args.filas / duracion_indexado),
+        "busqueda_p50_ms": round(statistics.median(latencias) * 1000, 2),
+        "busqueda_p99_ms": round(percentil(latencias, 99) * 1000, 2),
+        "candidatos_promedio": round(statistics.mean(candidatos), 1),
+        "copias_encontradas": f"{encontradas}/{len(muestra)}",
+        "fuerza_bruta_p50_ms": round(statistics.median(fuerza) * 1000, 2) if fuerza else None,
+        "recall_vs_exacto": round(coincide_exacto / exactas_total, 3) if exactas_total else None,
+    }
+    for clave, valor in resultados.items():
+        print(f"{clave:>24}: {valor}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Por defecto, SQLite en un archivo temporal")
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--duplicados", type=float, default=0.05, help="Fracción de copias editadas")
+    parser.add_argument("--edicion", type=float, default=0.1, help="Fracción de palabras cambiadas en cada copia")
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--consultas-fuerza", type=int, default=10, help="Consultas comparadas contra todas las firmas")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    main(parser.parse_args())
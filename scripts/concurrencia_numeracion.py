@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Prueba de concurrencia del generador de numero_solicitud.
+
+Crea miles de solicitudes en paralelo (un hilo y una sesión por alta, como
+hace la API) y verifica que no haya números repetidos ni IntegrityError:
+
+    python scripts/concurrencia_numeracion.py --total 5000 --workers 32
+    python scripts/concurrencia_numeracion.py --database-url postgresql://postgres:pw@localhost/bench
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def main(args):
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'numeracion.db')}"
+
+    from sqlalchemy import func, select
+
+    from app.models import Base, engine, SessionLocal, Solicitud
+    from app.services.numeracion import reservar_numeros
+    from init_db import SAMPLE_SOLICITUDES
+
+    Base.metadata.create_all(bind=engine)
+    base = SAMPLE_SOLICITUDES[0]
+
+    def crear(_):
+        db = SessionLocal()
+        try:
+            numero, = reservar_numeros(db)
+            db.add(Solicitud(**{**base, "numero_solicitud": numero}))
+            db.commit()
+            return numero
+        finally:
+            db.close()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        numeros = list(pool.map(crear, range(args.total)))
+    duracion = time.perf_counter() - inicio
+
+    db = SessionLocal()
+    try:
+        distintos_bd = db.execute(
+            select(func.count(func.distinct(Solicitud.numero_solicitud)))
+            .where(Solicitud.numero_solicitud.in_(numeros))
+        ).scalar_one()
+    finally:
+        db.close()
+
+    repetidos = len(numeros) - len(set(numeros))
+    print(f"{args.total} altas con {args.workers} hilos en {duracion:.2f}s ({args.total / duracion:.0f}/s)")
+    print(f"Números repetidos: {repetidos}; distintos en la base: {distintos_bd}")
+    if repetidos or distintos_bd != args.total:
+        sys.exit(1)
+    print("OK: sin colisiones")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Por defecto, SQLite en un archivo temporal")
+    parser.add_argument("--total", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=32)
+    main(parser.parse_args())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Indexa para la detección de duplicados las solicitudes que todavía no tienen
+firma (p. ej. las creadas antes de la migración 0008). Con --completo borra y
+reconstruye el índice, necesario si cambian PERMUTACIONES o BANDAS:
+
+    python scripts/indexar_similitud.py
+    python scripts/indexar_similitud.py --completo --lote 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy import delete, select
+
+from app.models import SessionLocal, Solicitud, SimilitudFirma, SimilitudBanda
+from app.services import similitud
+
+
+def indexar_pendientes(db, lote: int = 1000, progreso: bool = True) -> int:
+    total = 0
+    ultimo_id = 0
+    while True:
+        filas = db.execute(
+            select(Solicitud.id, Solicitud.titulo_proceso, Solicitud.descripcion_proceso)
+            .outerjoin(SimilitudFirma, SimilitudFirma.solicitud_id == Solicitud.id)
+            .where(SimilitudFirma.solicitud_id.is_(None))
+            .where(Solicitud.id > ultimo_id)
+            .order_by(Solicitud.id)
+            .limit(lote)
+        ).all()
+        if not filas:
+            return total
+        similitud.indexar(db, [
+            (f.id, similitud.firma_de(f.titulo_proceso, f.descripcion_proceso)) for f in filas
+        ])
+        db.commit()
+        ultimo_id = filas[-1].id
+        total += len(filas)
+        if progreso:
+            print(f"  {total} indexadas...")
+
+
+def main(args):
+    db = SessionLocal()
+    try:
+        if args.completo:
+            db.execute(delete(SimilitudBanda))
+            db.execute(delete(SimilitudFirma))
+            db.commit()
+            print("Índice de similitud borrado.")
+        inicio = time.perf_counter()
+        total = indexar_pendientes(db, args.lote)
+        print(f"{total} solicitudes indexadas en {time.perf_counter() - inicio:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--completo", action="store_true", help="Borrar y reconstruir todo el índice")
+    parser.add_argument("--lote", type=int, default=1000)
+    main(parser.parse_args())
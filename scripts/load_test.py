@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga contra una instancia en ejecución de la API.
+
+Sirve para comparar la ruta síncrona y la asíncrona (DB_ASYNC) midiendo
+requests/segundo y latencias p50/p99 por endpoint:
+
+    # terminal 1
+    cd backend && DB_ASYNC=false LIMITE_CLIENTE_POR_SEGUNDO=0 uvicorn app.main:app --port 8000
+    # terminal 2
+    python scripts/load_test.py --url http://localhost:8000 --requests 2000 --concurrency 50
+
+Repetir con DB_ASYNC=true y comparar. Todas las altas salen de la misma IP, así
+que el límite por cliente se desactiva; el global y el de concurrencia siguen
+activos y sus 429 cuentan como errores.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import httpx
+
+AREAS = ["SCC", "Psychology", "CC&C", "WAE's", "DCO", "Packets", "CA's", "Follow up", "Customer Service"]
+
+
+def payload_solicitud():
+    return {
+        "area_solicitante": random.choice(AREAS),
+        "nombre_solicitante": "Prueba de Carga",
+        "email_solicitante": "carga@firma.com",
+        "titulo_proceso": "Proceso de prueba de carga",
+        "descripcion_proceso": "Descripción generada por la prueba de carga del sistema.",
+        "situacion_actual": "Situación actual de prueba.",
+        "resultado_esperado": "Resultado esperado de prueba.",
+        "urgencia": random.choice(["Baja", "Media", "Alta", "Crítica"]),
+        "impacto": random.choice(["Bajo", "Medio", "Alto"]),
+    }
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[k]
+
+
+async def ejecutar(client, total, concurrencia, hacer_request):
+    latencias = []
+    errores = 0
+    semaforo = asyncio.Semaphore(concurrencia)
+
+    async def una():
+        nonlocal errores
+        async with semaforo:
+            inicio = time.perf_counter()
+            try:
+                r = await hacer_request(client)
+                if r.status_code >= 400:
+                    errores += 1
+            except httpx.HTTPError:
+                errores += 1
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(una() for _ in range(total)))
+    duracion = time.perf_counter() - inicio
+
+    return {
+        "requests": total,
+        "errores": errores,
+        "rps": round(total / duracion, 1),
+        "p50_ms": round(percentil(latencias, 50) * 1000, 2),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 2),
+        "media_ms": round(statistics.mean(latencias) * 1000, 2) if latencias else 0,
+    }
+
+
+async def main(args):
+    escenarios = {
+        "crear": lambda c: c.post("/api/solicitudes/", json=payload_solicitud()),
+        "listar": lambda c: c.get("/api/solicitudes/", params={"limit": 50}),
+        "estadisticas": lambda c: c.get("/api/solicitudes/estadisticas/resumen"),
+    }
+
+    resultados = {}
+    limites = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=30) as client:
+        for nombre, fn in escenarios.items():
+            if args.only and nombre not in args.only:
+                continue
+            resultados[nombre] = await ejecutar(client, args.requests, args.concurrency, fn)
+            print(f"{nombre}: {resultados[nombre]}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--only", nargs="*", help="Escenarios a ejecutar (crear, listar, estadisticas)")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script para reconciliar Google Sheets con la base de datos
+
+Agrega a la hoja las solicitudes que faltan y reescribe las filas que no
+coinciden con la base, revisando solo lo modificado desde la última
+reconciliación (watermark sobre fecha_actualizacion).
+
+    python scripts/reconcile_sheets.py --dry-run    # solo reporta
+    python scripts/reconcile_sheets.py              # aplica los cambios
+    python scripts/reconcile_sheets.py --completo   # ignora el watermark
+"""
+import argparse
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
+
+from app.services import google_sheets_service, ReconciliadorSheets
+
+
+def reconcile_sheets(dry_run: bool, completo: bool, chunk: int, detalle: bool):
+    """Reconciliar Google Sheets con la base de datos"""
+
+    if not google_sheets_service.service:
+        print("ERROR: No se pudo inicializar el servicio de Google Sheets.")
+        print("Verifique que las variables de entorno estén configuradas:")
+        print("  - GOOGLE_SHEET_ID")
+        print("  - GOOGLE_CREDENTIALS_JSON")
+        return False
+
+    print("Leyendo la hoja y comparando con la base de datos...")
+    resultado = ReconciliadorSheets(chunk=chunk).reconciliar(dry_run=dry_run, completo=completo)
+
+    print(json.dumps(resultado.resumen(), indent=2, ensure_ascii=False))
+    if detalle:
+        print("Por agregar:", ", ".join(resultado.insertar) or "-")
+        print("Por reescribir:", ", ".join(resultado.actualizar) or "-")
+
+    if dry_run:
+        print("Modo dry-run: no se aplicaron cambios.")
+        return True
+
+    if not resultado.aplicado:
+        print("ERROR: No se pudieron aplicar todos los cambios; el watermark no se actualizó.")
+    return resultado.aplicado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Solo reportar diferencias")
+    parser.add_argument("--completo", action="store_true", help="Revisar todas las solicitudes, no solo desde el watermark")
+    parser.add_argument("--chunk", type=int, default=1000, help="Filas por lectura de la hoja")
+    parser.add_argument("--detalle", action="store_true", help="Listar los números de solicitud afectados")
+    args = parser.parse_args()
+    sys.exit(0 if reconcile_sheets(args.dry_run, args.completo, args.chunk, args.detalle) else 1)
@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+# La app lee la configuración al importarse: las pruebas usan siempre una
+# base SQLite temporal y sin Google Sheets, aunque exista un .env.
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'pruebas.db')}"
+os.environ["DATABASE_READ_URL"] = ""
+os.environ["DB_ASYNC"] = "false"
+os.environ["GOOGLE_SHEET_ID"] = ""
+os.environ["GOOGLE_CREDENTIALS_JSON"] = ""
+# Los límites de escritura se prueban aparte con sus propias instancias
+os.environ["LIMITE_CLIENTE_POR_SEGUNDO"] = "0"
+os.environ["LIMITE_GLOBAL_POR_SEGUNDO"] = "0"
+
+import pytest
+
+
+@pytest.fixture
+def db():
+    """Sesión sobre un esquema recién creado; se borra al terminar la prueba."""
+    from app.models import Base, engine, SessionLocal
+
+    Base.metadata.create_all(bind=engine)
+    sesion = SessionLocal()
+    try:
+        yield sesion
+    finally:
+        sesion.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+
+@pytest.fixture
+def cliente(db):
+    """TestClient de la app sin los eventos de arranque (sin worker del outbox)."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
@@ -0,0 +1,27 @@
+import itertools
+
+from init_db import SAMPLE_SOLICITUDES
+
+_secuencia = itertools.count(1)
+
+
+def datos_solicitud(**cambios) -> dict:
+    """Datos válidos para Solicitud(**datos) con un numero_solicitud único."""
+    return {**SAMPLE_SOLICITUDES[0], "numero_solicitud": f"TEST-{next(_secuencia):06d}", **cambios}
+
+
+def cuerpo_alta(**cambios) -> dict:
+    """JSON para POST /api/solicitudes/."""
+    datos = datos_solicitud(**cambios)
+    datos.pop("numero_solicitud")
+    datos.pop("estado")
+    return {k: getattr(v, "value", v) for k, v in datos.items()}
+
+
+def crear_solicitud(db, **cambios):
+    from app.models import Solicitud
+
+    solicitud = Solicitud(**datos_solicitud(**cambios))
+    db.add(solicitud)
+    db.flush()
+    return solicitud
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from alembic.script import ScriptDirectory
+
+from app.models import SessionLocal
+from app.services.google_sheets import GoogleSheetsService
+from app.services.sheets_outbox import SheetsOutboxWorker
+
+BACKEND = os.path.join(os.path.dirname(__file__), "..", "backend")
+
+# Se ejecuta en un intérprete nuevo: lo importado por otras pruebas no cuenta
+_IMPORTAR_APP = """
+import sys
+from sqlalchemy import inspect
+import app.main
+from app.models import engine
+print(sorted(m for m in sys.modules if m.startswith("googleapiclient.discovery")))
+print(inspect(engine).get_table_names())
+"""
+
+
+def test_importar_la_app_no_toca_la_base_ni_google():
+    entorno = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'arranque.db')}",
+        "GOOGLE_SHEET_ID": "hoja",
+        "GOOGLE_CREDENTIALS_JSON": "{}",
+    }
+
+    salida = subprocess.run(
+        [sys.executable, "-c", _IMPORTAR_APP], cwd=BACKEND, env=entorno,
+        capture_output=True, text=True, check=True,
+    ).stdout.splitlines()
+
+    assert salida[-2:] == ["[]", "[]"]
+
+
+def sheets_configurado(monkeypatch):
+    monkeypatch.setenv("GOOGLE_SHEET_ID", "hoja")
+    monkeypatch.setenv("GOOGLE_CREDENTIALS_JSON", "{}")
+    sheets = GoogleSheetsService()
+    construcciones = []
+
+    def construir():
+        construcciones.append(threading.get_ident())
+        sheets._service = object()
+
+    monkeypatch.setattr(sheets, "_initialize_service", construir)
+    return sheets, construcciones
+
+
+def test_el_cliente_se_construye_una_vez_en_el_primer_uso(monkeypatch):
+    sheets, construcciones = sheets_configurado(monkeypatch)
+    assert sheets.configurado and construcciones == []
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        servicios = set(pool.map(lambda _: id(sheets.service), range(32)))
+
+    assert len(construcciones) == 1
+    assert len(servicios) == 1
+
+
+def test_sin_configuracion_no_se_construye(monkeypatch):
+    monkeypatch.setenv("GOOGLE_SHEET_ID", "")
+    sheets = GoogleSheetsService()
+
+    assert not sheets.configurado
+    assert sheets.service is None
+
+
+def test_el_worker_no_construye_el_cliente_sin_pendientes(db, monkeypatch):
+    sheets, construcciones = sheets_configurado(monkeypatch)
+
+    assert SheetsOutboxWorker(SessionLocal, sheets).drenar() == 0
+    assert construcciones == []
+
+
+def test_health_consulta_la_base(cliente):
+    respuesta = cliente.get("/health")
+
+    assert respuesta.status_code == 200
+    assert respuesta.json()["status"] == "healthy"
+
+
+def test_init_db_migra_y_deja_la_version_de_alembic():
+    base = os.path.join(tempfile.mkdtemp(), "init.db")
+    entorno = {**os.environ, "DATABASE_URL": f"sqlite:///{base}"}
+    raiz = os.path.join(BACKEND, "..")
+
+    subprocess.run([sys.executable, "scripts/init_db.py"], cwd=raiz, env=entorno,
+                   capture_output=True, text=True, check=True)
+    # Una base inicializada así admite las migraciones siguientes
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND, env=entorno,
+                   capture_output=True, text=True, check=True)
+
+    scripts = ScriptDirectory(os.path.join(BACKEND, "alembic"))
+    conexion = sqlite3.connect(base)
+    assert conexion.execute("SELECT version_num FROM alembic_version").fetchone() == (scripts.get_current_head(),)
+    assert conexion.execute("SELECT count(*) FROM solicitudes").fetchone()[0] > 0
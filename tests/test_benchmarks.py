@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from load_test import percentil
+
+RAIZ = os.path.join(os.path.dirname(__file__), "..")
+
+
+def test_percentil():
+    valores = list(range(1, 101))
+
+    assert percentil(valores, 50) == 51
+    assert percentil(valores, 99) == 99
+    assert percentil([3.0], 99) == 3.0
+
+
+@pytest.mark.parametrize("async_db", [False, True])
+def test_la_suite_de_benchmarks_corre_sin_errores(tmp_path, async_db):
+    """Corrida mínima de scripts/benchmark_api.py: todos los escenarios responden sin errores."""
+    if async_db:
+        pytest.importorskip("aiosqlite")
+    salida = tmp_path / "bench.json"
+    comando = [
+        sys.executable, "scripts/benchmark_api.py",
+        "--filas", "30", "--requests", "10", "--concurrency", "4",
+        "--latencia-sheets", "0", "--output", str(salida),
+    ]
+    if async_db:
+        comando.append("--async-db")
+    entorno = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+
+    subprocess.run(comando, cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True, timeout=300)
+
+    resultados = json.loads(salida.read_text())
+    assert resultados["parametros"]["async_db"] is async_db
+    assert set(resultados["escenarios"]) == {
+        "crear", "listar", "listar_filtrado", "listar_offset_profundo", "detalle", "patch", "estadisticas",
+    }
+    for nombre, escenario in resultados["escenarios"].items():
+        assert escenario["errores"] == 0, nombre
+        assert escenario["requests"] == 10
@@ -0,0 +1,45 @@
+import pytest
+
+from app.models import engine
+from app.services.busqueda import crear_indice_busqueda, eliminar_indice_busqueda, escapar_resaltado
+
+from tests.fabricas import crear_solicitud
+
+
+@pytest.fixture
+def indice(db):
+    with engine.begin() as conn:
+        crear_indice_busqueda(conn)
+    yield
+    with engine.begin() as conn:
+        eliminar_indice_busqueda(conn)
+
+
+def test_escapar_resaltado():
+    assert escapar_resaltado("a <b> \x02x\x03") == "a &lt;b&gt; <mark>x</mark>"
+    assert escapar_resaltado(None) is None
+
+
+def test_la_busqueda_escapa_el_texto_del_usuario(cliente, db, indice):
+    crear_solicitud(
+        db,
+        titulo_proceso='Conciliación <script>alert("x")</script>',
+        descripcion_proceso="Conciliación <img src=x onerror=alert(1)> de cuentas",
+    )
+    db.commit()
+
+    resultado, = cliente.get("/api/solicitudes/search", params={"q": "conciliación"}).json()
+
+    assert resultado["titulo_resaltado"] == (
+        "<mark>Conciliación</mark> &lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;"
+    )
+    assert "<img" not in resultado["fragmento"]
+    assert resultado["fragmento"].startswith("<mark>Conciliación</mark> &lt;img")
+    # El título sin resaltar sigue siendo el texto tal cual
+    assert resultado["titulo_proceso"] == 'Conciliación <script>alert("x")</script>'
+
+
+def test_consulta_solo_con_espacios_es_422(cliente, db, indice):
+    assert cliente.get("/api/solicitudes/search", params={"q": "   "}).status_code == 422
+    assert cliente.get("/api/solicitudes/search", params={"q": " a "}).status_code == 422
+    assert cliente.get("/api/solicitudes/search", params={"q": " --  "}).json() == []
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import time
+import uuid
+
+import fakeredis
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.middleware import CacheRespuestasMiddleware
+from app.services.cache import CacheMemoria, CacheRedis, CacheRespuestas
+
+RUTA = "/api/solicitudes/"
+HEADERS = [(b"content-type", b"application/json"), (b"etag", b'W/"abc"')]
+
+
+def redis_falso():
+    servidor = fakeredis.FakeServer()
+    return lambda: CacheRedis(prefijo="prueba", cliente=fakeredis.FakeRedis(server=servidor))
+
+
+def redis_real():
+    url = os.getenv("PRUEBAS_REDIS_URL")
+    if not url:
+        pytest.skip("PRUEBAS_REDIS_URL no está definido")
+    prefijo = f"prueba-cache:{uuid.uuid4().hex[:8]}"
+    return lambda: CacheRedis(url, prefijo)
+
+
+# Cada fábrica crea backends que comparten servidor, como dos instancias de la app
+@pytest.fixture(params=["memoria", "redis_falso", "redis_real"])
+def nuevo_backend(request):
+    if request.param == "memoria":
+        return CacheMemoria
+    if request.param == "redis_falso":
+        return redis_falso()
+    return redis_real()
+
+
+def test_la_clave_no_depende_del_orden_de_los_params():
+    assert CacheRespuestas.clave(RUTA, b"limit=10&area=TI") == CacheRespuestas.clave(RUTA, b"area=TI&limit=10")
+
+
+def test_acierto_despues_de_guardar(nuevo_backend):
+    cache = CacheRespuestas(nuevo_backend())
+    guardada, generacion = cache.obtener("k", RUTA)
+    assert guardada is None
+
+    assert cache.guardar("k", generacion, 200, HEADERS, b'[{"id": 1}]')
+    guardada, _ = cache.obtener("k", RUTA)
+    assert guardada["cuerpo"] == '[{"id": 1}]'
+    assert ["etag", 'W/"abc"'] in guardada["headers"]
+
+
+def test_la_entrada_expira_con_el_ttl(nuevo_backend):
+    cache = CacheRespuestas(nuevo_backend(), ttl=1)
+    _, generacion = cache.obtener("k", RUTA)
+    cache.guardar("k", generacion, 200, HEADERS, b"[]")
+    time.sleep(1.1)
+    assert cache.obtener("k", RUTA)[0] is None
+
+
+def test_invalidacion_entre_instancias(nuevo_backend):
+    a = CacheRespuestas(nuevo_backend())
+    b = CacheRespuestas(nuevo_backend())
+    _, generacion = a.obtener("k", RUTA)
+    a.guardar("k", generacion, 200, HEADERS, b"[]")
+
+    compartido = a.backend.compartido
+    assert (b.obtener("k", RUTA)[0] is not None) == compartido
+
+    b.invalidar()
+    if not compartido:
+        # Con el backend en memoria la invalidación llega como evento
+        a.invalidar_por_evento("estado", {"id": 1})
+    assert a.obtener("k", RUTA)[0] is None
+
+
+def test_no_guarda_una_respuesta_armada_antes_de_una_escritura(nuevo_backend):
+    lector = CacheRespuestas(nuevo_backend())
+    escritor = CacheRespuestas(nuevo_backend())
+
+    # El GET busca y no encuentra; lee la base (estado viejo)...
+    _, generacion = lector.obtener("k", RUTA)
+    # ...mientras tanto una escritura hace commit e invalida...
+    escritor.invalidar()
+    if not lector.backend.compartido:
+        lector.invalidar_por_evento("estado", {"id": 1})
+    # ...y recién entonces el GET intenta guardar lo que leyó
+    assert not lector.guardar("k", generacion, 200, HEADERS, b'["viejo"]')
+
+    assert lector.obtener("k", RUTA)[0] is None
+    assert escritor.obtener("k", RUTA)[0] is None
+
+
+def test_sin_redis_no_se_guarda_ni_se_rompe_el_request():
+    class RedisCaido(fakeredis.FakeRedis):
+        def evalsha(self, *args, **kwargs):
+            raise ConnectionError("sin conexión")
+
+    cache = CacheRespuestas(CacheRedis(prefijo="prueba", cliente=RedisCaido()))
+    guardada, generacion = cache.obtener("k", RUTA)
+    assert guardada is None and generacion is None
+    assert not cache.guardar("k", generacion, 200, HEADERS, b"[]")
+
+
+def app_con_cache(cache, escritura_concurrente=None):
+    app = FastAPI()
+    version = {"valor": 1}
+
+    @app.get(RUTA)
+    async def listar():
+        leida = version["valor"]
+        if escritura_concurrente:
+            escritura_concurrente(version)
+        return {"version": leida}
+
+    app.add_middleware(CacheRespuestasMiddleware, cache=cache)
+    return app, version
+
+
+async def pedir(app, veces=1):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://prueba") as client:
+        return [await client.get(RUTA) for _ in range(veces)]
+
+
+def test_middleware_sirve_aciertos(nuevo_backend):
+    app, _ = app_con_cache(CacheRespuestas(nuevo_backend()))
+    primera, segunda = asyncio.run(pedir(app, 2))
+    assert "x-cache" not in primera.headers
+    assert segunda.headers["x-cache"] == "HIT"
+    assert segunda.json() == primera.json()
+
+
+def test_middleware_no_cachea_si_hubo_una_escritura_durante_el_get(nuevo_backend):
+    cache = CacheRespuestas(nuevo_backend())
+    escrituras = []
+
+    def escribir(version):
+        # Commit de otra request entre la lectura y el guardado en cache
+        if not escrituras:
+            version["valor"] += 1
+            cache.invalidar()
+            escrituras.append(True)
+
+    app, _ = app_con_cache(cache, escribir)
+    primera, segunda = asyncio.run(pedir(app, 2))
+    assert primera.json() == {"version": 1}
+    assert "x-cache" not in segunda.headers
+    assert segunda.json() == {"version": 2}
@@ -0,0 +1,62 @@
+from app.models import Solicitud, VersionSolicitudes
+
+from tests.fabricas import crear_solicitud, cuerpo_alta
+
+
+def etag(cliente, url):
+    respuesta = cliente.get(url)
+    assert respuesta.status_code == 200
+    return respuesta.headers["etag"]
+
+
+def revalidar(cliente, url, tag):
+    return cliente.get(url, headers={"If-None-Match": tag}).status_code
+
+
+def test_dos_patch_en_el_mismo_segundo_cambian_el_etag(cliente, db):
+    solicitud = crear_solicitud(db)
+    db.commit()
+    detalle = f"/api/solicitudes/{solicitud.id}"
+    urls = [detalle, "/api/solicitudes/", "/api/solicitudes/estadisticas/resumen"]
+
+    antes = {url: etag(cliente, url) for url in urls}
+    assert all(revalidar(cliente, url, tag) == 304 for url, tag in antes.items())
+
+    cliente.patch(detalle, json={"notas_internas": "uno"})
+    primero = {url: etag(cliente, url) for url in urls}
+    cliente.patch(detalle, json={"notas_internas": "dos"})
+
+    for url in urls:
+        assert revalidar(cliente, url, antes[url]) == 200
+        assert revalidar(cliente, url, primero[url]) == 200
+    assert cliente.get(detalle).json()["notas_internas"] == "dos"
+
+
+def test_cada_escritura_toma_una_version_nueva(cliente, db):
+    alta = cliente.post("/api/solicitudes/", json=cuerpo_alta()).json()
+    masiva = cliente.post("/api/solicitudes/bulk", json=[cuerpo_alta(), cuerpo_alta()]).json()
+    cliente.patch("/api/solicitudes/bulk", json=[{"id": alta["id"], "notas_internas": "x"}])
+
+    versiones = dict(db.query(Solicitud.id, Solicitud.version).all())
+    ids_masiva = [r["id"] for r in masiva["resultados"]]
+    assert versiones[ids_masiva[0]] == versiones[ids_masiva[1]] == 2
+    assert versiones[alta["id"]] == 3
+    assert db.get(VersionSolicitudes, 1).ultima == 3
+
+
+def test_estadisticas_de_otra_instancia_no_salen_con_el_etag_nuevo(cliente, db):
+    from app.services import estadisticas_cache
+
+    estadisticas_cache.invalidar()
+    url = "/api/solicitudes/estadisticas/resumen"
+    assert cliente.get(url).json()["total"] == 0
+
+    # Otra instancia escribe: este proceso no se entera por tras_commit()
+    crear_solicitud(db, version=99)
+    db.commit()
+
+    respuesta = cliente.get(url)
+    assert respuesta.json()["total"] == 1
+    assert revalidar(cliente, url, respuesta.headers["etag"]) == 304
+    total = cliente.get("/api/solicitudes/", params={"incluir_total": "true"}).headers["x-total-count"]
+    assert total == "1"
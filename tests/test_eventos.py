@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+from app.models import SessionLocal
+from app.services import eventos
+from app.services.eventos import Difusor
+
+from tests.fabricas import crear_solicitud, cuerpo_alta
+
+
+async def recibir(suscripcion, cantidad=1, espera=2):
+    return [await asyncio.wait_for(suscripcion.cola.get(), espera) for _ in range(cantidad)]
+
+
+def test_se_publica_solo_al_hacer_commit(db):
+    async def escenario():
+        suscripcion = eventos.difusor.suscribir()
+        try:
+            sesion = SessionLocal()
+            crear_solicitud(sesion)
+            eventos.emitir_actualizada(sesion, 1)
+            sesion.rollback()
+            crear_solicitud(sesion)
+            eventos.emitir_actualizada(sesion, 2)
+            sesion.commit()
+            sesion.close()
+
+            evento, = await recibir(suscripcion)
+            assert suscripcion.cola.empty()
+            return evento
+        finally:
+            eventos.difusor.desuscribir(suscripcion)
+
+    evento = asyncio.run(escenario())
+    assert evento["tipo"] == eventos.TIPO_ACTUALIZADA
+    assert evento["datos"] == {"id": 2}
+
+
+def test_alta_y_cambio_de_estado_por_la_api(cliente):
+    async def escenario():
+        suscripcion = eventos.difusor.suscribir()
+        try:
+            creada = (await asyncio.to_thread(cliente.post, "/api/solicitudes/", json=cuerpo_alta())).json()
+            await asyncio.to_thread(cliente.patch, f"/api/solicitudes/{creada['id']}", json={"estado": "En Análisis"})
+            return creada, await recibir(suscripcion, 2)
+        finally:
+            eventos.difusor.desuscribir(suscripcion)
+
+    creada, (alta, cambio) = asyncio.run(escenario())
+
+    assert alta["tipo"] == eventos.TIPO_CREADA
+    assert alta["datos"]["solicitud"]["numero_solicitud"] == creada["numero_solicitud"]
+    assert alta["datos"]["delta"]["total"] == 1
+    assert cambio["tipo"] == eventos.TIPO_ESTADO
+    assert cambio["datos"]["estado_anterior"] == "Recibido"
+    assert cambio["datos"]["estado"] == "En Análisis"
+    assert cambio["datos"]["delta"]["por_estado"] == {"Recibido": -1, "En Análisis": 1}
+
+
+def test_el_mismo_estado_no_emite_evento(db):
+    solicitud = crear_solicitud(db)
+    eventos.emitir_estado(db, solicitud.id, solicitud.numero_solicitud, solicitud.area_solicitante,
+                          solicitud.urgencia, solicitud.estado, solicitud.estado)
+    assert eventos._CLAVE_PENDIENTES not in db.info
+    db.rollback()
+
+
+def test_flujo_sse_formatea_los_eventos():
+    async def escenario():
+        flujo = eventos.flujo_sse()
+        primero = await flujo.__anext__()
+        eventos.difusor.publicar(eventos.TIPO_ACTUALIZADA, {"id": 7})
+        segundo = await asyncio.wait_for(flujo.__anext__(), 2)
+        await flujo.aclose()
+        return primero, segundo
+
+    primero, segundo = asyncio.run(escenario())
+
+    assert primero == "retry: 3000\n\n"
+    id_linea, evento_linea, datos_linea, *_ = segundo.split("\n")
+    assert id_linea.startswith(f"id: {eventos.difusor.instancia}-")
+    assert evento_linea == "event: actualizada"
+    assert json.loads(datos_linea.removeprefix("data: ")) == {"id": 7}
+    assert eventos.difusor.cantidad() == 0
+
+
+def test_reanudar_con_last_event_id():
+    difusor = Difusor(historial=3)
+    for i in range(5):
+        difusor.publicar(eventos.TIPO_ACTUALIZADA, {"id": i})
+
+    async def escenario(ultimo):
+        suscripcion = difusor.suscribir(ultimo)
+        difusor.desuscribir(suscripcion)
+        return [e["tipo"] if e["tipo"] == eventos.TIPO_RESYNC else e["datos"]["id"]
+                for e in [suscripcion.cola.get_nowait() for _ in range(suscripcion.cola.qsize())]]
+
+    # Los perdidos siguen en el historial
+    assert asyncio.run(escenario(f"{difusor.instancia}-3")) == [3, 4]
+    assert asyncio.run(escenario(f"{difusor.instancia}-5")) == []
+    # Ya salieron del historial, o el id es de otra instancia
+    assert asyncio.run(escenario(f"{difusor.instancia}-1")) == [eventos.TIPO_RESYNC]
+    assert asyncio.run(escenario("otra-3")) == [eventos.TIPO_RESYNC]
+
+
+def test_cliente_lento_recibe_resync(monkeypatch):
+    monkeypatch.setattr(eventos, "EVENTOS_COLA", 2)
+    difusor = Difusor()
+
+    async def escenario():
+        suscripcion = difusor.suscribir()
+        for i in range(3):
+            difusor.publicar(eventos.TIPO_ACTUALIZADA, {"id": i})
+        await asyncio.sleep(0)
+        difusor.desuscribir(suscripcion)
+        return [suscripcion.cola.get_nowait() for _ in range(suscripcion.cola.qsize())]
+
+    recibidos = asyncio.run(escenario())
+
+    assert [e["tipo"] for e in recibidos] == [eventos.TIPO_RESYNC]
@@ -0,0 +1,93 @@
+"""Ubicación de filas para update_estados contra una hoja simulada en memoria."""
+from app.models import SessionLocal
+from app.services.google_sheets import GoogleSheetsService, IndiceFilas, fila_desde_rango
+
+
+class Pedido:
+    def __init__(self, respuesta):
+        self.respuesta = respuesta
+
+    def execute(self):
+        return self.respuesta()
+
+
+class HojaEnMemoria:
+    """Imita spreadsheets().values() sobre una lista de filas (la 1 son los encabezados)."""
+
+    def __init__(self, numeros):
+        self.filas = [["Número Solicitud"]] + [[n] + [""] * 15 for n in numeros]
+        self.llamadas = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def celda_a(self, rango):
+        fila = fila_desde_rango(rango)
+        return self.filas[fila - 1][:1] if fila <= len(self.filas) else []
+
+    def batchGet(self, spreadsheetId, ranges):
+        self.llamadas.append(("batchGet", len(ranges)))
+        return Pedido(lambda: {"valueRanges": [
+            {"values": [self.celda_a(r)] if self.celda_a(r) else []} for r in ranges
+        ]})
+
+    def get(self, spreadsheetId, range):
+        self.llamadas.append(("get", range))
+        return Pedido(lambda: {"values": [fila[:1] for fila in self.filas]})
+
+    def batchUpdate(self, spreadsheetId, body):
+        self.llamadas.append(("batchUpdate", len(body["data"])))
+
+        def escribir():
+            for dato in body["data"]:
+                self.filas[fila_desde_rango(dato["range"]) - 1][15] = dato["values"][0][0]
+            return {}
+        return Pedido(escribir)
+
+    def estado(self, numero):
+        return next(fila[15] for fila in self.filas if fila[0] == numero)
+
+
+def servicio(db, hoja, indice):
+    sheets = GoogleSheetsService()
+    sheets._service = hoja
+    sheets._inicializado = True
+    sheets.indice_filas = IndiceFilas(SessionLocal)
+    sheets.indice_filas.registrar_varias(indice)
+    return sheets
+
+
+def test_con_el_indice_al_dia_no_se_lee_la_columna(db):
+    hoja = HojaEnMemoria(["A-1", "A-2", "A-3"])
+    sheets = servicio(db, hoja, {"A-1": 2, "A-2": 3, "A-3": 4})
+
+    assert sheets.update_estados({"A-1": "Completado", "A-3": "En Análisis"}) == {"A-1", "A-3"}
+
+    assert hoja.llamadas == [("batchGet", 2), ("batchUpdate", 2)]
+    assert (hoja.estado("A-1"), hoja.estado("A-2"), hoja.estado("A-3")) == ("Completado", "", "En Análisis")
+
+
+def test_filas_reordenadas_a_mano_se_reindexan(db):
+    hoja = HojaEnMemoria(["A-1", "A-2", "A-3"])
+    sheets = servicio(db, hoja, {"A-1": 2, "A-2": 3, "A-3": 4})
+    # Alguien ordena la hoja al revés: el índice apunta a filas ajenas
+    hoja.filas[1:] = hoja.filas[:0:-1]
+
+    assert sheets.update_estados({"A-1": "Completado"}) == {"A-1"}
+
+    assert hoja.llamadas == [("batchGet", 1), ("get", "Solicitudes!A:A"), ("batchUpdate", 1)]
+    assert hoja.estado("A-1") == "Completado"
+    assert hoja.estado("A-3") == ""
+    assert sheets.indice_filas.obtener("A-1") == 4
+
+
+def test_una_fila_borrada_no_se_escribe(db):
+    hoja = HojaEnMemoria(["A-1", "A-2"])
+    sheets = servicio(db, hoja, {"A-1": 2, "A-2": 3})
+    del hoja.filas[1]
+
+    assert sheets.update_estados({"A-1": "Completado", "A-2": "Completado"}) == {"A-2"}
+    assert hoja.estado("A-2") == "Completado"
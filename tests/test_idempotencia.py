@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.models import ClaveIdempotencia, SheetsOutbox, Solicitud
+from app.routers import solicitudes as router_solicitudes
+from app.services import idempotencia
+from app.services.idempotencia import AlmacenIdempotencia
+
+from tests.fabricas import cuerpo_alta
+
+
+def contar(db, modelo):
+    return db.execute(select(func.count()).select_from(modelo)).scalar_one()
+
+
+def test_reintento_devuelve_la_misma_respuesta_sin_duplicar(cliente, db):
+    cuerpo = cuerpo_alta()
+    primera = cliente.post("/api/solicitudes/", json=cuerpo, headers={"Idempotency-Key": "k-1"})
+    segunda = cliente.post("/api/solicitudes/", json=cuerpo, headers={"Idempotency-Key": "k-1"})
+
+    assert primera.status_code == segunda.status_code == 201
+    assert segunda.headers["Idempotent-Replayed"] == "true"
+    assert segunda.json() == primera.json()
+    assert contar(db, Solicitud) == 1
+    assert contar(db, SheetsOutbox) == 1
+
+
+def test_la_clave_con_otro_contenido_es_422(cliente):
+    cliente.post("/api/solicitudes/", json=cuerpo_alta(), headers={"Idempotency-Key": "k-2"})
+    otra = cliente.post(
+        "/api/solicitudes/", json=cuerpo_alta(titulo_proceso="Otro proceso distinto"),
+        headers={"Idempotency-Key": "k-2"}
+    )
+    assert otra.status_code == 422
+
+
+def test_otra_instancia_ve_la_clave(cliente, db):
+    cuerpo = cuerpo_alta()
+    creada = cliente.post("/api/solicitudes/", json=cuerpo, headers={"Idempotency-Key": "k-3"}).json()
+
+    # Un almacén nuevo no tiene nada en memoria: la clave sale de la base
+    otra_instancia = AlmacenIdempotencia()
+    resultado, respuesta, status = otra_instancia.reservar(db, "k-3", idempotencia.huella(cuerpo))
+    assert resultado == idempotencia.REPETIDA
+    assert status == 201
+    assert respuesta["id"] == creada["id"]
+
+
+def test_si_el_alta_falla_la_clave_se_libera(cliente, db, monkeypatch):
+    def fallar(*args, **kwargs):
+        raise RuntimeError("sin base")
+
+    monkeypatch.setattr(router_solicitudes, "reservar_numeros", fallar)
+    with pytest.raises(RuntimeError):
+        cliente.post("/api/solicitudes/", json=cuerpo_alta(), headers={"Idempotency-Key": "k-4"})
+    monkeypatch.undo()
+
+    assert contar(db, ClaveIdempotencia) == 0
+    respuesta = cliente.post("/api/solicitudes/", json=cuerpo_alta(), headers={"Idempotency-Key": "k-4"})
+    assert respuesta.status_code == 201
+    assert "Idempotent-Replayed" not in respuesta.headers
+
+
+def test_una_clave_vencida_se_reutiliza(db):
+    almacen = AlmacenIdempotencia(ttl=-1)
+    assert almacen.reservar(db, "k-5", "a")[0] == idempotencia.NUEVA
+    almacen.guardar(db, "k-5", None, 201, {"id": 1})
+    db.commit()
+
+    # Vencida: se reserva de nuevo aunque la huella sea otra
+    assert almacen.reservar(db, "k-5", "b")[0] == idempotencia.NUEVA
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from app.middleware import LimiteEscriturasMiddleware, cliente_de_scope
+from app.services import limites
+from app.services.limites import (
+    CompuertaEscrituras,
+    CompuertaSheets,
+    CuboTokens,
+    LimitadorEscrituras,
+    SheetsSaturado,
+)
+
+
+def app_lenta(demora):
+    async def app(scope, receive, send):
+        await asyncio.sleep(demora)
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+    return app
+
+
+def rafaga(app, clientes, por_cliente, metodo="POST"):
+    async def enviar():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://prueba") as client:
+            return await asyncio.gather(*(
+                client.request(metodo, "/api/solicitudes/", headers={"X-Forwarded-For": f"10.0.0.{c}"})
+                for c in range(clientes) for _ in range(por_cliente)
+            ))
+    respuestas = asyncio.run(enviar())
+    return Counter(r.status_code for r in respuestas), respuestas
+
+
+def limitada(limitador=None, compuerta=None, demora=0):
+    return LimiteEscriturasMiddleware(
+        app_lenta(demora),
+        limitador=limitador or LimitadorEscrituras(0, 0, 0, 0),
+        compuerta=compuerta or CompuertaEscrituras(0),
+    )
+
+
+def test_cubo_por_cliente():
+    # Recarga casi nula: lo admitido es exactamente la ráfaga de cada cliente
+    app = limitada(LimitadorEscrituras(0.001, 3, 0, 0))
+
+    codigos, respuestas = rafaga(app, 3, 5)
+
+    assert codigos == {201: 9, 429: 6}
+    rechazadas = [r for r in respuestas if r.status_code == 429]
+    assert rechazadas and all(r.headers["retry-after"].isdigit() for r in rechazadas)
+
+
+def test_cubo_global():
+    app = limitada(LimitadorEscrituras(0, 0, 0.001, 20))
+
+    codigos, _ = rafaga(app, 10, 3)
+
+    assert codigos == {201: 20, 429: 10}
+
+
+def test_rechazo_global_devuelve_el_token_del_cliente():
+    limitador = LimitadorEscrituras(0.001, 2, 0.001, 1)
+
+    assert limitador.admitir("a") is None
+    motivo, espera = limitador.admitir("a")
+    assert motivo == limites.MOTIVO_GLOBAL and espera > 0
+    # El cubo de "a" conserva el token que no llegó a usar
+    assert limitador._clientes["a"]._tokens == pytest.approx(1, abs=0.01)
+
+
+def test_las_lecturas_no_se_limitan():
+    app = limitada(LimitadorEscrituras(0.001, 1, 0.001, 1))
+
+    codigos, _ = rafaga(app, 1, 5, metodo="GET")
+
+    assert codigos == {201: 5}
+
+
+def test_compuerta_de_concurrencia():
+    app = limitada(compuerta=CompuertaEscrituras(2, espera=0.1), demora=0.3)
+
+    codigos, _ = rafaga(app, 1, 6)
+
+    assert codigos == {201: 2, 429: 4}
+
+
+def test_cubo_se_recarga():
+    cubo = CuboTokens(tasa=100, capacidad=1)
+    assert cubo.tomar() == 0
+    assert cubo.tomar() > 0
+    time.sleep(0.02)
+    assert cubo.tomar() == 0
+
+
+def test_descarta_solo_clientes_con_el_cubo_lleno():
+    limitador = LimitadorEscrituras(0.001, 1, 0, 0, maximo=2)
+    for cliente in ("a", "b", "c"):
+        limitador.admitir(cliente)
+
+    # Ningún cubo está lleno: olvidar uno le regalaría la ráfaga
+    assert list(limitador._clientes) == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("saltos,esperado", [(0, "127.0.0.1"), (1, "3.3.3.3"), (2, "2.2.2.2"), (5, "1.1.1.1")])
+def test_cliente_segun_saltos_de_proxy(monkeypatch, saltos, esperado):
+    import app.middleware as middleware
+
+    monkeypatch.setattr(middleware, "LIMITE_SALTOS_PROXY", saltos)
+    scope = {
+        "type": "http",
+        "client": ("127.0.0.1", 5000),
+        "headers": [(b"x-forwarded-for", b"1.1.1.1, 2.2.2.2, 3.3.3.3")],
+    }
+
+    assert cliente_de_scope(scope) == esperado
+
+
+def test_compuerta_sheets_limita_las_llamadas_simultaneas():
+    compuerta = CompuertaSheets(concurrencia=2, por_minuto=6000, espera_max=2)
+    lock = threading.Lock()
+    en_curso = maximo = 0
+
+    def llamada(_):
+        nonlocal en_curso, maximo
+        with compuerta.turno("prueba"):
+            with lock:
+                en_curso += 1
+                maximo = max(maximo, en_curso)
+            time.sleep(0.02)
+            with lock:
+                en_curso -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(llamada, range(20)))
+
+    assert maximo == 2
+
+
+def test_compuerta_sheets_pausada_posterga_la_llamada():
+    compuerta = CompuertaSheets(concurrencia=2, por_minuto=6000, espera_max=1)
+    compuerta.pausar(5)
+
+    assert compuerta.espera() > 4
+    with pytest.raises(SheetsSaturado) as error:
+        with compuerta.turno("prueba"):
+            pass
+    assert error.value.espera > 4
+    # El turno se liberó aunque la llamada no se hizo
+    assert compuerta._semaforo.acquire(blocking=False)
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from tests.fabricas import crear_solicitud
+
+
+def test_pagina_con_cursor(cliente, db):
+    # Fechas explícitas: en SQLite el CURRENT_TIMESTAMP del server_default no
+    # tiene microsegundos y no se compara bien contra el cursor
+    inicio = datetime(2026, 1, 1)
+    for i in range(5):
+        crear_solicitud(db, fecha_creacion=inicio + timedelta(minutes=i % 3))
+    db.commit()
+
+    primera = cliente.get("/api/solicitudes/", params={"limit": 3})
+    assert primera.status_code == 200
+    assert len(primera.json()) == 3
+    cursor = primera.headers["X-Next-Cursor"]
+
+    segunda = cliente.get("/api/solicitudes/", params={"limit": 3, "cursor": cursor})
+    assert len(segunda.json()) == 2
+    assert "X-Next-Cursor" not in segunda.headers
+    ids = [s["id"] for s in primera.json() + segunda.json()]
+    assert len(set(ids)) == 5
+
+
+def test_limit_fuera_de_rango_es_422(cliente):
+    for limit in (0, -1, 501):
+        assert cliente.get("/api/solicitudes/", params={"limit": limit}).status_code == 422
+    assert cliente.get("/api/solicitudes/", params={"skip": -1}).status_code == 422
+
+
+def test_lista_vacia_sin_cursor(cliente):
+    respuesta = cliente.get("/api/solicitudes/", params={"limit": 1})
+    assert respuesta.status_code == 200
+    assert respuesta.json() == []
+    assert "X-Next-Cursor" not in respuesta.headers
@@ -0,0 +1,41 @@
+from app.models import Estado, Solicitud
+
+from tests.fabricas import crear_solicitud, cuerpo_alta
+
+
+def test_alta_masiva_reporta_errores_por_item(cliente):
+    respuesta = cliente.post("/api/solicitudes/bulk", json=[cuerpo_alta(), {"titulo_proceso": "x"}, cuerpo_alta()])
+    assert respuesta.status_code == 200
+    datos = respuesta.json()
+    assert datos["procesadas"] == 2 and datos["errores"] == 1
+    assert [r["ok"] for r in sorted(datos["resultados"], key=lambda r: r["indice"])] == [True, False, True]
+
+
+def test_estado_null_es_un_error_del_item_y_no_del_lote(cliente, db):
+    a, b = crear_solicitud(db), crear_solicitud(db)
+    db.commit()
+
+    respuesta = cliente.patch("/api/solicitudes/bulk", json=[
+        {"id": a.id, "estado": None},
+        {"id": b.id, "estado": Estado.COMPLETADO.value},
+    ])
+
+    assert respuesta.status_code == 200
+    resultados = {r["indice"]: r for r in respuesta.json()["resultados"]}
+    assert not resultados[0]["ok"] and "estado" in resultados[0]["error"]
+    assert resultados[1]["ok"]
+    db.expire_all()
+    assert db.get(Solicitud, a.id).estado == Estado.EN_ANALISIS
+    assert db.get(Solicitud, b.id).estado == Estado.COMPLETADO
+
+
+def test_patch_con_estado_null_es_422(cliente, db):
+    solicitud = crear_solicitud(db)
+    db.commit()
+
+    assert cliente.patch(f"/api/solicitudes/{solicitud.id}", json={"estado": None}).status_code == 422
+
+    # Sin el campo solo se actualizan las notas
+    respuesta = cliente.patch(f"/api/solicitudes/{solicitud.id}", json={"notas_internas": "revisar"})
+    assert respuesta.status_code == 200
+    assert respuesta.json()["estado"] == Estado.EN_ANALISIS.value
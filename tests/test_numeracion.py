@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from app.models import SessionLocal, Solicitud
+from app.services.numeracion import reservar_numeros
+
+from tests.fabricas import cuerpo_alta, datos_solicitud
+
+
+def test_altas_concurrentes_sin_numeros_repetidos(db):
+    total = 200
+
+    def crear(_):
+        sesion = SessionLocal()
+        try:
+            numero, = reservar_numeros(sesion)
+            sesion.add(Solicitud(**datos_solicitud(numero_solicitud=numero)))
+            sesion.commit()
+            return numero
+        finally:
+            sesion.close()
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        numeros = list(pool.map(crear, range(total)))
+
+    assert len(set(numeros)) == total
+    distintos = db.execute(select(func.count(func.distinct(Solicitud.numero_solicitud)))).scalar_one()
+    assert distintos == total
+
+
+def test_reserva_consecutiva_y_por_dia(db):
+    dia = datetime(2026, 3, 1)
+
+    assert reservar_numeros(db, fecha=dia) == ["AUTO-20260301-000001"]
+    assert reservar_numeros(db, 3, fecha=dia) == [
+        "AUTO-20260301-000002",
+        "AUTO-20260301-000003",
+        "AUTO-20260301-000004",
+    ]
+    # Cada día tiene su propio contador
+    assert reservar_numeros(db, fecha=datetime(2026, 3, 2)) == ["AUTO-20260302-000001"]
+
+
+def test_un_alta_fallida_no_reutiliza_el_numero(db):
+    dia = datetime(2026, 3, 1)
+    reservar_numeros(db, fecha=dia)
+    db.rollback()
+    reservar_numeros(db, fecha=dia)
+    db.commit()
+
+    # El rollback deshace también la reserva: el contador no deja huecos
+    assert reservar_numeros(db, fecha=dia) == ["AUTO-20260301-000002"]
+
+
+def test_la_api_asigna_numeros_distintos(cliente):
+    creadas = [cliente.post("/api/solicitudes/", json=cuerpo_alta()).json() for _ in range(5)]
+
+    numeros = [c["numero_solicitud"] for c in creadas]
+    assert len(set(numeros)) == 5
+    assert all(n.startswith("AUTO-") for n in numeros)
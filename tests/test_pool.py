@@ -0,0 +1,28 @@
+import sqlite3
+
+from app.models.pool import QueuePoolMedido, estadisticas_pool
+from sqlalchemy import create_engine
+
+
+def motor():
+    return create_engine("sqlite://", poolclass=QueuePoolMedido, creator=lambda: sqlite3.connect(":memory:"))
+
+
+def test_cada_pool_mide_sus_propias_esperas():
+    primario, replica = motor(), motor()
+
+    for _ in range(3):
+        primario.connect().close()
+    replica.connect().close()
+
+    assert estadisticas_pool(primario)["espera"]["checkouts"] == 3
+    assert estadisticas_pool(replica)["espera"]["checkouts"] == 1
+
+
+def test_las_metricas_sobreviven_al_dispose():
+    primario = motor()
+    primario.connect().close()
+    primario.dispose()
+    primario.connect().close()
+
+    assert estadisticas_pool(primario)["espera"]["checkouts"] == 2
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import tempfile
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from starlette.requests import Request
+from sqlalchemy.orm import sessionmaker
+
+from app.middleware import LecturaPrimariaMiddleware
+from app.models import Base
+from app.models import database
+from app.models.database import COOKIE_LECTURA_PRIMARIA
+
+from tests.fabricas import crear_solicitud
+
+PRIMARIA = {"Cookie": f"{COOKIE_LECTURA_PRIMARIA}=1"}
+
+
+@pytest.fixture
+def replica(db, monkeypatch):
+    """Segunda base SQLite como réplica; no recibe las escrituras de la primaria."""
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'replica.db')}"
+    motor = create_engine(url)
+    Base.metadata.create_all(bind=motor)
+    monkeypatch.setattr(database, "DATABASE_READ_URL", url)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(autoflush=False, bind=motor))
+    yield
+    motor.dispose()
+
+
+def test_listado_y_detalle_leen_de_la_replica(cliente, db, replica):
+    solicitud = crear_solicitud(db)
+    db.commit()
+
+    assert cliente.get("/api/solicitudes/").json() == []
+    assert cliente.get(f"/api/solicitudes/{solicitud.id}").status_code == 404
+
+    # Tras escribir, el cliente lee de la primaria y ve su cambio
+    assert [s["id"] for s in cliente.get("/api/solicitudes/", headers=PRIMARIA).json()] == [solicitud.id]
+    assert cliente.get(f"/api/solicitudes/{solicitud.id}", headers=PRIMARIA).status_code == 200
+
+
+def test_estadisticas_con_escritura_reciente_van_a_la_primaria(cliente, db, replica):
+    crear_solicitud(db)
+    db.commit()
+
+    assert cliente.get("/api/solicitudes/estadisticas/resumen").json()["total"] == 0
+    assert cliente.get("/api/solicitudes/estadisticas/resumen", headers=PRIMARIA).json()["total"] == 1
+
+
+def test_sin_replica_la_cookie_no_cambia_nada(cliente, db):
+    crear_solicitud(db)
+    db.commit()
+
+    assert len(cliente.get("/api/solicitudes/").json()) == 1
+    assert database.usar_primaria(Request({"type": "http", "headers": []}))
+
+
+@pytest.mark.parametrize("metodo,status,marca", [
+    ("POST", 201, True),
+    ("PATCH", 200, True),
+    ("POST", 422, False),
+    ("GET", 200, False),
+])
+def test_lectura_primaria_marca_solo_escrituras_exitosas(metodo, status, marca):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def enviar():
+        transport = httpx.ASGITransport(app=LecturaPrimariaMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://prueba") as client:
+            return await client.request(metodo, "/api/solicitudes/")
+
+    respuesta = asyncio.run(enviar())
+
+    cookie = respuesta.headers.get("set-cookie", "")
+    assert (f"{COOKIE_LECTURA_PRIMARIA}=1" in cookie) is marca
+    if marca:
+        assert f"Max-Age={database.DB_READ_PRIMARIA_SEGUNDOS}" in cookie
@@ -0,0 +1,120 @@
+"""Mismos escenarios de escritura contra el router síncrono y el de DB_ASYNC."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models import Estado, SheetsOutbox, SimilitudFirma, Solicitud, TransicionEstado
+
+from tests.fabricas import crear_solicitud, cuerpo_alta
+
+
+def app_async():
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from app.models.database import DATABASE_URL, async_database_url, get_async_db, get_async_read_db
+    from app.routers import solicitudes_async_router
+
+    # Sin pool: cada request del TestClient corre en su propio event loop
+    motor = create_async_engine(async_database_url(DATABASE_URL), poolclass=NullPool)
+    fabrica = async_sessionmaker(bind=motor, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def sesion():
+        async with fabrica() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(solicitudes_async_router)
+    app.dependency_overrides[get_async_db] = sesion
+    app.dependency_overrides[get_async_read_db] = sesion
+    return app
+
+
+@pytest.fixture(params=["sync", "async"])
+def api(request, db):
+    if request.param == "sync":
+        from app.main import app
+        return TestClient(app)
+    return TestClient(app_async())
+
+
+def outbox(db, operacion):
+    return db.query(SheetsOutbox).filter(SheetsOutbox.operacion == operacion).count()
+
+
+def test_alta(api, db):
+    cuerpo = cuerpo_alta()
+    primera = api.post("/api/solicitudes/", json=cuerpo)
+    segunda = api.post("/api/solicitudes/", json=cuerpo)
+
+    assert primera.status_code == segunda.status_code == 201
+    assert primera.json()["numero_solicitud"].startswith("AUTO-")
+    assert primera.json()["estado"] == Estado.RECIBIDO.value
+    assert [s["id"] for s in segunda.json()["similares"]] == [primera.json()["id"]]
+    assert outbox(db, SheetsOutbox.OP_APPEND) == 2
+    assert db.query(SimilitudFirma).count() == 2
+
+
+def test_alta_idempotente(api, db):
+    headers = {"Idempotency-Key": "clave-1"}
+    cuerpo = cuerpo_alta()
+
+    primera = api.post("/api/solicitudes/", json=cuerpo, headers=headers)
+    repetida = api.post("/api/solicitudes/", json=cuerpo, headers=headers)
+    otra = api.post("/api/solicitudes/", json=cuerpo_alta(titulo_proceso="Otro"), headers=headers)
+
+    assert repetida.status_code == 201
+    assert repetida.headers["idempotent-replayed"] == "true"
+    assert repetida.json() == primera.json()
+    assert otra.status_code == 422
+    assert db.query(Solicitud).count() == 1
+
+
+def test_alta_masiva(api, db):
+    respuesta = api.post("/api/solicitudes/bulk", json=[cuerpo_alta(), {"titulo_proceso": "x"}, cuerpo_alta()])
+
+    datos = respuesta.json()
+    assert (datos["procesadas"], datos["errores"]) == (2, 1)
+    assert [r["ok"] for r in datos["resultados"]] == [True, False, True]
+    assert outbox(db, SheetsOutbox.OP_APPEND) == 2
+    assert db.query(SimilitudFirma).count() == 2
+
+    demasiados = api.post("/api/solicitudes/bulk", json=[{}] * 501)
+    assert demasiados.status_code == 413
+
+
+def test_actualizacion_masiva(api, db):
+    a, b = crear_solicitud(db), crear_solicitud(db)
+    db.commit()
+
+    respuesta = api.patch("/api/solicitudes/bulk", json=[
+        {"id": a.id, "estado": Estado.COMPLETADO.value},
+        {"id": b.id, "notas_internas": "revisar"},
+        {"id": 999999, "estado": Estado.COMPLETADO.value},
+    ])
+
+    datos = respuesta.json()
+    assert [r["ok"] for r in datos["resultados"]] == [True, True, False]
+    db.expire_all()
+    assert db.get(Solicitud, a.id).estado == Estado.COMPLETADO
+    assert db.get(Solicitud, b.id).notas_internas == "revisar"
+    assert outbox(db, SheetsOutbox.OP_UPDATE_ESTADO) == 1
+    assert db.query(TransicionEstado).count() == 1
+
+
+def test_actualizacion(api, db):
+    solicitud = crear_solicitud(db)
+    db.commit()
+    url = f"/api/solicitudes/{solicitud.id}"
+
+    assert api.patch(url, json={"notas_internas": "ok"}).json()["notas_internas"] == "ok"
+    assert outbox(db, SheetsOutbox.OP_UPDATE_ESTADO) == 0
+
+    respuesta = api.patch(url, json={"estado": Estado.COMPLETADO.value})
+    assert respuesta.json()["estado"] == Estado.COMPLETADO.value
+    assert outbox(db, SheetsOutbox.OP_UPDATE_ESTADO) == 1
+    assert db.query(TransicionEstado).count() == 1
+
+    assert api.patch(url, json={"estado": None}).status_code == 422
+    assert api.patch("/api/solicitudes/999999", json={"notas_internas": "x"}).status_code == 404
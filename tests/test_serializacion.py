@@ -0,0 +1,104 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.models import Estado
+from app.schemas import SolicitudListResponse, SolicitudResponse
+from app.services import serializacion
+
+from tests.fabricas import crear_solicitud
+
+CONTENIDO = {
+    "texto": "Área de Análisis — «ñandú»",
+    "estado": Estado.EN_ANALISIS,
+    "utc": datetime(2026, 1, 2, 3, 4, 5, 678900, tzinfo=timezone.utc),
+    "con_zona": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-3))),
+    "sin_zona": datetime(2026, 1, 2, 3, 4, 5),
+    "dia": date(2026, 1, 2),
+    "nulo": None,
+    "lista": [1, 2.5, True],
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def motor(request, monkeypatch):
+    if request.param == "orjson":
+        if serializacion.orjson is None:
+            pytest.skip("orjson no está instalado")
+    else:
+        monkeypatch.setattr(serializacion, "orjson", None)
+    return request.param
+
+
+def test_dumps_coincide_con_pydantic(motor):
+    esperado = TypeAdapter(dict).dump_json(CONTENIDO)
+
+    assert json.loads(serializacion.dumps(CONTENIDO)) == json.loads(esperado)
+    # Mismos textos de fecha, no solo fechas equivalentes
+    assert b'"2026-01-02T03:04:05.678900Z"' in serializacion.dumps(CONTENIDO)
+
+
+def test_dumps_rechaza_tipos_desconocidos(motor):
+    with pytest.raises(TypeError):
+        serializacion.dumps({"x": object()})
+
+
+def llamar(cliente, monkeypatch, rapida, url):
+    monkeypatch.setattr(serializacion, "SERIALIZACION_RAPIDA", rapida)
+    respuesta = cliente.get(url)
+    assert respuesta.status_code == 200
+    return respuesta
+
+
+@pytest.mark.parametrize("url", ["/api/solicitudes/?limit=2", "/api/solicitudes/{id}"])
+def test_camino_rapido_igual_al_de_pydantic(cliente, db, monkeypatch, url):
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    solicitudes = [crear_solicitud(db, fecha_creacion=base + timedelta(minutes=i)) for i in range(3)]
+    db.commit()
+    url = url.format(id=solicitudes[0].id)
+
+    normal = llamar(cliente, monkeypatch, False, url)
+    rapida = llamar(cliente, monkeypatch, True, url)
+
+    assert rapida.json() == normal.json()
+    for header in ("etag", "cache-control", "x-next-cursor"):
+        assert rapida.headers.get(header) == normal.headers.get(header)
+
+
+def test_columnas_rapidas_cubren_los_esquemas():
+    from app.routers.solicitudes import COLUMNAS_DETALLE, COLUMNAS_LISTADO
+
+    assert [c.key for c in COLUMNAS_LISTADO] == list(SolicitudListResponse.model_fields)
+    assert [c.key for c in COLUMNAS_DETALLE] == list(SolicitudResponse.model_fields)
+
+
+def test_filas_proyectadas_validan_contra_los_esquemas(db):
+    from sqlalchemy import select
+    from app.routers.solicitudes import COLUMNAS_LISTADO
+
+    crear_solicitud(db)
+    filas = db.execute(select(*COLUMNAS_LISTADO)).all()
+    cuerpo = serializacion.respuesta_filas(filas, serializacion.RespuestaJSON({})).body
+
+    adaptador = TypeAdapter(List[SolicitudListResponse])
+    validadas = adaptador.validate_python(filas, from_attributes=True)
+    assert json.loads(cuerpo) == json.loads(adaptador.dump_json(validadas))
+
+
+def test_respuestas_grandes_se_comprimen(cliente, db):
+    for _ in range(20):
+        crear_solicitud(db)
+    db.commit()
+
+    respuesta = cliente.get("/api/solicitudes/", headers={"Accept-Encoding": "gzip"})
+
+    assert respuesta.headers["content-encoding"] == "gzip"
+    assert len(respuesta.json()) == 20
+    assert int(respuesta.headers["content-length"]) < len(respuesta.content)
+
+    # El stream SSE no pasa por el compresor
+    from app.middleware import RUTAS_SIN_COMPRESION
+    assert "/api/solicitudes/stream" in RUTAS_SIN_COMPRESION
@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.models import SessionLocal, Solicitud, SheetsOutbox
+from app.services import sheets_outbox
+from app.services.sheets_outbox import SheetsOutboxWorker, encolar_sheets
+
+from tests.fabricas import crear_solicitud
+
+
+class SheetsFalso:
+    """Cliente de Google Sheets en memoria con la interfaz que usa el worker."""
+
+    configurado = True
+    service = True
+
+    def __init__(self):
+        self.appends = []
+        self.estados = []
+
+    def append_solicitudes(self, lista_datos):
+        self.appends.append([d["numero_solicitud"] for d in lista_datos])
+        return True
+
+    def update_estados(self, estados):
+        self.estados.append(dict(estados))
+        return set(estados)
+
+
+def encolar(db, cantidad, operacion=SheetsOutbox.OP_APPEND):
+    solicitudes = [crear_solicitud(db) for _ in range(cantidad)]
+    for solicitud in solicitudes:
+        encolar_sheets(db, solicitud, operacion)
+    db.commit()
+    return solicitudes
+
+
+def vencer_reintentos(db):
+    db.execute(update(SheetsOutbox).values(proximo_intento=datetime.now(timezone.utc) - timedelta(seconds=1)))
+    db.commit()
+
+
+def test_un_lote_se_envia_en_una_llamada(db):
+    solicitudes = encolar(db, 3)
+    sheets = SheetsFalso()
+    worker = SheetsOutboxWorker(SessionLocal, sheets)
+
+    assert worker.drenar() == 3
+    assert sheets.appends == [[s.numero_solicitud for s in solicitudes]]
+    assert worker.pendientes() == 0
+
+
+def test_una_fila_invalida_no_bloquea_el_lote(db):
+    mala, *buenas = encolar(db, 3)
+    # estado NULL: solicitud_to_sheets_data no puede armar la fila
+    db.execute(update(Solicitud).where(Solicitud.id == mala.id).values(estado=None))
+    db.commit()
+    sheets = SheetsFalso()
+    worker = SheetsOutboxWorker(SessionLocal, sheets)
+
+    worker.drenar()
+
+    assert sheets.appends == [[s.numero_solicitud for s in buenas]]
+    entrada = db.query(SheetsOutbox).filter(SheetsOutbox.solicitud_id == mala.id).one()
+    assert entrada.fecha_procesado is None
+    assert entrada.intentos == 1
+    assert "No se pudo armar la fila" in entrada.ultimo_error
+    assert worker.pendientes() == 1
+
+    # La entrada con error espera su backoff: el siguiente drenado no la reintenta
+    assert worker.drenar() == 0
+
+
+def test_se_descarta_tras_agotar_los_intentos(db, monkeypatch):
+    monkeypatch.setattr(sheets_outbox, "SHEETS_OUTBOX_MAX_INTENTOS", 3)
+    mala, buena = encolar(db, 2)
+    db.execute(update(Solicitud).where(Solicitud.id == mala.id).values(estado=None))
+    db.commit()
+    worker = SheetsOutboxWorker(SessionLocal, SheetsFalso())
+
+    for _ in range(3):
+        worker.drenar()
+        vencer_reintentos(db)
+
+    entrada = db.query(SheetsOutbox).filter(SheetsOutbox.solicitud_id == mala.id).one()
+    assert entrada.intentos == 3
+    assert entrada.fecha_descartado is not None
+    assert worker.pendientes() == 0
+    assert worker.descartadas() == 1
+
+    # Una operación posterior de la misma solicitud ya no queda bloqueada
+    db.execute(update(Solicitud).where(Solicitud.id == mala.id).values(estado="COMPLETADO"))
+    encolar_sheets(db, db.get(Solicitud, mala.id), SheetsOutbox.OP_UPDATE_ESTADO)
+    db.commit()
+    sheets = SheetsFalso()
+    assert SheetsOutboxWorker(SessionLocal, sheets).drenar() == 1
+    assert sheets.estados == [{mala.numero_solicitud: "Completado"}]
+
+
+def test_un_cambio_de_estado_invalido_no_bloquea_los_demas(db):
+    mala, buena = encolar(db, 2, SheetsOutbox.OP_UPDATE_ESTADO)
+    db.execute(update(Solicitud).where(Solicitud.id == mala.id).values(estado=None))
+    db.commit()
+    sheets = SheetsFalso()
+
+    SheetsOutboxWorker(SessionLocal, sheets).drenar()
+
+    assert sheets.estados == [{buena.numero_solicitud: buena.estado.value}]
+    entrada = db.query(SheetsOutbox).filter(SheetsOutbox.solicitud_id == mala.id).one()
+    assert entrada.intentos == 1 and entrada.fecha_procesado is None
+
+
+def test_las_bloqueadas_no_ocupan_el_lote(db, monkeypatch):
+    monkeypatch.setattr(sheets_outbox, "SHEETS_OUTBOX_LOTE", 2)
+    bloqueada, = encolar(db, 1)
+    db.execute(update(SheetsOutbox).values(proximo_intento=datetime.now(timezone.utc) + timedelta(hours=1)))
+    for _ in range(3):
+        encolar_sheets(db, bloqueada, SheetsOutbox.OP_UPDATE_ESTADO)
+    db.commit()
+    nueva, = encolar(db, 1)
+    sheets = SheetsFalso()
+
+    assert SheetsOutboxWorker(SessionLocal, sheets).drenar() == 1
+
+    assert sheets.appends == [[nueva.numero_solicitud]]
+    assert sheets.estados == []
+    assert db.query(SheetsOutbox).filter(SheetsOutbox.solicitud_id == bloqueada.id,
+                                         SheetsOutbox.intentos == 0).count() == 4
+
+
+def test_se_purgan_las_enviadas_viejas(db):
+    vieja, reciente, pendiente = encolar(db, 3)
+    ahora = datetime.now(timezone.utc)
+    db.execute(update(SheetsOutbox).where(SheetsOutbox.solicitud_id == vieja.id)
+               .values(fecha_procesado=ahora - timedelta(days=8)))
+    db.execute(update(SheetsOutbox).where(SheetsOutbox.solicitud_id == reciente.id)
+               .values(fecha_procesado=ahora - timedelta(days=1)))
+    db.commit()
+    sheets = SheetsFalso()
+    worker = SheetsOutboxWorker(SessionLocal, sheets, retencion=7 * 86400, purga=600)
+
+    assert worker.drenar() == 1
+
+    db.expire_all()
+    restantes = {e.solicitud_id for e in db.query(SheetsOutbox).all()}
+    assert restantes == {reciente.id, pendiente.id}
+
+    # La purga corre como mucho una vez por intervalo
+    db.execute(update(SheetsOutbox).values(fecha_procesado=ahora - timedelta(days=8)))
+    db.commit()
+    worker.drenar()
+    assert db.query(SheetsOutbox).count() == 2
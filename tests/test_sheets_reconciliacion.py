@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+
+from app.models import SessionLocal, SheetsOutbox
+from app.services.google_sheets import GoogleSheetsService
+from app.services.sheets_outbox import encolar_sheets, solicitud_to_sheets_data
+from app.services.sheets_reconciliacion import ReconciliadorSheets
+
+from tests.fabricas import crear_solicitud
+
+BASE = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class HojaFalsa:
+    """Hoja de Google Sheets en memoria con la interfaz que usa el reconciliador."""
+
+    fila_solicitud = staticmethod(GoogleSheetsService.fila_solicitud)
+
+    def __init__(self, filas=None):
+        self.filas = [list(f) for f in filas or []]  # desde la fila 2
+        self.lecturas = []
+        self.appends = []
+        self.reescrituras = []
+
+    def leer_filas(self, inicio, fin):
+        self.lecturas.append((inicio, fin))
+        return [list(f) for f in self.filas[inicio - 2:fin - 1]]
+
+    def append_solicitudes(self, lista_datos):
+        self.appends.append([d["numero_solicitud"] for d in lista_datos])
+        self.filas.extend(self.fila_solicitud(d) for d in lista_datos)
+        return True
+
+    def actualizar_filas(self, filas):
+        self.reescrituras.append(sorted(filas))
+        for fila, valores in filas.items():
+            self.filas[fila - 2] = list(valores)
+        return True
+
+
+def fila(solicitud):
+    return GoogleSheetsService.fila_solicitud(solicitud_to_sheets_data(solicitud))
+
+
+def alta(db, minutos, **cambios):
+    solicitud = crear_solicitud(db, fecha_creacion=BASE + timedelta(minutes=minutos), **cambios)
+    db.commit()
+    return solicitud
+
+
+def test_agrega_faltantes_y_reescribe_distintas(db):
+    igual = alta(db, 0)
+    distinta = alta(db, 1)
+    faltante = alta(db, 2)
+    vieja = fila(distinta)
+    vieja[15] = "Cancelado"
+    hoja = HojaFalsa([fila(igual), vieja])
+
+    resultado = ReconciliadorSheets(hoja, SessionLocal, chunk=1).reconciliar()
+
+    assert resultado.aplicado
+    assert resultado.insertar == [faltante.numero_solicitud]
+    assert resultado.actualizar == [distinta.numero_solicitud]
+    assert hoja.appends == [[faltante.numero_solicitud]]
+    assert hoja.reescrituras == [[3]]
+    # Con chunk=1 la hoja se lee fila por fila hasta un bloque incompleto
+    assert hoja.lecturas == [(2, 2), (3, 3), (4, 4)]
+
+
+def test_dry_run_no_escribe_ni_mueve_el_watermark(db):
+    alta(db, 0)
+    hoja = HojaFalsa()
+    reconciliador = ReconciliadorSheets(hoja, SessionLocal, margen=0)
+
+    resultado = reconciliador.reconciliar(dry_run=True)
+
+    assert len(resultado.insertar) == 1
+    assert not resultado.aplicado
+    assert hoja.appends == []
+    assert reconciliador._leer_watermark(db) is None
+
+
+def test_reporta_duplicadas_en_la_hoja(db):
+    solicitud = alta(db, 0)
+    hoja = HojaFalsa([fila(solicitud), fila(solicitud)])
+
+    resultado = ReconciliadorSheets(hoja, SessionLocal).reconciliar()
+
+    assert resultado.duplicadas_en_hoja == [solicitud.numero_solicitud]
+    assert resultado.insertar == resultado.actualizar == []
+
+
+def test_el_watermark_no_pasa_de_una_omitida_por_el_outbox(db):
+    anterior = alta(db, 0)
+    pendiente = alta(db, 5)
+    posterior = alta(db, 10)
+    encolar_sheets(db, pendiente, SheetsOutbox.OP_APPEND)
+    db.commit()
+    hoja = HojaFalsa([fila(anterior), fila(posterior)])
+    reconciliador = ReconciliadorSheets(hoja, SessionLocal, margen=0)
+
+    resultado = reconciliador.reconciliar()
+
+    assert resultado.omitidas_pendientes == 1
+    assert resultado.insertar == []
+    assert reconciliador._leer_watermark(db) == pendiente.fecha_creacion
+
+    # El worker la descarta sin escribirla: la siguiente corrida incremental la agrega
+    db.query(SheetsOutbox).update({"fecha_descartado": BASE})
+    db.commit()
+    resultado = reconciliador.reconciliar()
+
+    assert resultado.insertar == [pendiente.numero_solicitud]
+    assert reconciliador._leer_watermark(db) == posterior.fecha_creacion
+
+
+def test_el_margen_recupera_commits_tardios(db):
+    primera = alta(db, 10)
+    hoja = HojaFalsa()
+    reconciliador = ReconciliadorSheets(hoja, SessionLocal, margen=300)
+
+    reconciliador.reconciliar()
+    assert reconciliador._leer_watermark(db) == primera.fecha_creacion - timedelta(minutes=5)
+
+    # Commit posterior al escaneo con una fecha anterior a la más alta revisada
+    tardia = alta(db, 8)
+    resultado = reconciliador.reconciliar()
+
+    assert resultado.insertar == [tardia.numero_solicitud]
+    # El watermark no retrocede entre corridas
+    assert reconciliador._leer_watermark(db) == primera.fecha_creacion - timedelta(minutes=5)
+
+
+def test_un_fallo_al_escribir_no_mueve_el_watermark(db):
+    alta(db, 0)
+    hoja = HojaFalsa()
+    hoja.append_solicitudes = lambda lista_datos: False
+    reconciliador = ReconciliadorSheets(hoja, SessionLocal, margen=0)
+
+    resultado = reconciliador.reconciliar()
+
+    assert not resultado.aplicado
+    assert reconciliador._leer_watermark(db) is None
@@ -0,0 +1,137 @@
+import random
+
+import pytest
+
+from app.models import Solicitud
+from app.services import similitud
+
+from tests.fabricas import cuerpo_alta, datos_solicitud
+
+SILABAS = "ba be bi bo bu ca ce ci co cu da de di do du fa fe fi fo ga ge go la le li lo lu ma me mi mo mu".split()
+
+
+def vocabulario(azar, tamano=1500):
+    palabras = set()
+    while len(palabras) < tamano:
+        palabras.add("".join(azar.choice(SILABAS) for _ in range(azar.randint(2, 4))))
+    return sorted(palabras)
+
+
+def editar(texto, azar, vocab, fraccion):
+    """Copia con una fracción de palabras reemplazadas."""
+    palabras = texto.split()
+    for i in azar.sample(range(len(palabras)), max(1, int(len(palabras) * fraccion))):
+        palabras[i] = azar.choice(vocab)
+    return " ".join(palabras)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def test_tokens_normaliza_acentos_y_omite_palabras_vacias():
+    assert similitud.tokens("Automatización de la CONCILIACIÓN en el área") == [
+        "automatizacion", "conciliacion", "area"
+    ]
+    assert similitud.firma_de("", "de la y") is None
+
+
+def test_la_estimacion_se_acerca_a_jaccard():
+    azar = random.Random(1)
+    vocab = vocabulario(azar)
+    for fraccion in (0.05, 0.2, 0.5):
+        original = " ".join(azar.choices(vocab, k=120))
+        copia = editar(original, azar, vocab, fraccion)
+        real = jaccard(similitud.shingles("", original), similitud.shingles("", copia))
+        estimada = similitud.similitud(similitud.firma_de("", original), similitud.firma_de("", copia))
+        # Error estándar de 64 permutaciones: ~0.06
+        assert abs(estimada - real) < 0.2
+
+
+@pytest.fixture
+def corpus(db):
+    """Textos al azar con copias editadas un 10%; devuelve [(id, id_original | None, firma)]."""
+    azar = random.Random(7)
+    vocab = vocabulario(azar)
+    textos = []
+    for i in range(300):
+        if i >= 100 and i % 3 == 0:
+            origen = azar.randrange(100)
+            titulo, descripcion, _ = textos[origen]
+            textos.append((titulo, editar(descripcion, azar, vocab, 0.1), origen))
+        else:
+            textos.append((" ".join(azar.choices(vocab, k=6)), " ".join(azar.choices(vocab, k=80)), None))
+
+    solicitudes = [
+        Solicitud(**datos_solicitud(titulo_proceso=t, descripcion_proceso=d)) for t, d, _ in textos
+    ]
+    db.add_all(solicitudes)
+    db.flush()
+    similitud.indexar(db, [
+        (s.id, similitud.firma_de(s.titulo_proceso, s.descripcion_proceso)) for s in solicitudes
+    ])
+    db.commit()
+    return [
+        (s.id, solicitudes[origen].id if origen is not None else None, similitud.firma_de(t, d))
+        for s, (t, d, origen) in zip(solicitudes, textos)
+    ]
+
+
+def test_el_indice_encuentra_las_copias(db, corpus):
+    copias = [(sid, origen, firma) for sid, origen, firma in corpus if origen is not None]
+
+    encontradas = sum(
+        any(s["id"] == origen for s in similitud.similares(db, firma, sid))
+        for sid, origen, firma in copias
+    )
+
+    assert encontradas / len(copias) >= 0.95
+
+
+def test_sin_falsos_positivos_sobre_el_umbral(db, corpus):
+    originales = {origen for _, origen, _ in corpus if origen is not None}
+    unicas = [(sid, firma) for sid, origen, firma in corpus if origen is None and sid not in originales]
+
+    for sid, firma in unicas:
+        assert similitud.similares(db, firma, sid) == []
+
+
+def test_coincide_con_la_comparacion_exhaustiva(db, corpus):
+    firmas = {sid: firma for sid, _, firma in corpus}
+    for sid, _, firma in corpus[:150]:
+        exactas = {
+            otro for otro, otra in firmas.items()
+            if otro != sid and similitud.similitud(firma, otra) >= similitud.SIMILARES_UMBRAL
+        }
+        lsh = {s["id"] for s in similitud.similares(db, firma, sid, maximo=len(exactas) or 1)}
+        # El índice solo puede perder pares, nunca inventarlos
+        assert lsh <= exactas
+        if exactas:
+            assert lsh
+
+
+def test_umbral_y_maximo(db, corpus):
+    sid, origen, firma = next(c for c in corpus if c[1] is not None)
+
+    assert similitud.similares(db, firma, sid, umbral=1.01) == []
+    resultado = similitud.similares(db, firma, sid, umbral=0, maximo=1)
+    assert len(resultado) == 1 and resultado[0]["id"] == origen
+    # Sin excluirse, la propia solicitud aparece primero con similitud 1
+    propia = similitud.similares(db, firma)[0]
+    assert (propia["id"], propia["similitud"]) == (sid, 1.0)
+
+
+def test_alta_devuelve_posibles_duplicados(cliente):
+    cuerpo = cuerpo_alta(
+        titulo_proceso="Conciliación bancaria mensual",
+        descripcion_proceso="Cruzar extractos del banco con el mayor contable y marcar diferencias a mano cada mes",
+    )
+    primera = cliente.post("/api/solicitudes/", json=cuerpo).json()
+    segunda = cliente.post("/api/solicitudes/", json=cuerpo).json()
+
+    assert primera["similares"] == []
+    assert [s["id"] for s in segunda["similares"]] == [primera["id"]]
+    assert segunda["similares"][0]["similitud"] == 1.0
+
+    similares = cliente.get(f"/api/solicitudes/{primera['id']}/similares").json()
+    assert [s["id"] for s in similares] == [segunda["id"]]
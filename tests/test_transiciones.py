@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models import Estado, RollupEstadoDiario, TransicionEstado
+from app.models.transicion_estado import COLUMNAS_BUCKETS
+from app.services.transiciones import filas_rollup, percentil_histograma, transicion
+
+from tests.fabricas import crear_solicitud
+
+
+def hace(horas):
+    # SQLite guarda las fechas sin zona, en UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=horas)
+
+
+def test_patch_registra_la_transicion_y_el_rollup(cliente, db):
+    solicitud = crear_solicitud(db, fecha_estado=hace(2))
+    db.commit()
+
+    respuesta = cliente.patch(f"/api/solicitudes/{solicitud.id}", json={"estado": Estado.COMPLETADO.value})
+    assert respuesta.status_code == 200
+
+    registro, = db.query(TransicionEstado).all()
+    assert (registro.estado_anterior, registro.estado_nuevo) == (Estado.EN_ANALISIS.value, Estado.COMPLETADO.value)
+    assert abs(registro.segundos_en_estado - 7200) < 60
+
+    rollup, = db.query(RollupEstadoDiario).all()
+    assert rollup.estado == Estado.EN_ANALISIS.value
+    assert rollup.cantidad == 1
+    assert rollup.h01 == 1  # entre 1 y 4 horas
+
+
+def test_mismo_estado_no_registra_transicion(cliente, db):
+    solicitud = crear_solicitud(db)
+    db.commit()
+
+    cliente.patch(f"/api/solicitudes/{solicitud.id}", json={"estado": Estado.EN_ANALISIS.value})
+
+    assert db.query(TransicionEstado).count() == 0
+
+
+def test_patch_masivo_acumula_en_una_fila_de_rollup(cliente, db):
+    a = crear_solicitud(db, fecha_estado=hace(2))
+    b = crear_solicitud(db, fecha_estado=hace(30))
+    db.commit()
+
+    cliente.patch("/api/solicitudes/bulk", json=[
+        {"id": a.id, "estado": Estado.COMPLETADO.value},
+        {"id": b.id, "estado": Estado.COMPLETADO.value},
+    ])
+
+    assert db.query(TransicionEstado).count() == 2
+    rollup, = db.query(RollupEstadoDiario).all()
+    assert rollup.cantidad == 2
+    assert abs(rollup.suma_segundos - 32 * 3600) < 120
+    assert (rollup.h01, rollup.h04) == (1, 1)
+
+    # Una segunda salida del mismo estado el mismo día suma sobre la fila existente
+    c = crear_solicitud(db, fecha_estado=hace(2))
+    db.commit()
+    cliente.patch(f"/api/solicitudes/{c.id}", json={"estado": Estado.EN_DESARROLLO.value})
+    db.expire_all()
+    rollup, = db.query(RollupEstadoDiario).all()
+    assert rollup.cantidad == 3 and rollup.h01 == 2
+    assert abs(rollup.min_segundos - 2 * 3600) < 60 and abs(rollup.max_segundos - 30 * 3600) < 60
+
+
+def test_filas_rollup_omite_transiciones_sin_estado_anterior():
+    ahora = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    transiciones = [
+        transicion(1, "TI", "Alta", None, "Recibido", None, ahora),
+        transicion(2, "TI", "Alta", "Recibido", "En Análisis", ahora - timedelta(minutes=30), ahora),
+        transicion(3, "TI", "Alta", "Recibido", "En Análisis", ahora - timedelta(hours=10), ahora),
+        # Reloj desfasado: no debe quedar un tiempo negativo
+        transicion(4, "RRHH", "Alta", "Recibido", "En Análisis", ahora + timedelta(minutes=5), ahora),
+    ]
+
+    filas = {f["area_solicitante"]: f for f in filas_rollup(transiciones)}
+
+    assert filas["TI"]["cantidad"] == 2
+    assert filas["TI"]["suma_segundos"] == 10.5 * 3600
+    assert (filas["TI"]["m30"], filas["TI"]["h02"]) == (1, 1)
+    assert (filas["TI"]["min_segundos"], filas["TI"]["max_segundos"]) == (1800, 10 * 3600)
+    assert filas["RRHH"]["suma_segundos"] == 0
+    assert filas["RRHH"]["m01"] == 1
+
+
+def buckets(**cantidades):
+    return [cantidades.get(c, 0) for c in COLUMNAS_BUCKETS]
+
+
+def test_percentil_histograma_acotado_por_los_extremos():
+    # Transiciones inmediatas: sin acotar, la interpolación daría medio minuto
+    assert percentil_histograma(buckets(m01=10), 50, 0, 0) == 0
+    assert percentil_histograma(buckets(m01=10), 50) == 0.01
+    # Todo entre 1 y 4 horas, pero observado entre 2h y 2.5h
+    assert percentil_histograma(buckets(h01=4), 50, 2 * 3600, 2.5 * 3600) == 2.25
+    assert percentil_histograma(buckets(h01=4), 50) == 2.5
+    # El último bucket no tiene límite superior: se usa el máximo observado
+    assert percentil_histograma(buckets(h11=2), 90, 2000 * 3600, 3000 * 3600) == 2900
+    assert percentil_histograma(buckets(h11=2), 90) == 1440
+    assert percentil_histograma(buckets(), 50) is None
+
+
+def test_endpoint_de_tiempos_por_estado(cliente, db):
+    a = crear_solicitud(db, fecha_estado=hace(2))
+    b = crear_solicitud(db, fecha_estado=hace(4))
+    db.commit()
+    for solicitud in (a, b):
+        cliente.patch(f"/api/solicitudes/{solicitud.id}", json={"estado": Estado.COMPLETADO.value})
+
+    fila, = cliente.get("/api/solicitudes/analitica/tiempos-estado").json()
+
+    assert fila["estado"] == Estado.EN_ANALISIS.value
+    assert fila["cantidad"] == 2
+    assert abs(fila["promedio_horas"] - 3) < 0.05
+    assert 2 <= fila["mediana_estimada_horas"] <= fila["p90_estimado_horas"] <= 4.05
+
+    por_area = cliente.get("/api/solicitudes/analitica/tiempos-estado", params={"agrupar": "area"}).json()
+    assert [f["area_solicitante"] for f in por_area] == [a.area_solicitante.value]
+    assert cliente.get("/api/solicitudes/analitica/tiempos-estado", params={"agrupar": "otro"}).status_code == 422
+
+
+def test_transiciones_inmediatas_informan_cero(cliente, db):
+    solicitud = crear_solicitud(db, fecha_estado=hace(0))
+    db.commit()
+    url = f"/api/solicitudes/{solicitud.id}"
+    cliente.patch(url, json={"estado": Estado.EN_DESARROLLO.value})
+    cliente.patch(url, json={"estado": Estado.COMPLETADO.value})
+
+    filas = cliente.get("/api/solicitudes/analitica/tiempos-estado").json()
+
+    assert len(filas) == 2
+    for fila in filas:
+        assert fila["mediana_estimada_horas"] == fila["p90_estimado_horas"] == 0